@@ -0,0 +1,61 @@
+"""
+Speedup of the batched evaluation of the population over the agent-by-agent evaluation of customhys.
+
+Every problem runs with every dimensionality and population size, several times with each evaluation (with the same
+seed, so every run does the same work and must end with the same fitness). The median wall times and the speedup of
+each configuration are printed. The default problems include some whose function draws random numbers (Stochastic and
+XinSheYang1), which are evaluated agent by agent but must keep the same random stream.
+
+Usage:
+    python benchmarks/batched_evaluation.py [--problems Sphere Rastrigin] [--dimensions 2 10]
+                                            [--populations 10 30 100 300 1000]
+"""
+
+import argparse
+import os
+import sys
+
+basedir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, basedir)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from customhys_qt import benchmark, search_operators  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--problems', nargs='+', default=benchmark.DEFAULT_PROBLEMS + ['Stochastic', 'XinSheYang1'],
+                        help='problems of customhys.benchmark_func (default: %(default)s)')
+    parser.add_argument('--dimensions', type=int, nargs='+', default=[10],
+                        help='dimensionalities (default: %(default)s)')
+    parser.add_argument('--populations', type=int, nargs='+', default=[10, 30, 100, 300, 1000],
+                        help='numbers of agents (default: %(default)s)')
+    parser.add_argument('--operator', default="('random_search', {'scale': 0.01, 'distribution': 'uniform'}, 'greedy')",
+                        help='search operator, as a tuple literal (default: %(default)s)')
+    parser.add_argument('--iterations', type=int, default=50, help='number of iterations (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of every run (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per evaluation (default: %(default)s)')
+    args = parser.parse_args()
+
+    operator = search_operators.parse_operator(args.operator)
+    print('{:<30}{:>14}{:>14}{:>10}{:>8}'.format('configuration', 'per agent (s)', 'batched (s)', 'speedup', 'same'))
+    mismatches = 0
+    for problem_name in args.problems:
+        for num_dimensions in args.dimensions:
+            for population in args.populations:
+                spec = dict(problem=problem_name, dimensions=num_dimensions, population=population,
+                            iterations=args.iterations, operators=[operator.to_tuple()], seed=args.seed)
+                measures = benchmark.measure_batching(spec, args.repeat)
+                mismatches += not measures['same_result']
+                print('{:<30}{:>14.4f}{:>14.4f}{:>9.2f}x{:>8}'.format(
+                    f"{problem_name}|{num_dimensions}D|{population}", measures['agent_time'],
+                    measures['batched_time'], measures['speedup'], 'yes' if measures['same_result'] else 'NO'))
+
+    if mismatches:
+        print(f"{mismatches} configurations do not end with the same fitness in every run")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
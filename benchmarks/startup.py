@@ -0,0 +1,77 @@
+"""
+Startup-time benchmark of CUSTOMHyS-Qt.
+
+Each launch runs in a fresh interpreter that builds the main window and processes the pending events, so the first
+problem preview is drawn. The cold launch starts without the bytecode caches of the app and without the rebuilt problem
+index (if any); the warm launches reuse them.
+
+Usage:
+    python benchmarks/startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+from timeit import default_timer as timer
+
+basedir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code run in the child interpreter, it reports the time spent inside the process
+_launch_code = """
+import importlib.util, json, os, sys
+from timeit import default_timer as timer
+start = timer()
+sys.path.insert(0, {basedir!r})
+spec = importlib.util.spec_from_file_location('customhys_qt_app', os.path.join({basedir!r}, 'customhys-qt.py'))
+app_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app_module)
+imported = timer()
+app = app_module.QApplication(sys.argv)
+window = app_module.MainWindow()
+shown = timer()
+app.processEvents()
+ready = timer()
+print(json.dumps(dict(imports=imported - start, window=shown - imported, preview=ready - shown, total=ready - start)))
+"""
+
+
+def clear_caches():
+    for folder in [os.path.join(basedir, '__pycache__'), os.path.join(basedir, 'customhys_qt', '__pycache__')]:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    from customhys_qt import paths
+    rebuilt_index = os.path.join(paths.cache_dir(), 'problem_index.json')
+    if os.path.isfile(rebuilt_index):
+        os.remove(rebuilt_index)
+
+
+def launch():
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    start = timer()
+    output = subprocess.run([sys.executable, '-c', _launch_code.format(basedir=basedir)], env=env, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    measures = json.loads(output.strip().splitlines()[-1])
+    measures['process'] = timer() - start
+    return measures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='number of warm launches (default: 5)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, basedir)
+    clear_caches()
+    launches = [('cold', launch())] + [('warm', launch()) for _ in range(args.repeat)]
+
+    keys = ['imports', 'window', 'preview', 'total', 'process']
+    print('{:<6}'.format('launch') + ''.join('{:>10}'.format(key) for key in keys))
+    for name, measures in launches:
+        print('{:<6}'.format(name) + ''.join('{:>10.3f}'.format(measures[key]) for key in keys))
+
+
+if __name__ == '__main__':
+    main()
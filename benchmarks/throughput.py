@@ -0,0 +1,85 @@
+"""
+Throughput benchmark of the search operators of CUSTOMHyS-Qt.
+
+Every selected operator of the collection (or all of them as a single sequence, with --sequence) runs on every problem
+and dimensionality with a fixed seed. The wall time, evaluations per second, and peak memory of each configuration are
+printed and, if a baseline file exists, compared with it; the script exits with status 1 when a configuration is slower
+than its baseline beyond the tolerance.
+
+Usage:
+    python benchmarks/throughput.py [--problems Sphere Rastrigin] [--dimensions 2 10] [--operators 0 3]
+                                    [--baseline benchmarks/baselines.json] [--save-baseline]
+"""
+
+import argparse
+import os
+import sys
+
+basedir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, basedir)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from customhys_qt import benchmark, search_operators  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--collection', default=os.path.join(basedir, 'data', 'short_collection.txt'),
+                        help='collection of search operators (default: data/short_collection.txt)')
+    parser.add_argument('--operators', type=int, nargs='+', default=None,
+                        help='indices of the operators in the collection (default: all)')
+    parser.add_argument('--sequence', action='store_true',
+                        help='run the selected operators as a single sequence instead of one by one')
+    parser.add_argument('--problems', nargs='+', default=benchmark.DEFAULT_PROBLEMS,
+                        help='problems of customhys.benchmark_func (default: %(default)s)')
+    parser.add_argument('--dimensions', type=int, nargs='+', default=[2, 10],
+                        help='dimensionalities (default: %(default)s)')
+    parser.add_argument('--population', type=int, default=30, help='number of agents (default: %(default)s)')
+    parser.add_argument('--iterations', type=int, default=100, help='number of iterations (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of every run (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per configuration (default: %(default)s)')
+    parser.add_argument('--baseline', default=os.path.join(basedir, 'benchmarks', 'baselines.json'),
+                        help='baseline file (default: benchmarks/baselines.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='save the measures as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative drop of evaluations per second flagged as slower (default: %(default)s)')
+    args = parser.parse_args()
+
+    collection = search_operators.read_collection(args.collection)
+    indices = args.operators if args.operators is not None else range(len(collection))
+    selected = [(f"{index:02d}-{collection[index].name}", collection[index]) for index in indices]
+    if args.sequence:
+        sequences = {'+'.join(name for name, _ in selected): [operator for _, operator in selected]}
+    else:
+        sequences = {name: [operator] for name, operator in selected}
+
+    suite = benchmark.make_suite(sequences, args.problems, args.dimensions, args.population, args.iterations,
+                                 args.seed)
+    baselines = benchmark.load_baselines(args.baseline) if os.path.isfile(args.baseline) else dict()
+
+    print('{:<50}{:>10}{:>12}{:>14}{:>10}{:>14}'.format(
+        'configuration', 'time (s)', 'evaluations', 'evals/s', 'peak MiB', 'vs baseline'))
+
+    def report(key, measures):
+        flag, ratio = benchmark.compare({key: measures}, baselines, args.tolerance)[key]
+        change = '--' if ratio is None else f"{ratio:.2f}x {flag}"
+        print('{:<50}{:>10.3f}{:>12d}{:>14.0f}{:>10.2f}{:>14}'.format(
+            key, measures['time'], measures['evaluations'], measures['evals_per_s'], measures['peak_mib'], change))
+
+    records = benchmark.run_suite(suite, args.repeat, progress=report)
+
+    if args.save_baseline:
+        benchmark.save_baselines(args.baseline, records)
+        print(f"Baseline saved in {args.baseline}")
+        return 0
+
+    slower = [key for key, (flag, _) in benchmark.compare(records, baselines, args.tolerance).items()
+              if flag == 'slower']
+    if slower:
+        print(f"{len(slower)} configurations are slower than the baseline: {', '.join(slower)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
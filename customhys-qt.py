@@ -1,14 +1,35 @@
+import sys
+
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    # Run an experiment from the command line without loading the GUI. The worker processes load the headless module
+    # instead of re-running this script (see the ``__spec__`` handling of multiprocessing)
+    import importlib.util
+    from customhys_qt import headless
+
+    __spec__ = importlib.util.find_spec("customhys_qt.headless")
+    sys.exit(headless.main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+if __name__ == "__main__" and "--worker" in sys.argv[1:]:
+    # Run the jobs of a coordinator (a GUI on another machine, see customhys_qt.distributed)
+    import importlib.util
+    from customhys_qt import distributed
+
+    __spec__ = importlib.util.find_spec("customhys_qt.distributed")
+    sys.exit(distributed.main([arg for arg in sys.argv[1:] if arg != "--worker"]))
+
+import multiprocessing
 import os
+import secrets
+import socket
+import threading
 from timeit import default_timer as timer
 
 import numpy as np
-from PyQt6.QtCore import Qt, QItemSelectionModel
+from PyQt6.QtCore import Qt, QItemSelectionModel, pyqtSignal
 from PyQt6 import QtCore, QtWidgets, QtGui
 from PyQt6.QtGui import QIcon, QStandardItemModel, QStandardItem, QAction, QKeySequence
 from PyQt6.QtWidgets import QApplication, QMainWindow, QDialog, QListWidget, QListWidgetItem, QTableView
 from PyQt6.uic import loadUi
-from customhys import benchmark_func as cbf
-from customhys import metaheuristic as cmh
 from customhys import operators as cso
 from customhys.tools import read_json
 from matplotlib import pyplot as plt
@@ -16,10 +37,13 @@ from matplotlib.backends.backend_qt5agg import (
     FigureCanvasQTAgg as FigureCanvas,
     NavigationToolbar2QT as NavigationToolbar,
 )
+from matplotlib.collections import LineCollection
 from matplotlib.colors import LightSource
 from matplotlib.figure import Figure
-import copy
 
+from customhys_qt import (cache, checkpoint, decimation, distributed, engine, export, frames, hyperheuristic, landscape,
+                          problems, profiling, results, search_operators, stats, stopping, store, sweep, telemetry,
+                          tuning)
 # Just for build the app
 basedir = os.path.dirname(__file__)
 
@@ -39,12 +63,13 @@ def resource_path(relative_path):
 
 
 # Read all available operators
-with open(os.path.join(basedir, 'data', "short_collection.txt"), 'r') as operators_file:
-    heuristic_space = [eval(line.rstrip('\n')) for line in operators_file]
+heuristic_space = search_operators.read_collection(os.path.join(basedir, 'data', "short_collection.txt"))
 selectors = cso.__selectors__
-perturbators = sorted(list(set([x[0] for x in heuristic_space])))
+perturbators = sorted(list(set([x.name for x in heuristic_space])))
 
 categorical_options = read_json(os.path.join(basedir, 'data', "tuning_parameters.json"))
+tuning_space = tuning.SearchSpace(tuning.read_ranges(os.path.join(basedir, 'data', "tuning_ranges.json")),
+                                  categorical_options)
 
 
 # Format list of perturbators
@@ -60,6 +85,32 @@ perturbators_icons = read_json(os.path.join(basedir, 'data', "icon_list.json"))
 
 # print(perturbators_icons)
 
+def make_operator_item(operator, item=None):
+    # The list items show the operator as text and keep the operator itself as data
+    if item is None:
+        item = QListWidgetItem()
+    item.setIcon(QIcon(os.path.join(basedir, 'data', 'icons', perturbators_icons[operator.pretty_name])))
+    item.setText(str(operator))
+    item.setData(Qt.ItemDataRole.UserRole, operator)
+    return item
+
+
+def compute_landscape(problem_name, low_boundary, upp_boundary, samples):
+    # Evaluate all the nodes of the grid into the problem function, with the shaded colours of the 3D surface
+    problem_object = engine.get_problem(problem_name, 2)
+    matrix_x, matrix_y, matrix_z = landscape.evaluate_landscape(problem_object, low_boundary, upp_boundary, samples)
+
+    ls = LightSource(azdeg=90, altdeg=45)
+    rgb = ls.shade(matrix_z, plt.cm.jet)
+    return dict(x=matrix_x, y=matrix_y, z=matrix_z, rgb=rgb)
+
+
+def export_file_filter():
+    # File dialog filter with the formats of the run export (Parquet only if pyarrow is installed)
+    names = dict(csv="CSV (*.csv)", parquet="Parquet (*.parquet *.pq)")
+    return ";;".join(names[file_format] for file_format in export.available_formats())
+
+
 class SearchOperatorsDialog(QDialog):
     def __init__(self, parent=None, edit_mode=False):
         super().__init__(parent)
@@ -88,12 +139,10 @@ class SearchOperatorsDialog(QDialog):
             self.search_operators.addItem(item)
 
         if self.edit_mode:
-            so2edit = self.parent().qMetaheuristic.currentItem().text().split("->")
-            so2edit_name = so2edit[0].strip()
-            so2edit_tuning = eval(so2edit[1].strip())
-            so2edit_item = self.search_operators.findItems(so2edit_name, QtCore.Qt.MatchFlag.MatchExactly)[0]
+            so2edit = self.parent().qMetaheuristic.currentItem().data(Qt.ItemDataRole.UserRole)
+            so2edit_item = self.search_operators.findItems(so2edit.pretty_name, QtCore.Qt.MatchFlag.MatchExactly)[0]
             self.search_operators.setCurrentItem(so2edit_item)
-            self.update_tuning(self.search_operators.currentRow(), custom_tuning=so2edit_tuning)
+            self.update_tuning(self.search_operators.currentRow(), custom_tuning=so2edit)
         else:
             self.search_operators.setCurrentRow(0)
             self.update_tuning(0)
@@ -122,47 +171,41 @@ class SearchOperatorsDialog(QDialog):
         self.setLayout(self.layout)
 
     @staticmethod
-    def reformat_search_operator():
-        pass
+    def read_value(text):
+        # Numbers keep their type (int or float), anything else is a string
+        for value_type in (int, float):
+            try:
+                return value_type(text)
+            except ValueError:
+                pass
+        return text
 
     def read_table_tuning(self):
-        row_count = self.table_tuning.rowCount()
-        tuning_list = []
-        if row_count > 1:  # If there are tuning parameters
-            for row in range(row_count):  # Read all the parameters
-                widget_key = self.table_tuning.item(row, 0).text()
-                if self.table_tuning.item(row, 1):
-                    widget_value = self.table_tuning.item(row, 1).text()
-                elif self.table_tuning.cellWidget(row, 1):
-                    widget_value = self.table_tuning.cellWidget(row, 1).currentText()
-                else:
-                    widget_value = 'NULL'
-                try:
-                    float(widget_value)
-                except:
-                    widget_value = f"'{widget_value}'"
-                tuning_list.append("'{}': {}".format(widget_key, widget_value))
-            tuning_parameters = '{' + ','.join(tuning_list) + '},'
-        else:
-            tuning_parameters = '{},'
+        tuning_parameters = dict()
+        for row in range(self.table_tuning.rowCount()):  # Read all the parameters
+            widget_key = self.table_tuning.item(row, 0).text()
+            if self.table_tuning.item(row, 1):
+                widget_value = self.read_value(self.table_tuning.item(row, 1).text())
+            elif self.table_tuning.cellWidget(row, 1):
+                widget_value = self.table_tuning.cellWidget(row, 1).currentText()
+            else:
+                widget_value = 'NULL'
+            tuning_parameters[widget_key] = widget_value
 
-        # only_selector = self.table_tuning.cellWidget(row_count - 1, 1).currentText()
-        only_selector = self.selector.currentText()
-        return tuning_parameters + "'{}'".format(only_selector)
+        return tuning_parameters, self.selector.currentText()
 
     def accept(self) -> None:
-        search_operator_pretty_name = self.search_operators.currentItem().text()
         search_operator_name = perturbators[self.search_operators.currentRow()]
-        search_operator_tuning = self.read_table_tuning()
-        search_operator = f"{search_operator_pretty_name}->" + "('{}', {})".format(
-            search_operator_name, search_operator_tuning)
-        # print(search_operator)
-        op_icon = QIcon(os.path.join(basedir, 'data', 'icons', perturbators_icons[search_operator_pretty_name]))
+        try:
+            search_operator = search_operators.SearchOperator(search_operator_name, *self.read_table_tuning())
+        except search_operators.OperatorError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Invalid search operator: {error}")
+            return
+
         if self.edit_mode:
-            self.parent().qMetaheuristic.currentItem().setText(search_operator)
-            self.parent().qMetaheuristic.currentItem().setIcon(op_icon)
+            make_operator_item(search_operator, self.parent().qMetaheuristic.currentItem())
         else:  # Add new item
-            item_to_add = QListWidgetItem(op_icon, search_operator)
+            item_to_add = make_operator_item(search_operator)
             # item_to_add.setSizeHint(QtCore.QSize(30, 30))
             self.parent().qMetaheuristic.addItem(item_to_add)
             self.parent().qMetaheuristic.setCurrentItem(item_to_add)
@@ -171,14 +214,13 @@ class SearchOperatorsDialog(QDialog):
     def update_tuning(self, pert_pretty_index, custom_tuning=None):
         chosen_perturbator = perturbators[pert_pretty_index]
         for pert_info in heuristic_space:
-            if pert_info[0] == perturbators[pert_pretty_index]:
-                tuning_params, selector = pert_info[1], pert_info[2]
+            if pert_info.name == perturbators[pert_pretty_index]:
+                tuning_params, selector = dict(pert_info.parameters), pert_info.selector
 
         # Bypass default tuning_params if edit_mode is on
-        if self.edit_mode and custom_tuning:
-            for key, value in custom_tuning[1].items():
-                tuning_params[key] = value
-            selector = custom_tuning[2]
+        if self.edit_mode and custom_tuning and custom_tuning.name == chosen_perturbator:
+            tuning_params.update(custom_tuning.parameters)
+            selector = custom_tuning.selector
 
         # Combo box for selectors
         qcombo_selector = QtWidgets.QComboBox()
@@ -192,30 +234,14 @@ class SearchOperatorsDialog(QDialog):
         self.table_tuning.setHorizontalHeaderLabels(['Parameter', 'Value'])
 
         for id, item in enumerate(tuning_params.items()):
-            # Combo box for special cases
-            is_special = True
-            if chosen_perturbator in ["firefly_dynamic", "genetic_mutation", "local_random_walk", "random_search",
-                                      "swarm_dynamic"] and item[0] == 'distribution':
-                item_to_add = QtWidgets.QComboBox()
-                item_to_add.addItems(categorical_options['distribution'])
-            elif chosen_perturbator == "differential_mutation" and item[0] == 'expression':
-                item_to_add = QtWidgets.QComboBox()
-                item_to_add.addItems(categorical_options['expression'])
-            elif chosen_perturbator == "differential_crossover" and item[0] == 'version':
-                item_to_add = QtWidgets.QComboBox()
-                item_to_add.addItems(categorical_options['version_dc'])
-            elif chosen_perturbator == "genetic_crossover" and item[0] == 'pairing':
-                item_to_add = QtWidgets.QComboBox()
-                item_to_add.addItems(categorical_options['pairing'])
-            elif chosen_perturbator == "genetic_crossover" and item[0] == 'crossover':
-                item_to_add = QtWidgets.QComboBox()
-                item_to_add.addItems(categorical_options['crossover'])
-            elif chosen_perturbator == "swarm_dynamic" and item[0] == 'version':
+            # Combo box for categorical parameters
+            options_key = tuning.categorical_key(chosen_perturbator, item[0])
+            is_special = options_key in categorical_options
+            if is_special:
                 item_to_add = QtWidgets.QComboBox()
-                item_to_add.addItems(categorical_options['version_ps'])
+                item_to_add.addItems(categorical_options[options_key])
             else:
                 item_to_add = QtWidgets.QTableWidgetItem(str(item[1]))
-                is_special = False
 
             # Fill items for the two columns
             self.table_tuning.setItem(id, 0, QtWidgets.QTableWidgetItem(item[0]))
@@ -266,16 +292,52 @@ class CopyableTableView(QTableView):
 
 
 class PlotWindow(QMainWindow):
-    def __init__(self, figure, parent=None):
+    # Minimum time (ms) between two live updates
+    update_interval = 500
+
+    def __init__(self, source_canvas, parent=None):
         super().__init__(parent)
-        self.figure = copy.deepcopy(figure)
+        # The plot is drawn again from the data behind the source canvas (no copies of its figure)
+        self.source_canvas = source_canvas
+        self.figure = Figure(source_canvas.figure.get_size_inches() * 2, tight_layout=True)
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
         self.addToolBar(self.toolbar)
         self.setCentralWidget(self.canvas)
 
+        # Follow the changes of the source canvas, unless the plot is paused (e.g., for zooming into it)
+        self.live_action = QAction("Live", self)
+        self.live_action.setCheckable(True)
+        self.live_action.setChecked(True)
+        self.live_action.setToolTip("Update the plot as new results arrive")
+        self.live_action.toggled.connect(self.schedule_update)
+        self.toolbar.addSeparator()
+        self.toolbar.addAction(self.live_action)
+
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(self.update_interval)
+        self._update_timer.timeout.connect(self.render)
+        source_canvas.content_changed.connect(self.schedule_update)
+        self.render()
+
+    def schedule_update(self):
+        if self.live_action.isChecked() and not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def render(self):
+        self.figure.clear()
+        self.source_canvas.render(self.figure)
+        self.canvas.draw_idle()
+
 
 class MyCanvas(FigureCanvas):
+    # Emitted when the content changes, so that detached windows can draw it again
+    content_changed = pyqtSignal()
+
+    # Maximum number of full redraws per second
+    max_fps = 10
+
     def __init__(self, parent=None, is_3d=False, figsize=(3, 2)):
         self.figure = Figure(figsize, tight_layout=True)
         self.figure.set_facecolor("none")
@@ -289,13 +351,1112 @@ class MyCanvas(FigureCanvas):
         super().__init__(self.figure)
         self.setStyleSheet("background-color:transparent;")
 
+        self._last_draw = 0.0
+        self._draw_timer = QtCore.QTimer(self)
+        self._draw_timer.setSingleShot(True)
+        self._draw_timer.timeout.connect(self.draw)
+
+        # Callable that draws the content into another figure, as render(figure)
+        self.render = None
+
+    def draw(self):
+        self._draw_timer.stop()
+        self._last_draw = timer()
+        super().draw()
+
+    def request_draw(self):
+        # Redraw now, or as soon as the frame rate allows it (several requests are merged in one redraw)
+        remaining = 1.0 / self.max_fps - (timer() - self._last_draw)
+        if remaining <= 0:
+            self.draw()
+        elif not self._draw_timer.isActive():
+            self._draw_timer.start(int(1000 * remaining) + 1)
+
+    def blit_artists(self, ax, artists):
+        # Draw new artists over the last rendered frame, unless a full redraw is pending. Returns False if not blitted
+        if self._draw_timer.isActive() or self._last_draw == 0.0 or not self.isVisible():
+            return False
+        for artist in artists:
+            ax.draw_artist(artist)
+        self.blit(ax.bbox)
+        return True
+
     def mouseDoubleClickEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.new_window = PlotWindow(self.figure)
+        if event.button() == Qt.MouseButton.LeftButton and self.render is not None:
+            self.new_window = PlotWindow(self)
             self.new_window.show()
 
 
+class RunWorker(QtCore.QObject):
+    progress = pyqtSignal(int, float)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # Minimum time (s) between two progress signals, so fast runs do not flood the event loop
+    progress_interval = 0.05
+
+    def __init__(self, spec, result_cache=None, frames=None):
+        super().__init__()
+        self.spec = spec
+        self.result_cache = result_cache
+        self.frames = frames
+        self._stop_event = threading.Event()
+        self._last_report = 0.0
+
+    def cancel(self):
+        # Called from the GUI thread, the run checks this flag once per iteration
+        self._stop_event.set()
+
+    def report(self, iteration, fitness):
+        now = timer()
+        if now - self._last_report >= self.progress_interval or iteration >= self.spec['iterations']:
+            self._last_report = now
+            self.progress.emit(iteration, fitness)
+
+    def run(self):
+        try:
+            # A cached result has no frames, so runs with a live view always run
+            result = None if self.result_cache is None or self.frames is not None else self.result_cache.get(self.spec)
+            if result is None:
+                result = engine.run_spec(self.spec, progress=self.report, should_stop=self._stop_event.is_set,
+                                         frames=self.frames)
+                if self.result_cache is not None:
+                    self.result_cache.put(self.spec, result)
+        except Exception as error:
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(result)
+
+
+class LandscapeWorker(QtCore.QObject):
+    finished = pyqtSignal(object, object)  # key, grid (None if it failed)
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+
+    def run(self):
+        try:
+            grid = compute_landscape(*self.key)
+        except Exception:
+            grid = None
+        self.finished.emit(self.key, grid)
+
+
+class BatchWorker(QtCore.QObject):
+    result_ready = pyqtSignal(object, object)  # spec, result
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, specs, max_workers=None, result_cache=None):
+        super().__init__()
+        self.specs = specs
+        self.max_workers = max_workers
+        self.result_cache = result_cache
+        self._stop_event = threading.Event()
+
+    def cancel(self):
+        self._stop_event.set()
+
+    def run(self):
+        # Spawn fresh processes instead of forking this (multithreaded) Qt process
+        try:
+            specs = self.specs
+            if self.result_cache is not None:
+                cached_runs, specs = self.result_cache.split(specs)
+                for spec, result in cached_runs:
+                    self.result_ready.emit(spec, result)
+            for spec, result in engine.iter_batch(specs, self.max_workers, should_stop=self._stop_event.is_set,
+                                                  mp_context=multiprocessing.get_context('spawn'),
+                                                  with_specs=True):
+                if self.result_cache is not None:
+                    self.result_cache.put(spec, result)
+                self.result_ready.emit(spec, result)
+        except Exception as error:
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(dict(cancelled=self._stop_event.is_set()))
+
+
+class DistributedWorker(QtCore.QObject):
+    result_ready = pyqtSignal(object, object)  # spec, result
+    status = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # Time (s) between two checks of the job queue
+    poll_interval = 0.2
+
+    def __init__(self, specs, port, authkey, host='', lease_timeout=300.0, result_cache=None):
+        super().__init__()
+        self.specs = specs
+        self.port = port
+        self.authkey = authkey
+        self.host = host
+        self.lease_timeout = lease_timeout
+        self.result_cache = result_cache
+        self._stop_event = threading.Event()
+
+    def cancel(self):
+        self._stop_event.set()
+
+    def run(self):
+        # The job queue is served by a fresh process (spawned, not forked from this Qt process)
+        coordinator = distributed.Coordinator(self.port, self.authkey, host=self.host,
+                                              lease_timeout=self.lease_timeout,
+                                              mp_context=multiprocessing.get_context('spawn'))
+        try:
+            specs = self.specs
+            if self.result_cache is not None:
+                cached_runs, specs = self.result_cache.split(specs)
+                for spec, result in cached_runs:
+                    self.result_ready.emit(spec, result)
+            coordinator.start()
+            queue = coordinator.queue
+            queue.submit(specs)
+            while True:
+                # Results and status come together, so the last results are in when no job is left
+                results, status = queue.poll()
+                for spec, result in results:
+                    if self.result_cache is not None:
+                        self.result_cache.put(spec, result)
+                    self.result_ready.emit(spec, result)
+                self.status.emit(status)
+                if status['pending'] == 0 and status['running'] == 0 or self._stop_event.wait(self.poll_interval):
+                    break
+            failures = queue.failures()
+        except Exception as error:
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(dict(cancelled=self._stop_event.is_set(), failed=len(failures)))
+        finally:
+            if coordinator.queue is not None:
+                coordinator.shutdown()
+
+
+class DistributedDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch on Remote Workers")
+
+        self.qPort = QtWidgets.QSpinBox()
+        self.qPort.setRange(1024, 65535)
+        self.qPort.setValue(distributed.DEFAULT_PORT)
+        self.qAuthKey = QtWidgets.QLineEdit(secrets.token_hex(8))
+        self.qAuthKey.setToolTip("Key shared with the workers; anyone with it can send jobs to them")
+        self.qLeaseTimeout = QtWidgets.QSpinBox()
+        self.qLeaseTimeout.setRange(10, 24 * 3600)
+        self.qLeaseTimeout.setValue(300)
+        self.qLeaseTimeout.setSuffix(" s")
+        self.qLeaseTimeout.setToolTip("Time without news from a worker before its job is handed to another one")
+        self.qLocalOnly = QtWidgets.QCheckBox("Only workers on this machine")
+        self.qCommand = QtWidgets.QPlainTextEdit()
+        self.qCommand.setReadOnly(True)
+        self.qCommand.setMaximumHeight(60)
+
+        form_layout = QtWidgets.QFormLayout()
+        form_layout.addRow("Port:", self.qPort)
+        form_layout.addRow("Key:", self.qAuthKey)
+        form_layout.addRow("Lease timeout:", self.qLeaseTimeout)
+        form_layout.addRow(self.qLocalOnly)
+        form_layout.addRow(QtWidgets.QLabel("Start the workers with:"))
+        form_layout.addRow(self.qCommand)
+
+        self.buttonBox = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel)
+        self.buttonBox.button(QtWidgets.QDialogButtonBox.StandardButton.Ok).setText("Start")
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+        form_layout.addRow(self.buttonBox)
+        self.setLayout(form_layout)
+        self.resize(520, 0)
+
+        for signal in [self.qPort.valueChanged, self.qAuthKey.textChanged, self.qLocalOnly.stateChanged]:
+            signal.connect(self.update_command)
+        self.update_command()
+
+    @property
+    def host(self):
+        return '127.0.0.1' if self.qLocalOnly.isChecked() else ''
+
+    def update_command(self):
+        host = 'localhost' if self.qLocalOnly.isChecked() else socket.gethostname()
+        self.qCommand.setPlainText(f"python -m customhys_qt.distributed {host}:{self.qPort.value()} "
+                                   f"--authkey {self.qAuthKey.text()} --processes 4")
+
+
+class ConvergencePlot:
+    # Runs drawn as single lines before merging all of them in a LineCollection
+    max_lines = 50
+
+    def __init__(self, canvas, ax):
+        self.canvas = canvas
+        self.ax = ax
+        self.lines = []
+        self.segments = []
+        self.collection = None
+        self.new_artists = []
+        self.limits = None
+        self.limits_changed = False
+        self.colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+
+    def clear(self):
+        self.ax.clear()
+        self.ax.set_xlabel('Iteration')
+        self.ax.set_ylabel('Fitness')
+        self.lines = []
+        self.segments = []
+        self.collection = None
+        self.new_artists = []
+        self.limits = None
+        self.limits_changed = True
+
+    def add_curve(self, fitness_values):
+        # Keep at most two points per pixel of the axes
+        max_points = max(2 * int(self.ax.bbox.width), 100)
+        x, y = decimation.downsample(fitness_values, max_points)
+        segment = np.column_stack([x, y])
+        self.segments.append(segment)
+        color = self.colors[(len(self.segments) - 1) % len(self.colors)]
+
+        if self.collection is None and len(self.segments) > self.max_lines:
+            # From now on, all the curves are a single artist
+            for line in self.lines:
+                line.remove()
+            self.lines = []
+            self.collection = LineCollection(self.segments, linewidths=plt.rcParams['lines.linewidth'],
+                                             colors=[self.colors[k % len(self.colors)]
+                                                     for k in range(len(self.segments))])
+            self.ax.add_collection(self.collection)
+            self.new_artists = []
+            self.limits_changed = True
+        elif self.collection is not None:
+            self.collection.set_segments(self.segments)
+            self.collection.set_color([self.colors[k % len(self.colors)] for k in range(len(self.segments))])
+            self.new_artists = [self.collection]
+        else:
+            line, = self.ax.plot(x, y, color=color)
+            self.lines.append(line)
+            self.new_artists.append(line)
+
+        # Expand the limits (if needed)
+        finite_y = y[np.isfinite(y)]
+        if finite_y.size > 0:
+            curve_limits = [0, max(x[-1], 1), finite_y.min(), finite_y.max()]
+            if self.limits is None:
+                self.limits = curve_limits
+                self.limits_changed = True
+            elif curve_limits[1] > self.limits[1] or curve_limits[2] < self.limits[2] or \
+                    curve_limits[3] > self.limits[3]:
+                self.limits = [0, max(self.limits[1], curve_limits[1]), min(self.limits[2], curve_limits[2]),
+                               max(self.limits[3], curve_limits[3])]
+                self.limits_changed = True
+
+    def draw_into(self, ax):
+        # Draw all the curves into other axes, sharing their (decimated) data
+        ax.set_xlabel('Iteration')
+        ax.set_ylabel('Fitness')
+        if not self.segments:
+            return
+        ax.add_collection(LineCollection(self.segments, linewidths=plt.rcParams['lines.linewidth'],
+                                         colors=[self.colors[k % len(self.colors)]
+                                                 for k in range(len(self.segments))]))
+        margin = 0.05 * (self.limits[3] - self.limits[2]) or 0.5
+        ax.set_xlim(self.limits[0], self.limits[1])
+        ax.set_ylim(self.limits[2] - margin, self.limits[3] + margin)
+
+    def update(self, force_draw=False):
+        # Blit the new curves if the view does not change, otherwise request a full redraw
+        if (self.limits_changed or force_draw) and self.limits is not None:
+            margin = 0.05 * (self.limits[3] - self.limits[2]) or 0.5
+            self.ax.set_xlim(self.limits[0], self.limits[1])
+            self.ax.set_ylim(self.limits[2] - margin, self.limits[3] + margin)
+
+        if force_draw or self.limits_changed or not self.canvas.blit_artists(self.ax, self.new_artists):
+            self.canvas.request_draw()
+        self.limits_changed = False
+        self.new_artists = []
+
+
+class SweepWindow(QMainWindow):
+    # Minimum time (ms) between two redraws of the heatmap
+    update_interval = 500
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.setWindowTitle("Sweep")
+        self.grid = None
+        self.image = None
+        self.writer = None
+        self.run_thread = None
+        self.run_worker = None
+        self.dirty = False
+
+        # Problems (rows of the heatmap)
+        self.qProblems = QListWidget()
+        for problem_name in main_window.problem_names:
+            item = QListWidgetItem(problem_name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if problem_name == main_window.qProblemName.currentText()
+                               else Qt.CheckState.Unchecked)
+            self.qProblems.addItem(item)
+        all_button = QtWidgets.QPushButton("All")
+        all_button.clicked.connect(lambda: self.check_problems(Qt.CheckState.Checked))
+        none_button = QtWidgets.QPushButton("None")
+        none_button.clicked.connect(lambda: self.check_problems(Qt.CheckState.Unchecked))
+
+        # Dimensions, repetitions, and export of the runs
+        self.qDimensions = QtWidgets.QLineEdit("2, 10")
+        self.qDimensions.setToolTip("Comma-separated dimensionalities (columns of the heatmap)")
+        self.qRepetitions = QtWidgets.QSpinBox()
+        self.qRepetitions.setRange(1, 10000)
+        self.qRepetitions.setValue(max(int(main_window.num_rep or 1), 1))
+        self.qExportPath = QtWidgets.QLineEdit()
+        self.qExportPath.setPlaceholderText("no export")
+        self.qExportPath.setToolTip("CSV file where each finished run is appended")
+        browse_button = QtWidgets.QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_export_path)
+        self.qStartButton = QtWidgets.QPushButton("Start")
+        self.qStartButton.clicked.connect(self.start)
+        self.qCancelButton = QtWidgets.QPushButton("Cancel")
+        self.qCancelButton.setEnabled(False)
+        self.qCancelButton.clicked.connect(self.cancel)
+        self.qProgress = QtWidgets.QProgressBar()
+
+        # Heatmap of the results, it grows with the number of problems
+        self.figure = Figure((5, 4), tight_layout=True)
+        self.canvas = FigureCanvas(self.figure)
+        scroll_area = QtWidgets.QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(self.canvas)
+
+        settings_layout = QtWidgets.QFormLayout()
+        settings_layout.addRow("Dimensions:", self.qDimensions)
+        settings_layout.addRow("Repetitions:", self.qRepetitions)
+        export_layout = QtWidgets.QHBoxLayout()
+        export_layout.addWidget(self.qExportPath)
+        export_layout.addWidget(browse_button)
+        settings_layout.addRow("Export:", export_layout)
+        check_layout = QtWidgets.QHBoxLayout()
+        check_layout.addWidget(all_button)
+        check_layout.addWidget(none_button)
+        run_layout = QtWidgets.QHBoxLayout()
+        run_layout.addWidget(self.qStartButton)
+        run_layout.addWidget(self.qCancelButton)
+        left_layout = QtWidgets.QVBoxLayout()
+        left_layout.addWidget(QtWidgets.QLabel("Problems:"))
+        left_layout.addWidget(self.qProblems)
+        left_layout.addLayout(check_layout)
+        left_layout.addLayout(settings_layout)
+        left_layout.addLayout(run_layout)
+        left_layout.addWidget(self.qProgress)
+        layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(left_layout, 1)
+        layout.addWidget(scroll_area, 3)
+        central_widget = QtWidgets.QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+        self.resize(1000, 600)
+
+        self.update_timer = QtCore.QTimer(self)
+        self.update_timer.setInterval(self.update_interval)
+        self.update_timer.timeout.connect(self.update_heatmap)
+
+    def check_problems(self, state):
+        for row in range(self.qProblems.count()):
+            self.qProblems.item(row).setCheckState(state)
+
+    def browse_export_path(self):
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Runs", "", export_file_filter())
+        if file_path:
+            self.qExportPath.setText(file_path)
+
+    def start(self):
+        main_window = self.main_window
+        problem_names = [self.qProblems.item(row).text() for row in range(self.qProblems.count())
+                         if self.qProblems.item(row).checkState() == Qt.CheckState.Checked]
+        try:
+            dimensions = sorted({int(value) for value in self.qDimensions.text().replace(',', ' ').split()})
+            if not dimensions or min(dimensions) < 1:
+                raise ValueError("the dimensions must be positive integers")
+        except ValueError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Invalid dimensions: {error}")
+            return
+        if not problem_names or main_window.qMetaheuristic.count() == 0:
+            QtWidgets.QErrorMessage(self).showMessage("Choose at least one problem and one search operator!")
+            return
+        if self.run_worker is not None or not main_window.check_stopping_policies():
+            return
+
+        seed_text = main_window.qSeed.text().strip()
+        base_seed = int(seed_text) if main_window.is_a_valid_int(seed_text) else None
+        try:
+            base_spec = main_window.current_spec()
+        except ValueError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Invalid run settings: {error}")
+            return
+        specs = sweep.make_sweep_specs(base_spec, problem_names, dimensions, self.qRepetitions.value(), base_seed)
+        self.writer = None
+        if self.qExportPath.text().strip():
+            try:
+                self.writer = export.RunWriter(self.qExportPath.text().strip(),
+                                               curves=main_window.export_curves_action.isChecked())
+            except (OSError, ValueError) as error:
+                QtWidgets.QErrorMessage(self).showMessage(f"Export file not opened: {error}")
+                return
+
+        self.grid = sweep.SweepGrid(problem_names, dimensions, self.qRepetitions.value())
+        self.setup_heatmap()
+
+        self.run_thread = QtCore.QThread(self)
+        self.run_worker = BatchWorker(specs, max_workers=main_window.qWorkers.value(),
+                                      result_cache=main_window.current_result_cache())
+        self.run_worker.moveToThread(self.run_thread)
+        self.run_thread.started.connect(self.run_worker.run)
+        self.run_worker.result_ready.connect(self.result_ready)
+        self.run_worker.finished.connect(self.finished)
+        self.run_worker.failed.connect(self.failed)
+        self.run_worker.finished.connect(self.run_thread.quit)
+        self.run_worker.failed.connect(self.run_thread.quit)
+        self.run_thread.finished.connect(self.run_worker.deleteLater)
+        self.run_thread.finished.connect(self.run_thread.deleteLater)
+
+        self.set_running(True)
+        self.qProgress.setRange(0, len(specs))
+        self.qProgress.setValue(0)
+        self.update_timer.start()
+        self.run_thread.start()
+
+    def set_running(self, is_running):
+        self.qStartButton.setEnabled(not is_running)
+        self.qCancelButton.setEnabled(is_running)
+
+    def cancel(self):
+        if self.run_worker is not None:
+            self.run_worker.cancel()
+
+    def setup_heatmap(self):
+        grid = self.grid
+        self.figure.clear()
+        self.figure.set_size_inches(max(3.0, 1.0 + 0.8 * len(grid.dimensions)),
+                                    max(3.0, 1.0 + 0.22 * len(grid.problem_names)))
+        self.canvas.setMinimumHeight(int(self.figure.get_size_inches()[1] * self.figure.dpi))
+        ax = self.figure.subplots(1, 1)
+        cmap = plt.get_cmap('viridis').copy()
+        cmap.set_bad('lightgrey')
+        self.image = ax.imshow(grid.matrix(), cmap=cmap, aspect='auto', interpolation='nearest')
+        ax.set_xticks(range(len(grid.dimensions)))
+        ax.set_xticklabels([f"{value}D" for value in grid.dimensions])
+        ax.set_yticks(range(len(grid.problem_names)))
+        ax.set_yticklabels(grid.problem_names, fontsize='small')
+        self.figure.colorbar(self.image, ax=ax, label='log10(median error)')
+
+        def format_coord(x, y):
+            row, column = int(round(y)), int(round(x))
+            if 0 <= row < len(grid.problem_names) and 0 <= column < len(grid.dimensions):
+                cell_stats = grid.cell(row, column)
+                text = f"{grid.problem_names[row]}, {grid.dimensions[column]}D"
+                if cell_stats is None:
+                    return text + ": pending"
+                return text + f": median error {cell_stats.median:.4g} ({cell_stats.count} runs)"
+            return ""
+
+        ax.format_coord = format_coord
+        self.canvas.draw_idle()
+
+    def update_heatmap(self):
+        if not self.dirty or self.image is None:
+            return
+        self.dirty = False
+        values = self.grid.matrix()
+        self.image.set_data(values)
+        if np.isfinite(values).any():
+            low, high = np.nanmin(values), np.nanmax(values)
+            self.image.set_clim(low, high if high > low else low + 1)
+        self.canvas.draw_idle()
+
+    def result_ready(self, spec, result):
+        self.grid.add(spec, result)
+        if self.writer is not None:
+            self.writer.write(spec, result)
+        self.dirty = True
+        self.qProgress.setValue(self.grid.num_results)
+
+    def close_writer(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def finished(self, status):
+        self.run_worker = None
+        self.update_timer.stop()
+        self.update_heatmap()
+        self.close_writer()
+        self.set_running(False)
+        cancelled = " (cancelled)" if status['cancelled'] else ""
+        self.statusBar().showMessage(f"Sweep finished: {self.grid.num_results} of {self.grid.num_runs} runs"
+                                     f"{cancelled}")
+
+    def failed(self, message):
+        self.run_worker = None
+        self.update_timer.stop()
+        self.update_heatmap()
+        self.close_writer()
+        self.set_running(False)
+        QtWidgets.QErrorMessage(self).showMessage(f"Sweep failed: {message}")
+
+    def closeEvent(self, event):
+        # Stop the sweep (if so) before closing
+        self.cancel()
+        if self.run_thread is not None and self.run_worker is not None:
+            self.run_thread.quit()
+            self.run_thread.wait()
+        self.close_writer()
+        super().closeEvent(event)
+
+
+class SearchWorker(QtCore.QObject):
+    # Runs the stages of a tuner or a hyper-heuristic: the specs of a stage in parallel, then the next stage
+    result_ready = pyqtSignal()
+    stage_finished = pyqtSignal(object)  # record of the stage
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, search, max_workers=None, result_cache=None):
+        super().__init__()
+        self.search = search
+        self.max_workers = max_workers
+        self.result_cache = result_cache
+        self._stop_event = threading.Event()
+
+    def cancel(self):
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            while not self.search.is_done and not self._stop_event.is_set():
+                specs = self.search.specs()
+                if self.result_cache is not None:
+                    cached_runs, specs = self.result_cache.split(specs)
+                    for spec, result in cached_runs:
+                        self.search.add(spec, result)
+                        self.result_ready.emit()
+                for spec, result in engine.iter_batch(specs, self.max_workers, should_stop=self._stop_event.is_set,
+                                                      mp_context=multiprocessing.get_context('spawn'),
+                                                      with_specs=True):
+                    if self.result_cache is not None:
+                        self.result_cache.put(spec, result)
+                    self.search.add(spec, result)
+                    self.result_ready.emit()
+                if not self._stop_event.is_set():
+                    self.stage_finished.emit(self.search.advance())
+        except Exception as error:
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(dict(cancelled=self._stop_event.is_set()))
+
+
+class TunerWindow(QMainWindow):
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.setWindowTitle("Tune Parameters")
+        self.tuner = None
+        self.run_thread = None
+        self.run_worker = None
+        self.num_results = 0
+
+        # Operators to tune: one of the sequence or all of them
+        self.qOperators = QtWidgets.QComboBox()
+        self.qMethod = QtWidgets.QComboBox()
+        self.qMethod.addItems(["Successive halving", "Random search"])
+        self.qCandidates = QtWidgets.QSpinBox()
+        self.qCandidates.setRange(2, 10000)
+        self.qCandidates.setValue(27)
+        self.qRepetitions = QtWidgets.QSpinBox()
+        self.qRepetitions.setRange(1, 1000)
+        self.qRepetitions.setValue(3)
+        self.qIterations = QtWidgets.QSpinBox()
+        self.qIterations.setRange(1, 10 ** 7)
+        self.qIterations.setToolTip("Budget of the candidates in the last rung")
+        self.qEta = QtWidgets.QSpinBox()
+        self.qEta.setRange(2, 10)
+        self.qEta.setValue(3)
+        self.qEta.setToolTip("Only the best 1/eta of the candidates of a rung are promoted to the next one")
+        self.qMethod.currentIndexChanged.connect(lambda index: self.qEta.setEnabled(index == 0))
+        self.qStartButton = QtWidgets.QPushButton("Start")
+        self.qStartButton.clicked.connect(self.start)
+        self.qCancelButton = QtWidgets.QPushButton("Cancel")
+        self.qCancelButton.setEnabled(False)
+        self.qCancelButton.clicked.connect(self.cancel)
+        self.qApplyButton = QtWidgets.QPushButton("Apply Best")
+        self.qApplyButton.setEnabled(False)
+        self.qApplyButton.setToolTip("Write the best tuning into the list of search operators")
+        self.qApplyButton.clicked.connect(self.apply_best)
+        self.qProgress = QtWidgets.QProgressBar()
+
+        # Ranking of the candidates of each rung
+        self.qRanking = QtWidgets.QTableWidget(0, 4)
+        self.qRanking.setHorizontalHeaderLabels(['Rung', 'Iterations', 'Median fitness', 'Tuning'])
+        self.qRanking.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.qRanking.horizontalHeader().setStretchLastSection(True)
+        self.qRanking.verticalHeader().setVisible(False)
+
+        settings_layout = QtWidgets.QFormLayout()
+        settings_layout.addRow("Operators:", self.qOperators)
+        settings_layout.addRow("Method:", self.qMethod)
+        settings_layout.addRow("Candidates:", self.qCandidates)
+        settings_layout.addRow("Repetitions:", self.qRepetitions)
+        settings_layout.addRow("Iterations:", self.qIterations)
+        settings_layout.addRow("Eta:", self.qEta)
+        run_layout = QtWidgets.QHBoxLayout()
+        run_layout.addWidget(self.qStartButton)
+        run_layout.addWidget(self.qCancelButton)
+        run_layout.addWidget(self.qApplyButton)
+        left_layout = QtWidgets.QVBoxLayout()
+        left_layout.addLayout(settings_layout)
+        left_layout.addLayout(run_layout)
+        left_layout.addWidget(self.qProgress)
+        left_layout.addStretch(1)
+        layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(left_layout, 1)
+        layout.addWidget(self.qRanking, 3)
+        central_widget = QtWidgets.QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+        self.resize(1000, 500)
+        self.load_sequence()
+
+    def load_sequence(self):
+        # Read the sequence of the main window (unless a search is running)
+        if self.run_worker is not None:
+            return
+        main_window = self.main_window
+        current_row = main_window.qMetaheuristic.currentRow()
+        self.qOperators.clear()
+        self.qOperators.addItem("All operators")
+        for row in range(main_window.qMetaheuristic.count()):
+            operator = main_window.qMetaheuristic.item(row).data(Qt.ItemDataRole.UserRole)
+            self.qOperators.addItem(f"{row + 1}. {operator.pretty_name}")
+        self.qOperators.setCurrentIndex(current_row + 1 if current_row >= 0 else 0)
+        if main_window.is_a_valid_int(main_window.qIterations.text()):
+            self.qIterations.setValue(max(int(main_window.qIterations.text()), 1))
+
+    def start(self):
+        main_window = self.main_window
+        if main_window.qMetaheuristic.count() == 0:
+            QtWidgets.QErrorMessage(self).showMessage("Add at least one search operator!")
+            return
+        if self.run_worker is not None or not main_window.check_stopping_policies():
+            return
+
+        seed_text = main_window.qSeed.text().strip()
+        base_seed = int(seed_text) if main_window.is_a_valid_int(seed_text) else None
+        index = self.qOperators.currentIndex()
+        try:
+            base_spec = dict(main_window.current_spec(), iterations=self.qIterations.value())
+            self.tuner = tuning.Tuner(base_spec, tuning_space, indices=None if index <= 0 else [index - 1],
+                                      num_candidates=self.qCandidates.value(), repetitions=self.qRepetitions.value(),
+                                      method=tuning.METHODS[self.qMethod.currentIndex()], eta=self.qEta.value(),
+                                      seed=base_seed)
+        except ValueError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Tuning not started: {error}")
+            return
+
+        self.num_results = 0
+        self.qRanking.setRowCount(0)
+        self.run_thread = QtCore.QThread(self)
+        self.run_worker = SearchWorker(self.tuner, max_workers=main_window.qWorkers.value(),
+                                       result_cache=main_window.current_result_cache())
+        self.run_worker.moveToThread(self.run_thread)
+        self.run_thread.started.connect(self.run_worker.run)
+        self.run_worker.result_ready.connect(self.result_ready)
+        self.run_worker.stage_finished.connect(self.rung_finished)
+        self.run_worker.finished.connect(self.finished)
+        self.run_worker.failed.connect(self.failed)
+        self.run_worker.finished.connect(self.run_thread.quit)
+        self.run_worker.failed.connect(self.run_thread.quit)
+        self.run_thread.finished.connect(self.run_worker.deleteLater)
+        self.run_thread.finished.connect(self.run_thread.deleteLater)
+
+        self.set_running(True)
+        self.qProgress.setRange(0, self.tuner.num_runs)
+        self.qProgress.setValue(0)
+        self.run_thread.start()
+
+    def set_running(self, is_running):
+        self.qStartButton.setEnabled(not is_running)
+        self.qCancelButton.setEnabled(is_running)
+        self.qApplyButton.setEnabled(not is_running and self.tuner is not None and bool(self.tuner.history))
+        for widget in [self.qOperators, self.qMethod, self.qCandidates, self.qRepetitions, self.qIterations]:
+            widget.setEnabled(not is_running)
+        self.qEta.setEnabled(not is_running and self.qMethod.currentIndex() == 0)
+
+    def cancel(self):
+        if self.run_worker is not None:
+            self.run_worker.cancel()
+
+    def result_ready(self):
+        self.num_results += 1
+        self.qProgress.setValue(self.num_results)
+
+    def rung_finished(self, record):
+        # The best candidates of the rung on top
+        for candidate, score in record['scores']:
+            row = self.qRanking.rowCount()
+            self.qRanking.insertRow(row)
+            label = self.tuner.describe(candidate) + (" (current)" if candidate == 0 else "")
+            for column, text in enumerate([str(record['rung'] + 1), str(record['iterations']), f"{score:.6g}", label]):
+                self.qRanking.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        self.qRanking.resizeColumnsToContents()
+
+    def finished(self, status):
+        self.run_worker = None
+        self.set_running(False)
+        if not self.tuner.history:
+            self.statusBar().showMessage("Tuning cancelled")
+            return
+        _, score = self.tuner.best()
+        cancelled = " (cancelled)" if status['cancelled'] else ""
+        self.statusBar().showMessage(f"Tuning finished{cancelled}: best median fitness {score:.6g} with "
+                                     f"{self.tuner.history[-1]['iterations']} iterations")
+
+    def failed(self, message):
+        self.run_worker = None
+        self.set_running(False)
+        QtWidgets.QErrorMessage(self).showMessage(f"Tuning failed: {message}")
+
+    def apply_best(self):
+        # The sequence must be the one that was tuned
+        qMetaheuristic = self.main_window.qMetaheuristic
+        sequence = [qMetaheuristic.item(row).data(Qt.ItemDataRole.UserRole) for row in range(qMetaheuristic.count())]
+        if sequence != self.tuner.operators:
+            QtWidgets.QErrorMessage(self).showMessage("The search operators changed since the tuning started!")
+            return
+        best_operators, _ = self.tuner.best()
+        for index in self.tuner.indices:
+            make_operator_item(best_operators[index], qMetaheuristic.item(index))
+        self.main_window.statusBar().showMessage("Best tuning applied to the search operators", 5000)
+
+    def closeEvent(self, event):
+        # Stop the tuning (if so) before closing
+        self.cancel()
+        if self.run_thread is not None and self.run_worker is not None:
+            self.run_thread.quit()
+            self.run_thread.wait()
+        super().closeEvent(event)
+
+
+class HyperheuristicWindow(QMainWindow):
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.setWindowTitle("Hyper-heuristic")
+        self.annealer = None
+        self.run_thread = None
+        self.run_worker = None
+
+        self.qMaxLength = QtWidgets.QSpinBox()
+        self.qMaxLength.setRange(1, 50)
+        self.qMaxLength.setValue(5)
+        self.qSteps = QtWidgets.QSpinBox()
+        self.qSteps.setRange(1, 100000)
+        self.qSteps.setValue(30)
+        self.qNeighbours = QtWidgets.QSpinBox()
+        self.qNeighbours.setRange(1, 1000)
+        self.qNeighbours.setValue(max(main_window.qWorkers.value() // 3, 1))
+        self.qNeighbours.setToolTip("Sequences proposed (and evaluated in parallel) on each step")
+        self.qRepetitions = QtWidgets.QSpinBox()
+        self.qRepetitions.setRange(1, 1000)
+        self.qRepetitions.setValue(3)
+        self.qTemperature = QtWidgets.QDoubleSpinBox()
+        self.qTemperature.setRange(0.001, 1000.0)
+        self.qTemperature.setDecimals(3)
+        self.qTemperature.setValue(1.0)
+        self.qTemperature.setToolTip("Initial temperature, on the relative change of the median fitness")
+        self.qCooling = QtWidgets.QDoubleSpinBox()
+        self.qCooling.setRange(0.01, 1.0)
+        self.qCooling.setSingleStep(0.01)
+        self.qCooling.setValue(0.9)
+        self.qStartButton = QtWidgets.QPushButton("Start")
+        self.qStartButton.clicked.connect(self.start)
+        self.qCancelButton = QtWidgets.QPushButton("Cancel")
+        self.qCancelButton.setEnabled(False)
+        self.qCancelButton.clicked.connect(self.cancel)
+        self.qLoadButton = QtWidgets.QPushButton("Load Best")
+        self.qLoadButton.setEnabled(False)
+        self.qLoadButton.setToolTip("Replace the list of search operators with the best sequence")
+        self.qLoadButton.clicked.connect(self.load_best)
+        self.qProgress = QtWidgets.QProgressBar()
+
+        # One row per annealing step
+        self.qSteps_Table = QtWidgets.QTableWidget(0, 6)
+        self.qSteps_Table.setHorizontalHeaderLabels(['Step', 'Move', 'Median fitness', 'Accepted', 'Best',
+                                                     'Sequence'])
+        self.qSteps_Table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.qSteps_Table.horizontalHeader().setStretchLastSection(True)
+        self.qSteps_Table.verticalHeader().setVisible(False)
+
+        settings_layout = QtWidgets.QFormLayout()
+        settings_layout.addRow("Max. length:", self.qMaxLength)
+        settings_layout.addRow("Steps:", self.qSteps)
+        settings_layout.addRow("Neighbours:", self.qNeighbours)
+        settings_layout.addRow("Repetitions:", self.qRepetitions)
+        settings_layout.addRow("Temperature:", self.qTemperature)
+        settings_layout.addRow("Cooling:", self.qCooling)
+        run_layout = QtWidgets.QHBoxLayout()
+        run_layout.addWidget(self.qStartButton)
+        run_layout.addWidget(self.qCancelButton)
+        run_layout.addWidget(self.qLoadButton)
+        left_layout = QtWidgets.QVBoxLayout()
+        left_layout.addLayout(settings_layout)
+        left_layout.addLayout(run_layout)
+        left_layout.addWidget(self.qProgress)
+        left_layout.addStretch(1)
+        layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(left_layout, 1)
+        layout.addWidget(self.qSteps_Table, 3)
+        central_widget = QtWidgets.QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+        self.resize(1000, 500)
+
+    def start(self):
+        # The search starts from the current sequence (if any) on the current problem and budget
+        main_window = self.main_window
+        if self.run_worker is not None or not main_window.check_stopping_policies():
+            return
+        seed_text = main_window.qSeed.text().strip()
+        try:
+            self.annealer = hyperheuristic.SequenceAnnealer(
+                main_window.current_spec(), heuristic_space, max_length=self.qMaxLength.value(),
+                num_steps=self.qSteps.value(), num_neighbours=self.qNeighbours.value(),
+                repetitions=self.qRepetitions.value(), temperature=self.qTemperature.value(),
+                cooling=self.qCooling.value(),
+                seed=int(seed_text) if main_window.is_a_valid_int(seed_text) else None)
+        except ValueError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Search not started: {error}")
+            return
+
+        self.qSteps_Table.setRowCount(0)
+        self.run_thread = QtCore.QThread(self)
+        self.run_worker = SearchWorker(self.annealer, max_workers=main_window.qWorkers.value(),
+                                       result_cache=main_window.current_result_cache())
+        self.run_worker.moveToThread(self.run_thread)
+        self.run_thread.started.connect(self.run_worker.run)
+        self.run_worker.stage_finished.connect(self.step_finished)
+        self.run_worker.finished.connect(self.finished)
+        self.run_worker.failed.connect(self.failed)
+        self.run_worker.finished.connect(self.run_thread.quit)
+        self.run_worker.failed.connect(self.run_thread.quit)
+        self.run_thread.finished.connect(self.run_worker.deleteLater)
+        self.run_thread.finished.connect(self.run_thread.deleteLater)
+
+        self.set_running(True)
+        self.qProgress.setRange(0, self.annealer.num_steps + 1)
+        self.qProgress.setValue(0)
+        self.run_thread.start()
+
+    def set_running(self, is_running):
+        self.qStartButton.setEnabled(not is_running)
+        self.qCancelButton.setEnabled(is_running)
+        self.qLoadButton.setEnabled(not is_running and self.annealer is not None and bool(self.annealer.history))
+        for widget in [self.qMaxLength, self.qSteps, self.qNeighbours, self.qRepetitions, self.qTemperature,
+                       self.qCooling]:
+            widget.setEnabled(not is_running)
+
+    def cancel(self):
+        if self.run_worker is not None:
+            self.run_worker.cancel()
+
+    def step_finished(self, record):
+        row = self.qSteps_Table.rowCount()
+        self.qSteps_Table.insertRow(row)
+        sequence = ", ".join(operator.pretty_name for operator in record['sequence'])
+        for column, text in enumerate([str(record['step']), record['move'], f"{record['score']:.6g}",
+                                       "yes" if record['accepted'] else "no", f"{record['best_score']:.6g}",
+                                       sequence]):
+            self.qSteps_Table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        self.qSteps_Table.scrollToBottom()
+        self.qProgress.setValue(record['step'] + 1)
+        self.statusBar().showMessage(f"Step {record['step']}: {record['evaluated']} sequences evaluated, "
+                                     f"temperature {record['temperature']:.3g}")
+
+    def finished(self, status):
+        self.run_worker = None
+        self.set_running(False)
+        if not self.annealer.history:
+            self.statusBar().showMessage("Search cancelled")
+            return
+        cancelled = " (cancelled)" if status['cancelled'] else ""
+        self.statusBar().showMessage(f"Search finished{cancelled}: best median fitness {self.annealer.best_score:.6g}"
+                                     f" of {len(self.annealer.memo)} sequences evaluated")
+
+    def failed(self, message):
+        self.run_worker = None
+        self.set_running(False)
+        QtWidgets.QErrorMessage(self).showMessage(f"Search failed: {message}")
+
+    def load_best(self):
+        qMetaheuristic = self.main_window.qMetaheuristic
+        qMetaheuristic.clear()
+        for operator in self.annealer.best:
+            qMetaheuristic.addItem(make_operator_item(operator.copy()))
+        qMetaheuristic.setCurrentRow(0)
+        self.main_window.statusBar().showMessage("Best sequence loaded into the search operators", 5000)
+
+    def closeEvent(self, event):
+        # Stop the search (if so) before closing
+        self.cancel()
+        if self.run_thread is not None and self.run_worker is not None:
+            self.run_thread.quit()
+            self.run_thread.wait()
+        super().closeEvent(event)
+
+
+class PopulationWindow(QMainWindow):
+    # Time (ms) between two frames of the animation
+    frame_interval = 40
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.setWindowTitle("Population")
+        self.frames = None
+        self.is_live = False
+        self.shown_iteration = None
+        self.background = None
+
+        self.figure = Figure((5, 4.5), tight_layout=True)
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect('draw_event', self.save_background)
+        self.ax = self.figure.subplots(1, 1)
+
+        # Replay of the recorded frames once the run finishes
+        self.qPlayButton = QtWidgets.QPushButton("Play")
+        self.qPlayButton.setCheckable(True)
+        self.qPlayButton.setEnabled(False)
+        self.qPlayButton.toggled.connect(self.toggle_play)
+        self.qFrame = QtWidgets.QSlider(Qt.Orientation.Horizontal)
+        self.qFrame.setEnabled(False)
+        self.qFrame.valueChanged.connect(self.show_frame)
+        self.qFrameLabel = QtWidgets.QLabel("--")
+        self.qFrameLabel.setMinimumWidth(110)
+
+        controls_layout = QtWidgets.QHBoxLayout()
+        controls_layout.addWidget(self.qPlayButton)
+        controls_layout.addWidget(self.qFrame)
+        controls_layout.addWidget(self.qFrameLabel)
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.canvas)
+        layout.addLayout(controls_layout)
+        central_widget = QtWidgets.QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+        self.resize(600, 600)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.frame_interval)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self, frames, problem_name, low_boundary, upp_boundary):
+        # Contour of the landscape (the grid of the 3D preview) with the agents over it
+        self.frames = frames
+        self.is_live = True
+        self.shown_iteration = None
+        self.qPlayButton.setChecked(False)
+        self.qPlayButton.setEnabled(False)
+        self.qFrame.setEnabled(False)
+
+        grid = self.main_window.get_landscape(problem_name, low_boundary, upp_boundary)
+        self.figure.clear()
+        self.ax = self.figure.subplots(1, 1)
+        self.ax.contourf(grid['x'], grid['y'], grid['z'], levels=30, cmap='jet', alpha=0.8)
+        self.ax.set_xlim(low_boundary, upp_boundary)
+        self.ax.set_ylim(low_boundary, upp_boundary)
+        self.ax.set_xlabel('$x_1$')
+        self.ax.set_ylabel('$x_2$')
+        self.ax.set_aspect('equal')
+        self.agents = self.ax.scatter([], [], s=12, c='white', edgecolors='black', linewidths=0.5, animated=True)
+        self.centroid, = self.ax.plot([], [], marker='+', color='red', markersize=12, mew=2, linestyle='none',
+                                      animated=True)
+        self.title = self.ax.set_title("Iteration --", animated=True)
+        self.background = None
+        self.canvas.draw()
+        self.timer.start()
+
+    def save_background(self, event):
+        # The static part (landscape and axes) is drawn once, the agents are blitted over it
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.shown_iteration = None
+
+    def draw_agents(self, iteration, positions, centroid):
+        self.agents.set_offsets(positions)
+        self.centroid.set_data([centroid[0]], [centroid[1]])
+        self.title.set_text(f"Iteration {iteration}")
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        for artist in [self.agents, self.centroid, self.title]:
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def tick(self):
+        if self.is_live:
+            # Only the last positions, the run may go on faster than the animation
+            iteration, positions, centroid = self.frames.latest()
+            if positions is not None and iteration != self.shown_iteration:
+                self.shown_iteration = iteration
+                self.draw_agents(iteration, positions, centroid)
+        elif self.qPlayButton.isChecked():
+            if self.qFrame.value() < self.qFrame.maximum():
+                self.qFrame.setValue(self.qFrame.value() + 1)
+            else:
+                self.qPlayButton.setChecked(False)
+
+    def stop_live(self):
+        # The run is over: its recorded frames can be replayed
+        self.is_live = False
+        if self.frames is None or len(self.frames) == 0:
+            self.timer.stop()
+            self.qFrameLabel.setText("no frames")
+            return
+        self.qFrame.blockSignals(True)
+        self.qFrame.setRange(0, len(self.frames) - 1)
+        self.qFrame.setValue(len(self.frames) - 1)
+        self.qFrame.blockSignals(False)
+        self.qFrame.setEnabled(True)
+        self.qPlayButton.setEnabled(True)
+        self.qFrameLabel.setText(f"{len(self.frames)} frames")
+
+    def toggle_play(self, is_playing):
+        if is_playing and self.qFrame.value() == self.qFrame.maximum():
+            self.qFrame.setValue(0)
+        self.qPlayButton.setText("Pause" if is_playing else "Play")
+
+    def show_frame(self, index):
+        iteration, positions, centroid = self.frames.frame(index)
+        self.draw_agents(iteration, positions, centroid)
+        self.qFrameLabel.setText(f"frame {index + 1}/{len(self.frames)}")
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.qPlayButton.setChecked(False)
+        super().closeEvent(event)
+
+
 class MainWindow(QMainWindow):
+    # Views of the problem landscape; the 2D ones are much cheaper to draw than the shaded 3D surface
+    preview_modes = ['3D surface', 'Contour', 'Heatmap']
+
+    # Samples per axis of the preview grids: a coarse grid is drawn at once, and then the full one
+    preview_levels = (16, 50)
+
+    # Time (ms) a problem must stay selected before its full grid is computed
+    refine_delay = 250
+
     def __init__(self):
         super(MainWindow, self).__init__()
         self.num_iterations = None
@@ -305,36 +1466,39 @@ class MainWindow(QMainWindow):
         self.upp_boundary = None
         self.low_boundary = None
         self.run_counter = 0
-        self.worst_fitness = None
-        self.worst_position = None
-        self.worst_centroid = None
-        self.worst_time = None
-        self.best_time = None
+        self.run_store = store.RunStore()
+        self.history_spec = None
+        self.best_run = None
+        self.worst_run = None
         self.best_fitness = None
-        self.best_position = None
-        self.best_centroid = None
-        self.historical_time = []
-        self.historical_fitness_values = []
+        self.worst_fitness = None
+        self.fitness_stats = stats.RunningStats()
+        self.time_stats = stats.RunningStats()
+        self.iteration_stats = stats.RunningStats()
+        self.evaluation_stats = stats.RunningStats()
+        self.rate_stats = stats.RunningStats()
+        self.share_stats = stats.RunningStats()
+        self.evaluation_totals = telemetry.EvaluationTotals()
+        self.run_profile = None
+        self.run_thread = None
+        self.run_worker = None
+        self.landscape_cache = landscape.LandscapeCache()
+        self.result_cache = cache.ResultCache()
+        self.preview_key = None
+        self.population_window = None
+        self.last_result = None
+        self.pending_results = []
         loadUi(os.path.join(basedir, 'data', "customhys-qt.ui"), self)
         self.setWindowTitle("CUSTOMHyS-Qt")
         # self.setOrganizationName("jcrvz")
         # lock change size of the window
         # self.setFixedSize(self.size())
 
-        # Read all problems
-        self.problem_names = list(cbf.__all__)
-        if "CEC2005" in self.problem_names:
-            self.problem_names.remove("CEC2005")
-
-        inf_vals = dict()
-        sup_vals = dict()
-        # Read all functions and request their optimum data
-        for ii, function_name in enumerate(self.problem_names):
-            dummy_function = eval('cbf.{}({})'.format(function_name, 2))
-            inf_vals[function_name] = dummy_function.min_search_range
-            sup_vals[function_name] = dummy_function.max_search_range
-
-        self.problem_ranges = {prob: [inf_vals[prob][0], sup_vals[prob][0]] for prob in self.problem_names}
+        # Read all problems and their search ranges from the metadata index (problems are built only when selected)
+        problem_index = problems.load_problem_index(os.path.join(basedir, 'data', "problem_index.json"))
+        self.problem_names = list(problem_index['problems'])
+        self.problem_ranges = {prob: [info['min_search_range'], info['max_search_range']]
+                               for prob, info in problem_index['problems'].items()}
 
         # For visualising the problem in 2D
         # self.figure = Figure()
@@ -352,6 +1516,8 @@ class MainWindow(QMainWindow):
         self.canvas_hist = MyCanvas(figsize=(7, 2.2))
         self.figure_hist = self.canvas_hist.figure
         self.axs_hist = self.canvas_hist.ax
+        self.convergence_plot = ConvergencePlot(self.canvas_hist, self.axs_hist[0])
+        self.violin_time = 0.0
         self.axs_hist[0].set_xlabel('Iteration')
         self.axs_hist[1].set_xlabel('Iteration')
         self.axs_hist[0].set_ylabel('Fitness')
@@ -359,17 +1525,40 @@ class MainWindow(QMainWindow):
         self.canvas_hist.setStyleSheet("background-color:transparent;")
         self.qNumRep.setStyleSheet("background-color:transparent;")
         self.runLayout.addWidget(self.canvas_hist)
+        self.canvas.render = self.render_landscape
+        self.canvas_hist.render = self.render_history
 
         # self.verticalLayout.addWidget(self.toolbar)
 
-        # Set problem information
+        # Redraw the problem preview once the typing of the boundaries pauses
+        self.preview_timer = QtCore.QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(300)
+        self.preview_timer.timeout.connect(self.update_problem_view)
+
+        # The coarse preview is refined in a background thread, once the selection settles
+        self.qPreviewMode = QtWidgets.QComboBox()
+        self.qPreviewMode.addItems(self.preview_modes)
+        self.qPreviewMode.setToolTip("View of the landscape (the 2D views are faster to draw)")
+        self.qPreviewMode.currentTextChanged.connect(self.change_preview_mode)
+        self.formLayout.addRow("Preview:", self.qPreviewMode)
+        self.refine_key = None
+        self.landscape_threads = []
+        self.refine_timer = QtCore.QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(self.refine_delay)
+        self.refine_timer.timeout.connect(self.refine_preview)
+
+        # Set problem information (the first preview is drawn once the window is shown)
         self.qProblemName.addItems(self.problem_names)
-        self.update_problem_info(self.qProblemName.currentText())
+        QtCore.QTimer.singleShot(0, lambda: self.update_problem_info(self.qProblemName.currentText()))
 
         # Call the update function
         self.qProblemName.currentTextChanged.connect(self.update_problem_info)
-        self.qLowBound.textChanged.connect(self.update_problem_view)
-        self.qUppBound.textChanged.connect(self.update_problem_view)
+        self.qLowBound.textChanged.connect(self.preview_timer.start)
+        self.qUppBound.textChanged.connect(self.preview_timer.start)
+        self.qLowBound.editingFinished.connect(self.update_problem_view)
+        self.qUppBound.editingFinished.connect(self.update_problem_view)
 
         self._update_dimensions()
         self.qDimensionality.editingFinished.connect(self._update_dimensions)
@@ -383,6 +1572,69 @@ class MainWindow(QMainWindow):
         self.qRunButton.clicked.connect(self.run_button)
         self.qBatchRunButton.clicked.connect(self.batch_run_button)
 
+        # Cancel button and progress bar for the run in the background
+        self.qCancelButton = QtWidgets.QPushButton("Cancel")
+        self.qCancelButton.setEnabled(False)
+        self.qCancelButton.clicked.connect(self.cancel_button)
+        self.horizontalLayout_3.insertWidget(self.horizontalLayout_3.indexOf(self.qBatchRunButton) + 1,
+                                             self.qCancelButton)
+        self.qProgress = QtWidgets.QProgressBar()
+        self.qProgress.setVisible(False)
+        self.statusBar().addPermanentWidget(self.qProgress)
+
+        # Number of processes for batch runs and seed of the runs (random if empty)
+        self.qWorkers = QtWidgets.QSpinBox()
+        self.qWorkers.setRange(1, os.cpu_count() or 1)
+        self.qWorkers.setValue(os.cpu_count() or 1)
+        self.qWorkers.setToolTip("Number of processes for batch runs")
+        self.qSeed = QtWidgets.QLineEdit()
+        self.qSeed.setPlaceholderText("random")
+        self.qSeed.setMaximumWidth(80)
+        self.qSeed.setToolTip("Base seed of the runs (leave empty for random seeds)")
+        self.qSeed.returnPressed.connect(self.qSeed.clearFocus)
+        self.qProfile = QtWidgets.QCheckBox("Profile")
+        self.qProfile.setToolTip("Measure the time spent in each search operator (it slows the runs down a little)")
+        self.qLiveView = QtWidgets.QCheckBox("Live view")
+        self.qLiveView.setToolTip("Show the agents over the landscape while a single run goes on (2D view of the "
+                                  "first two dimensions)")
+        for widget in [QtWidgets.QLabel("Workers:"), self.qWorkers, QtWidgets.QLabel("Seed:"), self.qSeed,
+                       self.qProfile, self.qLiveView]:
+            self.horizontalLayout_3.addWidget(widget)
+
+        # Stopping policies that end the runs before their last iteration (see customhys_qt.stopping)
+        self.qTargetCheck = QtWidgets.QCheckBox("Target:")
+        self.qTarget = QtWidgets.QLineEdit()
+        self.qTarget.setPlaceholderText("optimum")
+        self.qTarget.setToolTip("Stop when the best fitness reaches this value (the optimum of the problem if empty)")
+        self.qStagnationCheck = QtWidgets.QCheckBox("Stagnation:")
+        self.qStagnation = QtWidgets.QLineEdit("50")
+        self.qStagnation.setToolTip("Stop after this number of iterations without improvement")
+        self.qTimeLimitCheck = QtWidgets.QCheckBox("Time (s):")
+        self.qTimeLimit = QtWidgets.QLineEdit("10")
+        self.qTimeLimit.setToolTip("Stop when a run takes this wall time")
+        self.qEvaluationsCheck = QtWidgets.QCheckBox("Evaluations:")
+        self.qEvaluations = QtWidgets.QLineEdit("10000")
+        self.qEvaluations.setToolTip("Stop before exceeding this number of fitness evaluations")
+        self.stopping_widgets = [(self.qTargetCheck, self.qTarget), (self.qStagnationCheck, self.qStagnation),
+                                 (self.qTimeLimitCheck, self.qTimeLimit), (self.qEvaluationsCheck, self.qEvaluations)]
+        stopping_layout = QtWidgets.QHBoxLayout()
+        stopping_layout.setSpacing(2)
+        stopping_layout.addWidget(QtWidgets.QLabel("Stop on:"))
+        for check_box, line_edit in self.stopping_widgets:
+            line_edit.setMaximumWidth(70)
+            line_edit.setEnabled(False)
+            line_edit.returnPressed.connect(line_edit.clearFocus)
+            check_box.toggled.connect(line_edit.setEnabled)
+            stopping_layout.addWidget(check_box)
+            stopping_layout.addWidget(line_edit)
+        stopping_layout.addStretch()
+        self.verticalLayout_2.addLayout(stopping_layout)
+
+        # Batch results are shown in throttled groups instead of one redraw per run
+        self.results_timer = QtCore.QTimer(self)
+        self.results_timer.setInterval(250)
+        self.results_timer.timeout.connect(self.flush_results)
+
         self._update_population()
         self.qPopulation.editingFinished.connect(self._update_population)
 
@@ -398,8 +1650,92 @@ class MainWindow(QMainWindow):
         self.qNumRep.textChanged.connect(self.update_num_rep)
         self.qNumRep.returnPressed.connect(self.qNumRep.clearFocus)
 
+        # Table with the statistics of the runs
+        self.info_model = QStandardItemModel(8, 6)
+        self.info_model.setVerticalHeaderLabels(["Fitness", "Position", "Centroid", "Time (s)", "Iterations",
+                                                 "Evaluations", "Evals/s", "Objective (%)"])
+        self.info_model.setHorizontalHeaderLabels(["Last", "Best", "Worst", "Mean", "Std. Dev.", "Median"])
+        for row in range(self.info_model.rowCount()):
+            for column in range(self.info_model.columnCount()):
+                self.info_model.setItem(row, column, QStandardItem("--"))
+        self.qInfo_Table.setModel(self.info_model)
+
+        # Table with the time breakdown of the profiled runs, next to the statistics
+        self.profile_model = QStandardItemModel(0, 7)
+        self.profile_model.setHorizontalHeaderLabels(["Calls", "Evals.", "Time (s)", "Share (%)", "Perturb. (s)",
+                                                      "Eval. (s)", "Select. (s)"])
+        self.qProfile_Table = QTableView()
+        self.qProfile_Table.setModel(self.profile_model)
+        self.qProfile_Table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.qProfile_Table.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed)
+        self.horizontalLayout_5.addWidget(self.qProfile_Table, alignment=Qt.AlignmentFlag.AlignTop)
+
         self.canvas_hist.setVisible(False)
         self.qInfo_Table.setVisible(False)
+        self.qProfile_Table.setVisible(False)
+
+        # Menu with the actions on files
+        file_menu = self.menuBar().addMenu("&File")
+        open_action = QAction("&Open Results...", self)
+        open_action.setShortcut(QKeySequence.StandardKey.Open)
+        open_action.triggered.connect(self.open_results)
+        file_menu.addAction(open_action)
+        self.save_action = QAction("&Save Results...", self)
+        self.save_action.setShortcut(QKeySequence.StandardKey.Save)
+        self.save_action.setEnabled(False)
+        self.save_action.triggered.connect(self.save_results)
+        file_menu.addAction(self.save_action)
+        self.export_profile_action = QAction("&Export Profile...", self)
+        self.export_profile_action.setEnabled(False)
+        self.export_profile_action.triggered.connect(self.export_profile)
+        file_menu.addAction(self.export_profile_action)
+        self.export_runs_action = QAction("Export &Batch Runs To...", self)
+        self.export_runs_action.setCheckable(True)
+        self.export_runs_action.setToolTip("Append every run of the next batches to a CSV or Parquet file")
+        self.export_runs_action.triggered.connect(self.choose_export_path)
+        file_menu.addAction(self.export_runs_action)
+        self.export_curves_action = QAction("Export Convergence &Curves", self)
+        self.export_curves_action.setCheckable(True)
+        self.export_curves_action.setToolTip("Include the fitness of every iteration in the exported runs")
+        file_menu.addAction(self.export_curves_action)
+        self.export_path = None
+        self.export_writer = None
+        file_menu.addSeparator()
+        self.use_cache_action = QAction("&Use Result Cache", self)
+        self.use_cache_action.setCheckable(True)
+        self.use_cache_action.setChecked(True)
+        self.use_cache_action.setToolTip("Reuse the results of runs with the same configuration and seed")
+        file_menu.addAction(self.use_cache_action)
+        clear_cache_action = QAction("&Clear Result Cache", self)
+        clear_cache_action.triggered.connect(self.result_cache.clear)
+        file_menu.addAction(clear_cache_action)
+
+        # Menu with the experiments over several configurations
+        run_menu = self.menuBar().addMenu("&Run")
+        sweep_action = QAction("&Sweep...", self)
+        sweep_action.triggered.connect(self.open_sweep)
+        run_menu.addAction(sweep_action)
+        self.sweep_window = None
+        tune_action = QAction("&Tune Parameters...", self)
+        tune_action.triggered.connect(self.open_tuner)
+        run_menu.addAction(tune_action)
+        self.tuner_window = None
+        hyperheuristic_action = QAction("&Hyper-heuristic...", self)
+        hyperheuristic_action.triggered.connect(self.open_hyperheuristic)
+        run_menu.addAction(hyperheuristic_action)
+        self.hyperheuristic_window = None
+        distributed_action = QAction("Batch on Remote &Workers...", self)
+        distributed_action.triggered.connect(self.distributed_batch)
+        run_menu.addAction(distributed_action)
+        run_menu.addSeparator()
+        self.resume_action = QAction("&Resume Batch", self)
+        self.resume_action.setToolTip("Continue the last interrupted batch from its last checkpoint")
+        self.resume_action.setEnabled(os.path.exists(checkpoint.default_path()))
+        self.resume_action.triggered.connect(self.resume_batch)
+        run_menu.addAction(self.resume_action)
+        self.batch_checkpoint = None
+        if self.resume_action.isEnabled():
+            self.statusBar().showMessage("An interrupted batch can be resumed (Run > Resume Batch)")
 
         # Set focus on the search operators list
         self.qMetaheuristic.setFocus()
@@ -412,9 +1748,11 @@ class MainWindow(QMainWindow):
         item.setToolTip(item.text())
 
     def update_problem_info(self, problem_name):
-        # Set lower and upper boundaries
-        self.qLowBound.setText(f"{self.problem_ranges[problem_name][0]}")
-        self.qUppBound.setText(f"{self.problem_ranges[problem_name][1]}")
+        # Set lower and upper boundaries (without waiting for the typing pause)
+        for line_edit, value in zip([self.qLowBound, self.qUppBound], self.problem_ranges[problem_name]):
+            line_edit.blockSignals(True)
+            line_edit.setText(f"{value}")
+            line_edit.blockSignals(False)
         # self.qBoundaries.setText("{}, {}".format(*self.problem_ranges[problem_name]))
 
         self.update_problem_view()
@@ -428,15 +1766,14 @@ class MainWindow(QMainWindow):
             return False
 
     def update_problem_view(self):
-        # Load the problem to plot
-        problem_object = eval(f"cbf.{self.qProblemName.currentText()}(2)")
+        self.preview_timer.stop()
 
         # Read the lower and upper boundaries
         if self.is_a_valid_value(self.qLowBound.text()) and self.is_a_valid_value(self.qUppBound.text()):
             self.low_boundary = float(self.qLowBound.text())
             self.upp_boundary = float(self.qUppBound.text())
 
-        self.plot(problem_object, self.low_boundary, self.upp_boundary)
+        self.plot(self.qProblemName.currentText(), self.low_boundary, self.upp_boundary)
 
     @staticmethod
     def is_a_valid_int(text):
@@ -480,18 +1817,109 @@ class MainWindow(QMainWindow):
             dlg.exec()
 
     def batch_run_button(self):
-        # Check how many run remains
+        # Spread the repetitions over a pool of processes
+        specs = self.batch_specs()
+        if specs:
+            self.start_batch(specs)
+
+    def batch_specs(self):
+        # Specs of the repetitions still to do (None if the batch cannot start)
+        if self.run_worker is not None or not self.check_stopping_policies():
+            return None
         runs_to_do = int(self.num_rep) - int(self.qRunCount.text())
-        print(runs_to_do)
-        if runs_to_do > 0:
-            for _ in range(runs_to_do):
-                # Run the metaheuristic
-                self.run_button()
-        else:
+        if runs_to_do <= 0:
             self.qClearHist.setChecked(True)
             self.run_counter = 0
             self.qRunCount.setText("0")
-            self.batch_run_button()
+            runs_to_do = int(self.num_rep)
+
+        specs = []
+        for seed in self.next_seeds(runs_to_do):
+            spec = self.current_spec()
+            spec['seed'] = seed
+            spec['profile'] = self.qProfile.isChecked()
+            specs.append(spec)
+        self.update_history_spec()
+        return specs
+
+    def distributed_batch(self):
+        # Same batch, with the runs handed out to workers on other machines
+        if self.run_worker is not None or self.qMetaheuristic.count() == 0:
+            return
+        dialog = DistributedDialog(self)
+        if not dialog.exec():
+            return
+        specs = self.batch_specs()
+        if specs:
+            self.start_batch(specs, DistributedWorker(
+                specs, dialog.qPort.value(), dialog.qAuthKey.text().encode(), host=dialog.host,
+                lease_timeout=dialog.qLeaseTimeout.value(), result_cache=self.current_result_cache()))
+
+    def update_distributed_status(self, status):
+        self.statusBar().showMessage(f"Workers: {status['workers']}, jobs running: {status['running']}, "
+                                     f"pending: {status['pending']}, done: {status['done']}, "
+                                     f"failed: {status['failed']}")
+
+    def start_batch(self, specs, run_worker=None):
+        if self.export_path is not None:
+            try:
+                self.export_writer = export.RunWriter(self.export_path, curves=self.export_curves_action.isChecked())
+            except (OSError, ValueError) as error:
+                QtWidgets.QErrorMessage(self).showMessage(f"Export file not opened: {error}")
+                return
+        # The history is saved every now and then along with the pending runs, so the batch can be resumed
+        self.batch_checkpoint = checkpoint.BatchCheckpoint(checkpoint.default_path(), specs, self.num_rep)
+        self.resume_action.setEnabled(False)
+
+        self.run_thread = QtCore.QThread(self)
+        if run_worker is None:
+            run_worker = BatchWorker(specs, max_workers=self.qWorkers.value(),
+                                     result_cache=self.current_result_cache())
+        else:
+            run_worker.status.connect(self.update_distributed_status)
+        self.run_worker = run_worker
+        self.run_worker.moveToThread(self.run_thread)
+        self.run_thread.started.connect(self.run_worker.run)
+        self.run_worker.result_ready.connect(self.batch_result_ready)
+        self.run_worker.finished.connect(self.batch_finished)
+        self.run_worker.failed.connect(self.run_failed)
+        self.run_worker.finished.connect(self.run_thread.quit)
+        self.run_worker.failed.connect(self.run_thread.quit)
+        self.run_thread.finished.connect(self.run_worker.deleteLater)
+        self.run_thread.finished.connect(self.run_thread_finished)
+
+        self.set_running(True)
+        self.qProgress.setRange(0, len(specs))
+        self.qProgress.setValue(0)
+        self.results_timer.start()
+        self.run_thread.start()
+
+    def resume_batch(self):
+        if self.run_worker is not None:
+            return
+        try:
+            spec, run_results, pending_specs, repetitions = checkpoint.load_checkpoint(checkpoint.default_path())
+            operators = [search_operators.SearchOperator.from_tuple(operator) for operator in spec['operators']]
+        except (OSError, ValueError, KeyError) as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Invalid batch checkpoint: {error}")
+            return
+        self.load_history(spec, operators, run_results)
+        self.qNumRep.setText(f"{repetitions}")
+        if not pending_specs:
+            checkpoint.BatchCheckpoint(checkpoint.default_path(), [], repetitions).remove()
+            self.resume_action.setEnabled(False)
+            return
+        self.statusBar().showMessage(f"Resuming the batch: {len(run_results)} runs loaded, "
+                                     f"{len(pending_specs)} to go", 5000)
+        self.start_batch(pending_specs)
+
+    def save_checkpoint(self, force=False):
+        if self.batch_checkpoint is None:
+            return
+        try:
+            self.batch_checkpoint.save(self.run_store, self.history_spec, force=force)
+        except OSError as error:
+            self.statusBar().showMessage(f"Batch checkpoint not saved: {error}", 5000)
 
     def _update_dimensions(self):
         if self.is_a_valid_int(self.qDimensionality.text()) and int(self.qDimensionality.text()) > 0:
@@ -543,199 +1971,620 @@ class MainWindow(QMainWindow):
         #     float(self.qIterations.text())
         # except:
         #     QtWidgets.QErrorMessage(self).showMessage("Invalid iterations!")
-        dim = int(self.qDimensionality.text())
-        pop = int(self.qPopulation.text())
-        ite = int(self.qIterations.text())
+        if self.run_worker is not None or not self.check_stopping_policies():
+            return
+
+        spec = self.current_spec()
+        spec['seed'] = self.next_seeds(1)[0]
+        spec['profile'] = self.qProfile.isChecked()
+        self.update_history_spec()
+
+        # Positions of the agents for the live view (recorded by the run, drawn by the window)
+        frame_buffer = None
+        if self.qLiveView.isChecked():
+            frame_buffer = frames.FrameBuffer()
+            if self.population_window is None:
+                self.population_window = PopulationWindow(self)
+            self.population_window.start(frame_buffer, spec['problem'], *spec['boundaries'])
+            self.population_window.show()
+            self.population_window.raise_()
+
+        # Run simulation in a background thread
+        self.run_thread = QtCore.QThread(self)
+        self.run_worker = RunWorker(spec, result_cache=self.current_result_cache(), frames=frame_buffer)
+        self.run_worker.moveToThread(self.run_thread)
+        self.run_thread.started.connect(self.run_worker.run)
+        self.run_worker.progress.connect(self.update_run_progress)
+        self.run_worker.finished.connect(self.run_finished)
+        self.run_worker.failed.connect(self.run_failed)
+        self.run_worker.finished.connect(self.run_thread.quit)
+        self.run_worker.failed.connect(self.run_thread.quit)
+        self.run_thread.finished.connect(self.run_worker.deleteLater)
+        self.run_thread.finished.connect(self.run_thread_finished)
+
+        self.set_running(True)
+        self.qProgress.setRange(0, spec['iterations'])
+        self.qProgress.setValue(0)
+        self.run_thread.start()
+
+    def current_spec(self):
+        return dict(problem=self.qProblemName.currentText(),
+                    dimensions=int(self.qDimensionality.text()),
+                    boundaries=(float(self.qLowBound.text()), float(self.qUppBound.text())),
+                    population=int(self.qPopulation.text()),
+                    iterations=int(self.qIterations.text()),
+                    operators=[self.qMetaheuristic.item(x).data(Qt.ItemDataRole.UserRole).to_tuple()
+                               for x in range(self.qMetaheuristic.count())],
+                    **self.stopping_policies())
+
+    def stopping_policies(self):
+        # Spec keys of the enabled stopping policies, it raises ValueError if any value is invalid
+        policies = dict()
+        if self.qTargetCheck.isChecked():
+            text = self.qTarget.text().strip()
+            policies['target_fitness'] = float(text) if text else 'optimum'
+        if self.qStagnationCheck.isChecked():
+            policies['stagnation_iterations'] = int(self.qStagnation.text())
+        if self.qTimeLimitCheck.isChecked():
+            policies['time_limit'] = float(self.qTimeLimit.text())
+        if self.qEvaluationsCheck.isChecked():
+            policies['max_evaluations'] = int(self.qEvaluations.text())
+        stopping.StoppingPolicy.from_spec(policies)
+        return policies
+
+    def check_stopping_policies(self):
+        try:
+            self.stopping_policies()
+        except ValueError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Invalid stopping policy: {error}")
+            return False
+        return True
+
+    def open_sweep(self):
+        if self.sweep_window is None:
+            self.sweep_window = SweepWindow(self)
+        self.sweep_window.show()
+        self.sweep_window.raise_()
+
+    def open_tuner(self):
+        if self.tuner_window is None:
+            self.tuner_window = TunerWindow(self)
+        self.tuner_window.load_sequence()
+        self.tuner_window.show()
+        self.tuner_window.raise_()
+
+    def open_hyperheuristic(self):
+        if self.hyperheuristic_window is None:
+            self.hyperheuristic_window = HyperheuristicWindow(self)
+        self.hyperheuristic_window.show()
+        self.hyperheuristic_window.raise_()
+
+    def current_result_cache(self):
+        # The cache is bypassed when it is disabled in the File menu, and when the seeds are random (they never repeat)
+        if self.use_cache_action.isChecked() and self.is_a_valid_int(self.qSeed.text().strip()):
+            return self.result_cache
+        return None
+
+    def update_history_spec(self):
+        # Configuration saved along with the runs of the history (the one of its first run)
+        if self.qClearHist.isChecked() or self.history_spec is None:
+            self.history_spec = self.current_spec()
+            text = self.qSeed.text().strip()
+            if self.is_a_valid_int(text):
+                self.history_spec['seed'] = int(text)
+
+    def next_seeds(self, count):
+        # Seeds of the next runs in the history, derived from the base seed (if given)
+        text = self.qSeed.text().strip()
+        base_seed = int(text) if self.is_a_valid_int(text) else None
+        first_run = 0 if self.qClearHist.isChecked() else self.run_counter
+        return [engine.make_seed(base_seed, first_run + k) for k in range(count)]
+
+    def open_results(self):
+        file_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Results", "", "Results (*.npz)")
+        if not file_path or self.run_worker is not None:
+            return
+        try:
+            spec, run_results = results.load_results(file_path)
+            operators = [search_operators.SearchOperator.from_tuple(operator) for operator in spec['operators']]
+        except (OSError, ValueError, KeyError) as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Invalid results file: {error}")
+            return
+        self.load_history(spec, operators, run_results)
+        self.statusBar().showMessage(f"Loaded {len(run_results)} runs from {file_path}", 5000)
+
+    def load_history(self, spec, operators, run_results):
+        # Show the configuration of the experiment
+        self.qProblemName.setCurrentText(spec['problem'])
+        if 'boundaries' in spec:
+            self.qLowBound.setText(f"{spec['boundaries'][0]}")
+            self.qUppBound.setText(f"{spec['boundaries'][1]}")
+        for line_edit, key in [(self.qDimensionality, 'dimensions'), (self.qPopulation, 'population'),
+                               (self.qIterations, 'iterations')]:
+            line_edit.setText(f"{spec[key]}")
+        self._update_dimensions()
+        self._update_population()
+        self._update_iterations()
+        for (check_box, line_edit), key in zip(self.stopping_widgets, ['target_fitness', 'stagnation_iterations',
+                                                                       'time_limit', 'max_evaluations']):
+            check_box.setChecked(spec.get(key) is not None)
+            if spec.get(key) is not None:
+                line_edit.setText("" if spec[key] == 'optimum' else f"{spec[key]}")
+
+        self.qMetaheuristic.clear()
+        for operator in operators:
+            self.qMetaheuristic.addItem(make_operator_item(operator))
+        self.enable_run_button()
 
-        # Prepare the problem
-        fun = eval(f"cbf.{self.qProblemName.currentText()}({dim})")
-        fun.set_search_range(float(self.qLowBound.text()), float(self.qUppBound.text()))
+        # Replace the history with the loaded runs
+        self.qClearHist.setChecked(True)
+        for result in run_results:
+            self.add_run_result(result, refresh=False)
+        if run_results:
+            self.refresh_results()
+        self.history_spec = spec
+
+    def save_results(self):
+        if len(self.run_store) == 0:
+            return
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Results", "", "Results (*.npz)")
+        if not file_path:
+            return
+        try:
+            self.run_store.save(file_path, self.history_spec)
+        except OSError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Results not saved: {error}")
+            return
+        self.statusBar().showMessage(f"Saved {len(self.run_store)} runs in {file_path}", 5000)
+
+    def export_profile(self):
+        if self.run_profile is None:
+            return
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Profile", "", "CSV (*.csv)")
+        if not file_path:
+            return
+        try:
+            profiling.write_profile_csv(file_path, self.run_profile)
+        except OSError as error:
+            QtWidgets.QErrorMessage(self).showMessage(f"Profile not exported: {error}")
+
+    def choose_export_path(self, is_checked):
+        # The runs of the next batches are appended to the chosen file, until the action is unchecked
+        self.export_path = None
+        if is_checked:
+            file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Batch Runs", "", export_file_filter())
+            self.export_path = file_path or None
+        self.export_runs_action.setChecked(self.export_path is not None)
+        self.export_runs_action.setText(f"Export &Batch Runs To... ({os.path.basename(self.export_path)})"
+                                        if self.export_path is not None else "Export &Batch Runs To...")
+
+    def batch_result_ready(self, spec, result):
+        if self.export_writer is not None:
+            self.export_writer.write(spec, result)
+        self.pending_results.append(result)
+        self.qProgress.setValue(self.qProgress.value() + 1)
+
+    def flush_results(self):
+        if self.pending_results:
+            for result in self.pending_results:
+                self.add_run_result(result, refresh=False)
+                if self.batch_checkpoint is not None:
+                    self.batch_checkpoint.done(result['seed'])
+            self.pending_results = []
+            self.refresh_results(final=False)
+            self.save_checkpoint()
+
+    def finish_checkpoint(self):
+        # A finished batch needs no checkpoint, an interrupted one keeps it up to date for resuming
+        if self.batch_checkpoint is None:
+            return
+        if self.batch_checkpoint.is_done:
+            self.batch_checkpoint.remove()
+        else:
+            self.save_checkpoint(force=True)
+        self.resume_action.setEnabled(not self.batch_checkpoint.is_done)
+        self.batch_checkpoint = None
+
+    def close_export_writer(self):
+        if self.export_writer is not None:
+            self.export_writer.close()
+            self.export_writer = None
+
+    def batch_finished(self, status):
+        self.results_timer.stop()
+        self.flush_results()
+        self.close_export_writer()
+        self.finish_checkpoint()
+        if self.last_result is not None:  # Last update of the violin plot
+            self.refresh_results()
+        self.run_worker = None
+        self.set_running(False)
+        self.enable_run_button()
+        if status['cancelled']:
+            self.statusBar().showMessage("Batch cancelled", 5000)
+        else:
+            totals = self.evaluation_totals
+            throughput = f", {totals.evals_per_second:.0f} evaluations/s" if totals.runs > 0 else ""
+            failed = f", {status['failed']} failed" if status.get('failed') else ""
+            self.statusBar().showMessage(
+                f"Batch finished ({self.run_counter} runs, {self.run_store.stopped_early} stopped early"
+                f"{failed}{throughput})", 5000)
+
+    def run_thread_finished(self):
+        self.sender().deleteLater()
+        if self.sender() is self.run_thread:
+            self.run_thread = None
+
+    def set_running(self, is_running):
+        self.qRunButton.setEnabled(not is_running)
+        self.qBatchRunButton.setEnabled(not is_running)
+        self.qCancelButton.setEnabled(is_running)
+        self.qProgress.setVisible(is_running)
+
+    def cancel_button(self):
+        if self.run_worker is not None:
+            self.run_worker.cancel()
+
+    def update_run_progress(self, iteration, fitness):
+        self.qProgress.setValue(iteration)
+        self.statusBar().showMessage(f"Run {self.run_counter + 1}: iteration {iteration}, best fitness {fitness:.4g}")
+
+    def run_failed(self, message):
+        self.stop_live_view()
+        self.results_timer.stop()
+        self.flush_results()
+        self.close_export_writer()
+        self.finish_checkpoint()
+        self.run_worker = None
+        self.set_running(False)
+        self.enable_run_button()
+        QtWidgets.QErrorMessage(self).showMessage(f"Run failed: {message}")
+
+    def stop_live_view(self):
+        if self.population_window is not None and self.population_window.is_live:
+            self.population_window.stop_live()
 
-        # Build the metaheuristic
-        heuristics = [
-            eval(self.qMetaheuristic.item(x).text().split("->")[1].strip()) for x in range(self.qMetaheuristic.count())]
-        mh = cmh.Metaheuristic(fun.get_formatted_problem(), heuristics, num_agents=pop, num_iterations=ite)
+    def run_finished(self, result):
+        self.stop_live_view()
+        self.run_worker = None
+        self.set_running(False)
+        self.enable_run_button()
+        if result['cancelled']:
+            self.statusBar().showMessage("Run cancelled", 5000)
+            return
+
+        self.add_run_result(result)
+        cached = " (cached)" if result.get('cached') else ""
+        if result.get('stop_reason', 'iterations') != 'iterations':
+            stopped = f", stopped by {result['stop_reason']} at iteration {result['iterations']}"
+        else:
+            stopped = ""
+        self.statusBar().showMessage(
+            f"Run {self.run_counter} finished in {result['time']:.2f} s{stopped}{cached}", 5000)
 
-        # Run simulation
-        start_time = timer()
-        mh.run()
-        end_time = timer()
-        elapsed_time = end_time - start_time
+    def add_run_result(self, result, refresh=True):
+        elapsed_time = result['time']
 
         # Plot history
-        fitness_values = mh.historical['fitness']
+        fitness_values = result['fitness']
         if self.qClearHist.isChecked():
             self.run_counter = 0
-            self.historical_fitness_values = []
+            self.run_store.close()
+            self.best_run = None
+            self.worst_run = None
             self.best_fitness = None
-            self.best_position = None
-            self.best_centroid = None
-            self.best_time = None
             self.worst_fitness = None
-            self.worst_position = None
-            self.worst_centroid = None
-            self.worst_time = None
-            self.historical_time = []
+            self.fitness_stats = stats.RunningStats()
+            self.time_stats = stats.RunningStats()
+            self.iteration_stats = stats.RunningStats()
+            self.evaluation_stats = stats.RunningStats()
+            self.rate_stats = stats.RunningStats()
+            self.share_stats = stats.RunningStats()
+            self.evaluation_totals = telemetry.EvaluationTotals()
+            self.run_profile = None
 
             self.qClearHist.setChecked(False)
-            self.axs_hist[0].clear()
+            self.convergence_plot.clear()
 
         # Save history
-        self.historical_fitness_values.append(fitness_values[-1])
-        self.historical_time.append(elapsed_time)
-
-        # Save best history
-        if self.best_fitness is None or fitness_values[-1] < self.best_fitness:
-            self.best_fitness = fitness_values[-1]
-            self.best_position = mh.historical['position'][-1]
-            self.best_centroid = mh.historical['centroid'][-1]
-            self.best_time = elapsed_time
-
-        # Save worst history
-        if self.worst_fitness is None or fitness_values[-1] > self.worst_fitness:
-            self.worst_fitness = fitness_values[-1]
-            self.worst_position = mh.historical['position'][-1]
-            self.worst_centroid = mh.historical['centroid'][-1]
-            self.worst_time = elapsed_time
-
-        self.axs_hist[0].plot(range(len(fitness_values)), fitness_values)
-        self.axs_hist[0].set_xlabel('Iteration')
-        self.axs_hist[0].set_ylabel('Fitness')
+        run_index = self.run_store.append(result)
+        self.fitness_stats.update(fitness_values[-1])
+        if not np.isfinite(fitness_values[-1]):
+            self.statusBar().showMessage(f"{self.fitness_stats.skipped} runs with a non-finite final fitness are left "
+                                         f"out of the statistics")
+        self.time_stats.update(elapsed_time)
+        if result.get('iterations', -1) >= 0:
+            self.iteration_stats.update(result['iterations'])
+        if result.get('evaluations', -1) >= 0:
+            self.evaluation_stats.update(result['evaluations'])
+            self.rate_stats.update(telemetry.evals_per_second(result['evaluations'], elapsed_time))
+            self.share_stats.update(100 * telemetry.objective_share(result['evaluation_time'], elapsed_time))
+            self.evaluation_totals.update(result)
+        self.save_action.setEnabled(True)
+
+        # Add up the time breakdown of the profiled runs (it restarts when the sequence of operators changes)
+        if result.get('profile') is not None:
+            try:
+                self.run_profile = profiling.combine_profiles([self.run_profile, result['profile']])
+            except ValueError:
+                self.run_profile = result['profile']
+
+        # Save best and worst runs (a NaN fitness is replaced by the next run)
+        final_fitness = fitness_values[-1]
+        if self.best_run is None or final_fitness < self.best_fitness or np.isnan(self.best_fitness):
+            self.best_run, self.best_fitness = run_index, final_fitness
+        if self.worst_run is None or final_fitness > self.worst_fitness or np.isnan(self.worst_fitness):
+            self.worst_run, self.worst_fitness = run_index, final_fitness
+
+        self.convergence_plot.add_curve(fitness_values)
+
+        self.last_result = result
+        self.run_counter += 1
+        if not self.qRunCount.isVisible():
+            self.qRunCount.setVisible(True)
+        self.qRunCount.setText(f"{self.run_counter}")
+
+        if refresh:
+            self.refresh_results()
 
-        self.axs_hist[1].clear()
-        self.axs_hist[1].violinplot(self.historical_fitness_values, showmeans=True, showmedians=True)
-        # self.axs_hist[1].boxplot(self.historical_fitness_values, showfliers=False)
-        self.axs_hist[1].set_xlabel('Final Iteration')
+    def refresh_results(self, final=True):
+        result = self.last_result
+        elapsed_time = result['time']
+        fitness_values = result['fitness']
+
+        # During batches, the violin plot (which needs a full redraw) is updated at most once per second
+        update_violin = final or timer() - self.violin_time >= 1.0
+        if update_violin:
+            self.violin_time = timer()
+            self.axs_hist[1].clear()
+            self.draw_violin(self.axs_hist[1])
 
         self.canvas_hist.setVisible(True)
-        self.canvas_hist.draw()
+        self.convergence_plot.update(force_draw=update_violin)
+        self.canvas_hist.content_changed.emit()
 
         # Show results
-        solution = mh.get_solution()
+        solution = result['position'], fitness_values[-1]
         # self.qInfo_Fitness.setText("{:.2f}".format(solution[1]))
         # self.qInfo_Position.setText(", ".join(["{:#7.2g}"]*len(solution[0])).format(*solution[0]))
         # self.qInfo_Centroid.setText(", ".join(["{:#7.2g}"]*len(solution[0])).format(*mh.historical['centroid'][-1]))
         # self.qInfo_Time.setText("{:.2f}".format(elapsed_time))
         # print("x_best = {}, f_best = {}".format(*mh.get_solution())
 
-        # Update table
-        model = QStandardItemModel()
-        model.setRowCount(4)
-        model.setColumnCount(6)
-        model.setVerticalHeaderLabels(["Fitness", "Position", "Centroid", "Time (s)"])
-        model.setHorizontalHeaderLabels(["Last", "Best", "Worst", "Mean", "Std. Dev.", "Median"])
-
-        # Show the last iteration
-        model.setItem(0, 0, QStandardItem("{:.2f}".format(solution[1])))
-        model.setItem(1, 0, QStandardItem(
-            ", ".join(["{:#7.2g}"] * len(solution[0])).format(*solution[0])))
-        model.setItem(2, 0, QStandardItem(
-            ", ".join(["{:#7.2g}"] * len(solution[0])).format(*mh.historical['centroid'][-1])))
-        model.setItem(3, 0, QStandardItem("{:.2f}".format(elapsed_time)))
-
-        # Show the best iteration
-        model.setItem(0, 1, QStandardItem("{:.2f}".format(self.best_fitness)))
-        model.setItem(1, 1, QStandardItem(
-            ", ".join(["{:#7.2g}"] * len(self.best_position)).format(*self.best_position)))
-        model.setItem(2, 1, QStandardItem(
-            ", ".join(["{:#7.2g}"] * len(self.best_centroid)).format(*self.best_centroid)))
-        model.setItem(3, 1, QStandardItem("{:.2f}".format(self.best_time)))
-
-        # Show the worst iteration
-        model.setItem(0, 2, QStandardItem("{:.2f}".format(self.worst_fitness)))
-        model.setItem(1, 2, QStandardItem(
-            ", ".join(["{:#7.2g}"] * len(self.worst_position)).format(*self.worst_position)))
-        model.setItem(2, 2, QStandardItem(
-            ", ".join(["{:#7.2g}"] * len(self.worst_centroid)).format(*self.worst_centroid)))
-        model.setItem(3, 2, QStandardItem("{:.2f}".format(self.worst_time)))
-
-        # Show the mean iteration
-        model.setItem(0, 3, QStandardItem("{:.2f}".format(np.mean(self.historical_fitness_values))))
-        model.setItem(1, 3, QStandardItem("--"))
-        model.setItem(2, 3, QStandardItem("--"))
-        model.setItem(3, 3, QStandardItem("{:.2f}".format(np.mean(self.historical_time))))
-
-        # Show the std. dev. iteration
-        model.setItem(0, 4, QStandardItem("{:.2f}".format(np.std(self.historical_fitness_values))))
-        model.setItem(1, 4, QStandardItem("--"))
-        model.setItem(2, 4, QStandardItem("--"))
-        model.setItem(3, 4, QStandardItem("{:.2f}".format(np.std(self.historical_time))))
-
-        # Show the median iteration
-        model.setItem(0, 5, QStandardItem("{:.2f}".format(np.median(self.historical_fitness_values))))
-        model.setItem(1, 5, QStandardItem("--"))
-        model.setItem(2, 5, QStandardItem("--"))
-        model.setItem(3, 5, QStandardItem("{:.2f}".format(np.median(self.historical_time))))
-
-        self.qInfo_Table.setModel(model)
-        self.qInfo_Table.setVisible(True)
-
-        row_height = 24
-        header = self.qInfo_Table.horizontalHeader()
-        self.qInfo_Table.verticalHeader().setDefaultSectionSize(row_height)
-        self.qInfo_Table.setFixedHeight(4 * row_height + 2 * header.height())
-
-        self.run_counter += 1
-        if not self.qRunCount.isVisible():
-            self.qRunCount.setVisible(True)
-        self.qRunCount.setText(f"{self.run_counter}")
-        # print(4 * row_height + 2 * header.height())
+        # Update table (its cells are edited in place)
+        best, worst = self.run_store.result(self.best_run), self.run_store.result(self.worst_run)
+        position_format = ", ".join(["{:#7.2g}"] * len(solution[0]))
+        self.set_info_row(0, ["{:.2f}".format(value) for value in [
+            solution[1], best['fitness'][-1], worst['fitness'][-1],
+            self.fitness_stats.mean, self.fitness_stats.std, self.fitness_stats.median]])
+        self.set_info_row(1, [position_format.format(*solution[0]), position_format.format(*best['position']),
+                              position_format.format(*worst['position'])])
+        self.set_info_row(2, [position_format.format(*result['centroid']), position_format.format(*best['centroid']),
+                              position_format.format(*worst['centroid'])])
+        self.set_info_row(3, ["{:.2f}".format(value) for value in [
+            elapsed_time, best['time'], worst['time'],
+            self.time_stats.mean, self.time_stats.std, self.time_stats.median]])
+        if self.iteration_stats.count > 0:
+            self.set_info_row(4, [f"{run['iterations']}" if run.get('iterations', -1) >= 0 else "--"
+                                  for run in [result, best, worst]] + ["{:.1f}".format(value) for value in [
+                self.iteration_stats.mean, self.iteration_stats.std, self.iteration_stats.median]])
+        else:
+            self.set_info_row(4, [])
+
+        # Fitness evaluations, their rate, and the share of the time spent in the objective function
+        if self.evaluation_stats.count > 0:
+            runs = [run if run.get('evaluations', -1) >= 0 else None for run in [result, best, worst]]
+            self.set_info_row(5, ["--" if run is None else f"{run['evaluations']}" for run in runs] + [
+                "{:.1f}".format(value) for value in [
+                    self.evaluation_stats.mean, self.evaluation_stats.std, self.evaluation_stats.median]])
+            self.set_info_row(6, ["--" if run is None else "{:.0f}".format(
+                telemetry.evals_per_second(run['evaluations'], run['time'])) for run in runs] + [
+                "{:.0f}".format(value) for value in [
+                    self.rate_stats.mean, self.rate_stats.std, self.rate_stats.median]])
+            self.set_info_row(7, ["--" if run is None else "{:.1f}".format(
+                100 * telemetry.objective_share(run['evaluation_time'], run['time'])) for run in runs] + [
+                "{:.1f}".format(value) for value in [
+                    self.share_stats.mean, self.share_stats.std, self.share_stats.median]])
+        else:
+            for row in [5, 6, 7]:
+                self.set_info_row(row, [])
+
+        if not self.qInfo_Table.isVisible():
+            self.qInfo_Table.setVisible(True)
+            row_height = 24
+            header = self.qInfo_Table.horizontalHeader()
+            self.qInfo_Table.verticalHeader().setDefaultSectionSize(row_height)
+            self.qInfo_Table.setFixedHeight(self.info_model.rowCount() * row_height + 2 * header.height())
+        self.show_profile()
+
+    def show_profile(self):
+        profile = self.run_profile
+        self.export_profile_action.setEnabled(profile is not None)
+        self.qProfile_Table.setVisible(profile is not None)
+        if profile is None:
+            return
+
+        total_time = sum(profile['time'])
+        self.profile_model.setRowCount(len(profile['labels']))
+        self.profile_model.setVerticalHeaderLabels(profile['labels'])
+        for row in range(len(profile['labels'])):
+            texts = [f"{profile['calls'][row]}", f"{profile['evaluations'][row]}", f"{profile['time'][row]:.3f}",
+                     f"{100 * profile['time'][row] / total_time:.1f}" if total_time > 0 else "--"]
+            texts += [f"{profile[column][row]:.3f}" for column in ['perturbation', 'evaluation', 'selection']]
+            for column, text in enumerate(texts):
+                self.profile_model.setItem(row, column, QStandardItem(text))
+        self.qProfile_Table.resizeColumnsToContents()
+        row_height = self.qProfile_Table.verticalHeader().defaultSectionSize()
+        self.qProfile_Table.setFixedHeight(
+            len(profile['labels']) * row_height + 2 * self.qProfile_Table.horizontalHeader().height())
+
+    def draw_violin(self, ax):
+        ax.violinplot(self.run_store.final_fitness, showmeans=True, showmedians=True)
+        # ax.boxplot(self.run_store.final_fitness, showfliers=False)
+        ax.set_xlabel('Final Iteration')
+
+    def render_history(self, figure):
+        # Convergence curves and violin plot of the history, drawn into a detached window
+        axs = figure.subplots(1, 2, sharey='row', gridspec_kw={'width_ratios': [0.8, 0.2]})
+        self.convergence_plot.draw_into(axs[0])
+        if len(self.run_store) > 0:
+            self.draw_violin(axs[1])
+
+    def set_info_row(self, row, texts):
+        # Columns without text (Mean, Std. Dev., and Median of vectors) are shown as '--'
+        texts = texts + ["--"] * (self.info_model.columnCount() - len(texts))
+        for column, text in enumerate(texts):
+            self.info_model.item(row, column).setText(text)
+
+    def closeEvent(self, event):
+        # Stop the background run and the searches of the other windows (if so) before closing
+        self.cancel_button()
+        for window in [self.sweep_window, self.tuner_window, self.hyperheuristic_window, self.population_window]:
+            if window is not None:
+                window.close()
+        if self.run_thread is not None and self.run_thread.isRunning():
+            self.run_thread.quit()
+            self.run_thread.wait()
+        self.refine_key = None
+        for thread, _ in list(self.landscape_threads):
+            thread.quit()
+            thread.wait()
+        # Keep the finished runs of an interrupted batch in its checkpoint
+        self.flush_results()
+        self.finish_checkpoint()
+        self.run_store.close()
+        super().closeEvent(event)
 
     # class Problem_Preview(FigureCanvas):
-    def plot(self, problem_object, low_boundary, upp_boundary):
-        samples = 50
-        x = np.linspace(low_boundary, upp_boundary, samples)
-        y = np.linspace(low_boundary, upp_boundary, samples)
-
-        # Create the grid matrices
-        matrix_x, matrix_y = np.meshgrid(x, y)
-
-        # Evaluate each node of the grid into the problem function
-        matrix_z = []
-        for xy_list in zip(matrix_x, matrix_y):
-            z = []
-            for xy_input in zip(xy_list[0], xy_list[1]):
-                tmp = list(xy_input)
-                tmp.extend(list(problem_object.optimal_solution[2:problem_object.variable_num]))
-                z.append(problem_object.get_function_value(np.array(tmp)))
-            matrix_z.append(z)
-        matrix_z = np.array(matrix_z)
-
-        # Initialise the figure
-        # self.fig = plt.figure(figsize=[4, 3], facecolor='w')
-        # self.ax = self.fig.gca(projection='3d', proj_type='ortho')
-        self.figure.clear()
-        self.ax = self.figure.subplots(1, 1, subplot_kw=dict(projection='3d', proj_type='ortho'))
-        self.ax.set_facecolor("none")
+    def get_landscape(self, problem_name, low_boundary, upp_boundary, samples=50):
+        key = (problem_name, low_boundary, upp_boundary, samples)
+        grid = self.landscape_cache.get(key)
+        if grid is None:
+            grid = compute_landscape(*key)
+            self.landscape_cache.put(key, grid)
+        return grid
+
+    def plot(self, problem_name, low_boundary, upp_boundary):
+        # The full grid is drawn if it is cached; otherwise, a coarse grid is drawn at once and refined later
+        coarse_samples, samples = self.preview_levels
+        key = (problem_name, low_boundary, upp_boundary, samples)
+        self.refine_timer.stop()
+        self.refine_key = None
+        if key in self.landscape_cache:
+            self.show_landscape(key)
+        else:
+            self.show_landscape(key[:3] + (coarse_samples,))
+            self.refine_key = key
+            self.refine_timer.start()
+
+    def show_landscape(self, key, force=False):
+        # Nothing to do if this landscape is already shown
+        if key == self.preview_key and not force:
+            return
+        self.preview_key = key
+
+        mode = self.qPreviewMode.currentText()
+        if mode != '3D surface' and not force and self.ax.name == 'rectilinear':
+            # The 2D views are drawn again into the same axes, much faster than building new ones
+            for artist in list(self.ax.images) + list(self.ax.collections):
+                artist.remove()
+            self.draw_flat_landscape(self.ax, self.get_landscape(*key), mode)
+        else:
+            # Initialise the figure
+            # self.fig = plt.figure(figsize=[4, 3], facecolor='w')
+            # self.ax = self.fig.gca(projection='3d', proj_type='ortho')
+            self.figure.clear()
+            self.ax = self.render_landscape(self.figure)
+
+        # self.figure.patch.set_facecolor("None")
+        # self.ax.patch.set_alpha(1)
 
-        # super().__init__(self.fig)
+        # plt.close()
+        self.canvas.draw()
+        self.canvas.content_changed.emit()
+
+    def change_preview_mode(self):
+        if self.preview_key is not None:
+            self.show_landscape(self.preview_key, force=True)
+
+    def refine_preview(self):
+        # Compute the full grid of the selected problem away from the GUI thread (unless it is already on its way)
+        key = self.refine_key
+        if key is None or any(worker.key == key for _, worker in self.landscape_threads):
+            return
+        thread = QtCore.QThread(self)
+        worker = LandscapeWorker(key)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self.landscape_ready)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self.landscape_thread_finished)
+        self.landscape_threads.append((thread, worker))
+        thread.start()
+
+    def landscape_ready(self, key, grid):
+        # Grids of problems that are no longer selected are kept for later
+        if grid is None:
+            return
+        self.landscape_cache.put(key, grid)
+        if key == self.refine_key:
+            self.refine_key = None
+            self.show_landscape(key)
+
+    def landscape_thread_finished(self):
+        thread = self.sender()
+        for entry in self.landscape_threads:
+            if entry[0] is thread:
+                self.landscape_threads.remove(entry)
+                entry[1].deleteLater()
+                break
+        thread.deleteLater()
 
-        ls = LightSource(azdeg=90, altdeg=45)
-        rgb = ls.shade(matrix_z, plt.cm.jet)
+    @staticmethod
+    def draw_flat_landscape(ax, grid, mode):
+        # Contour or heatmap of the grid, over its whole range
+        extent = (grid['x'][0, 0], grid['x'][0, -1], grid['y'][0, 0], grid['y'][-1, 0])
+        if mode == 'Contour':
+            ax.contourf(grid['x'], grid['y'], grid['z'], levels=20, cmap='jet')
+        else:
+            ax.imshow(grid['z'], cmap='jet', origin='lower', aspect='auto', interpolation='bilinear', extent=extent)
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+
+    def render_landscape(self, figure):
+        # Draw the landscape of the preview into a figure (the cached grid is shared, not copied)
+        grid = self.get_landscape(*self.preview_key)
+        mode = self.qPreviewMode.currentText()
+        if mode != '3D surface':
+            ax = figure.subplots(1, 1)
+            ax.set_facecolor("none")
+            self.draw_flat_landscape(ax, grid, mode)
+            ax.set_xlabel('$x_1$')
+            ax.set_ylabel('$x_2$')
+            return ax
+
+        ax = figure.subplots(1, 1, subplot_kw=dict(projection='3d', proj_type='ortho'))
+        ax.set_facecolor("none")
 
         # Plot data
-        self.ax.plot_surface(matrix_x, matrix_y, matrix_z, rstride=1, cstride=1, linewidth=0.5,
-                             antialiased=False, facecolors=rgb)  #
+        ax.plot_surface(grid['x'], grid['y'], grid['z'], rstride=1, cstride=1, linewidth=0.5,
+                        antialiased=False, facecolors=grid['rgb'])  #
 
         # Adjust the labels
-        self.ax.set_xlabel('$x_1$')
-        self.ax.set_ylabel('$x_2$')
-        self.ax.set_zlabel('$f(x, y)$')
-        # self.ax.set_title(problem_object.func_name)
-
-        self.ax.xaxis.pane.fill = False
-        self.ax.yaxis.pane.fill = False
-        self.ax.zaxis.pane.fill = False
-
-        # self.figure.patch.set_facecolor("None")
-        # self.ax.patch.set_alpha(1)
+        ax.set_xlabel('$x_1$')
+        ax.set_ylabel('$x_2$')
+        ax.set_zlabel('$f(x, y)$')
+        # ax.set_title(problem_object.func_name)
 
-        # plt.close()
-        self.canvas.draw()
+        ax.xaxis.pane.fill = False
+        ax.yaxis.pane.fill = False
+        ax.zaxis.pane.fill = False
+        return ax
 
 
 if __name__ == "__main__":
-    import sys
+    # Needed by the process pool of batch runs in the frozen app
+    multiprocessing.freeze_support()
 
     app = QApplication(sys.argv)
     # app.setStyle("Fusion")
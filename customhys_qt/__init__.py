@@ -0,0 +1,6 @@
+"""
+Non-graphical core of CUSTOMHyS-Qt.
+
+The modules in this package hold everything that does not depend on PyQt6, so they can be used from the GUI, from worker
+processes, and from the command line.
+"""
@@ -0,0 +1,183 @@
+"""
+Throughput benchmark of search-operator sequences.
+
+Each configuration is a run spec (operators × problem × dimensions) with a fixed seed. It is run ``repeat`` times for
+timing and once more under ``tracemalloc`` for its peak memory. The measures of a configuration are:
+
+    time        median wall time of the runs (s)
+    evaluations number of fitness evaluations per run
+    evals_per_s evaluations / time
+    peak_mib    peak memory allocated by Python during a run (MiB)
+
+A set of measures can be saved as the baseline of later benchmarks, so that slowdowns caused by changes in customhys or
+in the app are flagged by ``compare``. ``measure_batching`` compares the batched evaluation of the population (see
+``evaluation``) with the agent-by-agent one.
+"""
+
+import json
+import platform
+import tracemalloc
+from timeit import default_timer as timer
+
+import customhys
+import numpy as np
+
+from . import engine, evaluation, telemetry
+
+__all__ = ['DEFAULT_PROBLEMS', 'make_suite', 'measure', 'measure_batching', 'run_suite', 'save_baselines',
+           'load_baselines', 'compare']
+
+DEFAULT_PROBLEMS = ['Sphere', 'Rastrigin', 'Rosenbrock', 'Ackley1', 'Griewank']
+
+
+def make_suite(sequences, problems=None, dimensions=(2, 10), population=30, iterations=100, seed=0):
+    """
+    Build the configurations of a benchmark, i.e., every sequence on every problem and dimensionality.
+
+    :param dict sequences: Operator sequences by name, each one a list of SearchOperator.
+    :param list problems: Optional. Names of problems in ``customhys.benchmark_func``. The default is
+        ``DEFAULT_PROBLEMS``.
+    :param tuple dimensions: Optional. Dimensionalities of the problems. The default is (2, 10).
+    :param int population: Optional. Number of agents. The default is 30.
+    :param int iterations: Optional. Number of iterations. The default is 100.
+    :param int seed: Optional. Seed of every run. The default is 0.
+    :return: list of (str, dict), the key and the run spec of each configuration.
+    """
+    suite = []
+    for sequence_name, operators in sequences.items():
+        for problem_name in problems or DEFAULT_PROBLEMS:
+            for num_dimensions in dimensions:
+                spec = dict(problem=problem_name, dimensions=int(num_dimensions), population=int(population),
+                            iterations=int(iterations), operators=[operator.to_tuple() for operator in operators],
+                            seed=seed)
+                suite.append((f"{sequence_name}|{problem_name}|{num_dimensions}D", spec))
+    return suite
+
+
+def _timed_run(spec):
+    # Run the spec counting the evaluations of the objective function (evaluated as in ``engine.run_spec``)
+    np.random.seed(spec['seed'])
+    mh, problem = engine.build_metaheuristic(spec)
+    counter = telemetry.EvaluationCounter()
+    counter.attach(mh)
+    if spec.get('batch_evaluation', True):
+        evaluation.BatchedEvaluator(problem, counter).attach(mh)
+    start_time = timer()
+    mh.run()
+    return timer() - start_time, counter.evaluations
+
+
+def measure(spec, repeat=3):
+    """
+    Measure the throughput and memory of a run spec.
+
+    :param dict spec: Run specification (with a seed, so that every repetition does the same work).
+    :param int repeat: Optional. Number of timed runs. The default is 3.
+    :return: dict with 'time', 'evaluations', 'evals_per_s', and 'peak_mib'.
+    """
+    times = []
+    evaluations = 0
+    for _ in range(max(int(repeat), 1)):
+        elapsed_time, evaluations = _timed_run(spec)
+        times.append(elapsed_time)
+
+    # Memory is measured apart, since tracing the allocations slows the run down
+    tracemalloc.start()
+    try:
+        _timed_run(spec)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    elapsed_time = float(np.median(times))
+    return dict(time=elapsed_time, evaluations=evaluations, evals_per_s=evaluations / elapsed_time,
+                peak_mib=peak / 2 ** 20)
+
+
+def measure_batching(spec, repeat=3):
+    """
+    Measure the speedup of the batched evaluation of the population over the agent-by-agent one.
+
+    :param dict spec: Run specification (with a seed, so that every repetition does the same work).
+    :param int repeat: Optional. Number of timed runs of each evaluation. The default is 3.
+    :return: dict with the median 'agent_time' and 'batched_time' (s), the 'speedup', and 'same_result' (True if every
+        run, with either evaluation, ends with the same fitness).
+    """
+    times = dict()
+    final_fitness = []
+    for batch_evaluation in [False, True]:
+        run_spec = dict(spec, batch_evaluation=batch_evaluation)
+        results = [engine.run_spec(run_spec) for _ in range(max(int(repeat), 1))]
+        times[batch_evaluation] = float(np.median([result['time'] for result in results]))
+        final_fitness += [float(result['fitness'][-1]) for result in results]
+    return dict(agent_time=times[False], batched_time=times[True], speedup=times[False] / times[True],
+                same_result=bool(np.allclose(final_fitness, final_fitness[0], rtol=1e-9, atol=0.0)))
+
+
+def run_suite(suite, repeat=3, progress=None):
+    """
+    Measure every configuration of a suite (one after the other, so that they do not compete for the CPU).
+
+    :param list suite: Configurations as returned by ``make_suite``.
+    :param int repeat: Optional. Number of timed runs per configuration. The default is 3.
+    :param callable progress: Optional. Called as ``progress(key, measures)`` after each configuration.
+    :return: dict with the measures by configuration key.
+    """
+    records = dict()
+    for key, spec in suite:
+        records[key] = measure(spec, repeat)
+        if progress is not None:
+            progress(key, records[key])
+    return records
+
+
+def save_baselines(file_path, records):
+    """
+    Save the measures of a suite as baselines, along with the versions they were measured with.
+
+    :param str file_path: Location of the JSON file.
+    :param dict records: Measures by configuration key, as returned by ``run_suite``.
+    :return: None.
+    """
+    baselines = dict(customhys_version=getattr(customhys, '__version__', ''),
+                     python_version=platform.python_version(), machine=platform.machine(),
+                     processor=platform.processor(), records=records)
+    with open(file_path, 'w') as json_file:
+        json.dump(baselines, json_file, indent=2, sort_keys=True)
+
+
+def load_baselines(file_path):
+    """
+    Load the baselines saved by ``save_baselines``.
+
+    :param str file_path: Location of the JSON file.
+    :return: dict
+    """
+    with open(file_path, 'r') as json_file:
+        return json.load(json_file)
+
+
+def compare(records, baselines, tolerance=0.2):
+    """
+    Compare measures with their baselines. A configuration is flagged as 'slower' when its throughput drops more than
+    ``tolerance`` (relative), as 'faster' when it rises more than ``tolerance``, and as 'new' when it has no baseline.
+
+    :param dict records: Measures by configuration key, as returned by ``run_suite``.
+    :param dict baselines: Baselines as returned by ``load_baselines``.
+    :param float tolerance: Optional. Relative change of the evaluations per second that is flagged. The default is 0.2.
+    :return: dict with the (flag, ratio) of each configuration, where ratio is the throughput relative to the baseline.
+    """
+    flags = dict()
+    for key, measures in records.items():
+        baseline = baselines.get('records', dict()).get(key)
+        if baseline is None:
+            flags[key] = ('new', None)
+            continue
+        ratio = measures['evals_per_s'] / baseline['evals_per_s']
+        if ratio < 1.0 - tolerance:
+            flags[key] = ('slower', ratio)
+        elif ratio > 1.0 + tolerance:
+            flags[key] = ('faster', ratio)
+        else:
+            flags[key] = ('ok', ratio)
+    return flags
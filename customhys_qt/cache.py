@@ -0,0 +1,204 @@
+"""
+Persistent cache of run results, addressed by the content of their specs.
+
+A run with a seed is deterministic, so its result only depends on the spec (and on the customhys version). The key of
+a spec is the SHA-256 hash of its canonical JSON form, and each result is saved as ``<key>.npz`` in the user cache
+directory. When the files take more than ``max_bytes``, the least recently used ones are deleted.
+
+Runs without a seed, runs with a time limit, and profiled runs (whose timings are part of the result) are never
+cached.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import customhys
+import numpy as np
+
+from . import paths
+
+__all__ = ['CACHE_VERSION', 'spec_key', 'is_cacheable', 'ResultCache']
+
+CACHE_VERSION = 3
+
+# Keys of a spec that do not change the outcome of a run
+_ignored_keys = {'profile'}
+
+
+def _canonical(value):
+    # Tuples and lists (and numpy scalars) are written in the same way
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def spec_key(spec):
+    """
+    Return the content key of a run spec.
+
+    :param dict spec: Run specification.
+    :return: str
+    """
+    content = {key: _canonical(value) for key, value in spec.items() if key not in _ignored_keys}
+    if content.get('boundaries') is not None:
+        content['boundaries'] = [float(value) for value in content['boundaries']]
+    content['customhys_version'] = getattr(customhys, '__version__', '')
+    content['cache_version'] = CACHE_VERSION
+    text = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def is_cacheable(spec):
+    """
+    Tell if the result of a spec is deterministic, and thus, cacheable.
+
+    :param dict spec: Run specification.
+    :return: bool
+    """
+    return spec.get('seed') is not None and not spec.get('profile') and spec.get('time_limit') is None
+
+
+class ResultCache:
+    """
+    On-disk cache of the results of ``engine.run_spec``.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 * 2 ** 20):
+        """
+        :param str directory: Optional. Folder of the cached results. The default is 'results' in the user cache
+            directory.
+        :param int max_bytes: Optional. Size of the cache (in bytes) above which old results are deleted. The default
+            is 256 MiB.
+        """
+        self.directory = directory or paths.cache_dir('results')
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._nbytes = None  # Running total of the size of the files, read from the folder when first needed
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, spec):
+        """
+        Return the cached result of ``spec``, or None if it is not cached.
+
+        :param dict spec: Run specification.
+        :return: dict or None
+        """
+        if not is_cacheable(spec):
+            return None
+        file_path = self._path(spec_key(spec))
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                result = dict(fitness=data['fitness'], position=data['position'], centroid=data['centroid'],
+                              time=float(data['time']), seed=spec['seed'], cancelled=False,
+                              iterations=int(data['iterations']), stop_reason=str(data['stop_reason']),
+                              profile=None, evaluations=int(data['evaluations']),
+                              evaluation_time=float(data['evaluation_time']), cached=True)
+            os.utime(file_path)  # Recently used
+        except (OSError, KeyError, ValueError):
+            return None
+        return result
+
+    def put(self, spec, result):
+        """
+        Save the result of ``spec`` (cancelled runs and non-cacheable specs are skipped).
+
+        :param dict spec: Run specification.
+        :param dict result: Result of the run.
+        :return: None.
+        """
+        if not is_cacheable(spec) or result.get('cancelled'):
+            return
+        # Write into a temporary file first, so that a file in the cache is always complete
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as npz_file:
+                np.savez(npz_file, fitness=result['fitness'], position=result['position'],
+                         centroid=result['centroid'], time=result['time'], iterations=result['iterations'],
+                         stop_reason=result['stop_reason'], evaluations=result['evaluations'],
+                         evaluation_time=result['evaluation_time'])
+            file_size = os.path.getsize(temporary_path)
+            file_path = self._path(spec_key(spec))
+            # A result saved again replaces the old file, whose size is no longer in the cache
+            old_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            os.replace(temporary_path, file_path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return
+
+        if self._nbytes is None:
+            self._nbytes = self.nbytes
+        else:
+            self._nbytes += file_size - old_size
+        if self._nbytes > self.max_bytes:
+            self.evict()
+
+    def split(self, specs):
+        """
+        Separate the specs with cached results from the ones that have to run.
+
+        :param list specs: Run specifications.
+        :returns: list, list (the (spec, result) pairs found in the cache, and the specs to run)
+        """
+        cached_runs, missing_specs = [], []
+        for spec in specs:
+            result = self.get(spec)
+            if result is None:
+                missing_specs.append(spec)
+            else:
+                cached_runs.append((spec, result))
+        return cached_runs, missing_specs
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz') and entry.is_file():
+                status = entry.stat()
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        return entries
+
+    @property
+    def nbytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+    def evict(self):
+        """
+        Delete the least recently used results until the cache fits in ``max_bytes``.
+
+        :return: None.
+        """
+        entries = self._entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            total_bytes -= size
+        self._nbytes = total_bytes
+
+    def clear(self):
+        """
+        Delete all the cached results.
+
+        :return: None.
+        """
+        for _, _, file_path in self._entries():
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        self._nbytes = None
@@ -0,0 +1,112 @@
+"""
+Checkpoints of batches of runs, so that an interrupted batch can be resumed.
+
+A checkpoint is a results file (see ``store.RunStore``, so it can also be opened as such) with the runs of the history
+so far, plus a ``batch`` entry with (as JSON) the spec of the batch, its number of repetitions, and the seeds of the
+runs that are still pending. A ``BatchCheckpoint`` rewrites it at most every ``interval`` seconds while the batch goes
+on (always through a temporary file, so a crash never leaves a broken checkpoint), and removes it when the batch
+finishes. The statistics of the history (best and worst runs, times, evaluations, ...) are recomputed from the saved
+runs when the batch is resumed, and only the pending runs run again (with their own seeds).
+"""
+
+import json
+import os
+from timeit import default_timer as timer
+
+import numpy as np
+
+from . import paths, store
+
+__all__ = ['CHECKPOINT_FILE', 'default_path', 'BatchCheckpoint', 'load_checkpoint']
+
+CHECKPOINT_FILE = 'batch-checkpoint.npz'
+
+
+def default_path():
+    """
+    Location of the checkpoint of the GUI batches (in the user cache directory).
+    """
+    return os.path.join(paths.cache_dir(), CHECKPOINT_FILE)
+
+
+class BatchCheckpoint:
+    """
+    Pending runs of a batch, and periodic saving of the history with them.
+    """
+
+    def __init__(self, file_path, specs, repetitions, interval=30.0):
+        """
+        :param str file_path: Location of the checkpoint (it is overwritten).
+        :param list specs: Specs of the runs of the batch; they only differ in their seeds.
+        :param int repetitions: Number of repetitions of the history once the batch is done.
+        :param float interval: Optional. Minimum time (s) between two saves. The default is 30.0.
+        """
+        self.file_path = file_path
+        self.spec = {key: value for key, value in specs[0].items() if key != 'seed'} if specs else dict()
+        self.pending_seeds = [spec['seed'] for spec in specs]
+        self.repetitions = int(repetitions)
+        self.interval = interval
+        self._last_save = None
+
+    @property
+    def is_done(self):
+        return not self.pending_seeds
+
+    def done(self, seed):
+        """
+        Mark the run with ``seed`` as completed.
+
+        :param int seed: Seed of the run.
+        :return: None.
+        """
+        if seed in self.pending_seeds:
+            self.pending_seeds.remove(seed)
+
+    def save(self, run_store, history_spec, force=False):
+        """
+        Save the history and the pending runs, unless the last save is more recent than ``interval``.
+
+        :param RunStore run_store: Runs of the history (the completed runs of the batch included).
+        :param dict history_spec: Spec of the history (as saved in the results files).
+        :param bool force: Optional. If True, save anyway. The default is False.
+        :return: bool, True if the checkpoint was written.
+        """
+        if not force and self._last_save is not None and timer() - self._last_save < self.interval:
+            return False
+        batch = dict(spec=self.spec, repetitions=self.repetitions, pending_seeds=self.pending_seeds)
+        temporary_path = self.file_path + '.tmp'
+        with open(temporary_path, 'wb') as checkpoint_file:
+            run_store.save(checkpoint_file, history_spec, batch=np.array(json.dumps(batch)))
+        os.replace(temporary_path, self.file_path)
+        self._last_save = timer()
+        return True
+
+    def remove(self):
+        """
+        Delete the checkpoint (e.g., when the batch is done).
+        """
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+
+def load_checkpoint(file_path):
+    """
+    Load a checkpoint saved by ``BatchCheckpoint``.
+
+    :param str file_path: Location of the checkpoint.
+    :returns: dict, list, list, int (the spec of the history, its results, the specs of the pending runs, and the
+        number of repetitions of the batch)
+    """
+    history_spec, run_store = store.RunStore.load(file_path, spill_bytes=None)
+    with np.load(file_path, allow_pickle=False) as data:
+        if 'batch' not in data:
+            raise ValueError("the file is not a batch checkpoint")
+        batch = json.loads(str(data['batch']))
+    spec = dict(batch['spec'])
+    if 'boundaries' in spec:
+        spec['boundaries'] = tuple(spec['boundaries'])
+    spec['operators'] = [tuple(operator) for operator in spec['operators']]
+    pending_specs = [dict(spec, seed=seed) for seed in batch['pending_seeds']]
+    results = list(run_store.results())
+    run_store.close()
+    return history_spec, results, pending_specs, int(batch['repetitions'])
@@ -0,0 +1,41 @@
+"""
+Decimation of long curves for plotting.
+
+A curve with more points than pixels along the axis is reduced to the minimum and maximum of each group of consecutive
+points (min-max decimation), which keeps its visible shape, including spikes.
+"""
+
+import numpy as np
+
+__all__ = ['downsample']
+
+
+def downsample(values, max_points):
+    """
+    Reduce a curve to about ``max_points`` points.
+
+    :param numpy.ndarray values: Values of the curve, plotted against their indices.
+    :param int max_points: Maximum number of points to keep (at least 4).
+    :returns: numpy.ndarray, numpy.ndarray (indices and values of the kept points)
+    """
+    values = np.asarray(values, dtype=float)
+    num_values = values.size
+    max_points = max(int(max_points), 4)
+    if num_values <= max_points:
+        return np.arange(num_values), values
+
+    # Two points (min and max) per group, the last group is padded with its last value
+    group_size = int(np.ceil(num_values / (max_points // 2)))
+    num_groups = int(np.ceil(num_values / group_size))
+    padded = np.empty(num_groups * group_size)
+    padded[:num_values] = values
+    padded[num_values:] = values[-1]
+    groups = padded.reshape(num_groups, group_size)
+
+    offsets = np.arange(num_groups) * group_size
+    low = offsets + np.argmin(np.where(np.isnan(groups), np.inf, groups), axis=1)
+    high = offsets + np.argmax(np.where(np.isnan(groups), -np.inf, groups), axis=1)
+
+    indices = np.unique(np.concatenate([[0], low, high, [num_values - 1]]))
+    indices = indices[indices < num_values]
+    return indices, values[indices]
@@ -0,0 +1,383 @@
+"""
+Distributed execution of batches of runs through a job queue.
+
+A ``Coordinator`` serves a ``JobQueue`` over TCP (with ``multiprocessing.managers``, authenticated by a shared key) from
+a separate process, and workers on any machine that reaches it lease run specs from the queue, run them, and send
+their results back:
+
+    coordinator (GUI)                 worker 1, worker 2, ...
+        submit(specs)        ---->        lease(worker)
+        take_results()       <----        complete(job_id, result)
+
+A lease lasts ``lease_timeout`` seconds, and a worker renews it while its run goes on, so the jobs of a worker that
+dies or loses its connection go back to the queue once their leases expire. Jobs whose runs fail are retried as well,
+up to ``max_attempts`` times. A job completed twice (e.g., by a worker that was only slow) keeps its first result.
+
+Workers are started with
+
+    python -m customhys_qt.distributed HOST:PORT --authkey KEY [--processes N]
+
+(or ``python customhys-qt.py --worker ...``). They keep waiting for a coordinator, so the same workers serve one batch
+after another. The key authenticates both ends, and only machines with the key can connect: run specs and results are
+exchanged as pickles, so the key must be kept private.
+"""
+
+import argparse
+import collections
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+# customhys imports pyplot, so keep matplotlib away from any GUI backend
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from . import engine  # noqa: E402
+
+__all__ = ['DEFAULT_PORT', 'JobQueue', 'Coordinator', 'connect', 'work', 'main']
+
+DEFAULT_PORT = 50631
+
+
+class JobQueue:
+    """
+    Run specs waiting for workers, leased jobs, and results not yet taken by the coordinator.
+    """
+
+    def __init__(self, lease_timeout=300.0, max_attempts=3):
+        """
+        :param float lease_timeout: Optional. Time (s) a job is leased to a worker without news from it. The default
+            is 300.0.
+        :param int max_attempts: Optional. Number of times a job is leased before it is given up. The default is 3.
+        """
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._specs = dict()
+        self._pending = collections.deque()
+        self._leases = dict()  # job_id: (worker, deadline)
+        self._attempts = collections.Counter()
+        self._done = set()
+        self._failed = dict()  # job_id: last error
+        self._results = []
+        self._workers = dict()  # worker: time of its last request
+        self._next_id = 0
+
+    def submit(self, specs):
+        """
+        Add run specs to the queue.
+
+        :param list specs: Run specifications.
+        :return: list of int, the ids of the jobs.
+        """
+        with self._lock:
+            job_ids = list(range(self._next_id, self._next_id + len(specs)))
+            self._next_id += len(specs)
+            for job_id, spec in zip(job_ids, specs):
+                self._specs[job_id] = spec
+                self._pending.append(job_id)
+        return job_ids
+
+    def _requeue(self, job_id, message):
+        # A job whose lease is lost goes back to the queue (first in line), unless it ran out of attempts
+        del self._leases[job_id]
+        if self._attempts[job_id] >= self.max_attempts:
+            self._failed[job_id] = message
+        else:
+            self._pending.appendleft(job_id)
+
+    def _requeue_expired(self):
+        now = time.monotonic()
+        for job_id in [job_id for job_id, (_, deadline) in self._leases.items() if deadline < now]:
+            self._requeue(job_id, f"lease of {self._leases[job_id][0]} expired")
+
+    def lease(self, worker):
+        """
+        Lease the next job to a worker.
+
+        :param str worker: Name of the worker.
+        :return: (job_id, spec, lease_timeout), or None if there is no job waiting.
+        """
+        with self._lock:
+            self._workers[worker] = time.monotonic()
+            self._requeue_expired()
+            if not self._pending:
+                return None
+            job_id = self._pending.popleft()
+            self._leases[job_id] = (worker, time.monotonic() + self.lease_timeout)
+            self._attempts[job_id] += 1
+            return job_id, self._specs[job_id], self.lease_timeout
+
+    def renew(self, job_id, worker):
+        """
+        Extend the lease of a running job.
+
+        :return: bool, False if the job is no longer leased to ``worker``.
+        """
+        with self._lock:
+            self._workers[worker] = time.monotonic()
+            if self._leases.get(job_id, (None,))[0] != worker:
+                return False
+            self._leases[job_id] = (worker, time.monotonic() + self.lease_timeout)
+            return True
+
+    def complete(self, job_id, result):
+        """
+        Add the result of a job (ignored if the job already has one or was cancelled).
+
+        :return: bool, True if the result is taken.
+        """
+        with self._lock:
+            if job_id in self._done or job_id in self._failed or job_id not in self._specs:
+                return False
+            self._leases.pop(job_id, None)
+            if job_id in self._pending:
+                self._pending.remove(job_id)
+            self._done.add(job_id)
+            self._results.append((self._specs[job_id], result))
+            return True
+
+    def fail(self, job_id, message):
+        """
+        Report a failed run of a job, which is retried if it has attempts left.
+        """
+        with self._lock:
+            if job_id in self._leases:
+                self._requeue(job_id, message)
+
+    def take_results(self):
+        """
+        Return the (spec, result) pairs completed since the last call.
+
+        :return: list
+        """
+        with self._lock:
+            results, self._results = self._results, []
+        return results
+
+    def poll(self):
+        """
+        Take the results (as ``take_results``) and the status (as ``status``) at once, so that no job completes in
+        between: once the status has no pending or running jobs, the results include the last ones.
+
+        :returns: list, dict
+        """
+        with self._lock:
+            results, self._results = self._results, []
+            return results, self._status()
+
+    def failures(self):
+        """
+        Return the specs of the jobs given up, with their last errors.
+
+        :return: list of (dict, str)
+        """
+        with self._lock:
+            return [(self._specs[job_id], message) for job_id, message in self._failed.items()]
+
+    def cancel(self):
+        """
+        Drop the jobs waiting in the queue; the running ones can still complete.
+        """
+        with self._lock:
+            self._pending.clear()
+
+    def status(self):
+        """
+        Return the number of pending, running, done, and failed jobs, and the number of workers seen within the last
+        lease timeout (as a dict).
+        """
+        with self._lock:
+            return self._status()
+
+    def _status(self):
+        self._requeue_expired()
+        now = time.monotonic()
+        return dict(pending=len(self._pending), running=len(self._leases), done=len(self._done),
+                    failed=len(self._failed),
+                    workers=sum(now - seen <= self.lease_timeout for seen in self._workers.values()))
+
+
+# The queue of the coordinator process
+_queue = None
+
+
+def _configure(lease_timeout, max_attempts):
+    global _queue
+    _queue = JobQueue(lease_timeout, max_attempts)
+
+
+def _get_queue():
+    return _queue
+
+
+class _QueueManager(BaseManager):
+    pass
+
+
+_QueueManager.register('get_queue', callable=_get_queue)
+
+
+class Coordinator:
+    """
+    Server of a job queue in a separate process.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, authkey=b'', host='', lease_timeout=300.0, max_attempts=3, mp_context=None):
+        """
+        :param int port: Optional. TCP port of the server. The default is ``DEFAULT_PORT``.
+        :param bytes authkey: Optional. Key shared with the workers.
+        :param str host: Optional. Interface to listen on. The default is all of them ('127.0.0.1' limits the workers
+            to this machine).
+        :param float lease_timeout: Optional. See ``JobQueue``. The default is 300.0.
+        :param int max_attempts: Optional. See ``JobQueue``. The default is 3.
+        :param mp_context: Optional. Multiprocessing context of the server process.
+        """
+        self.address = (host, port)
+        self._manager = _QueueManager(address=self.address, authkey=authkey, ctx=mp_context)
+        self._settings = (lease_timeout, max_attempts)
+        self.queue = None
+
+    def start(self):
+        """
+        Start the server process; ``queue`` is then a proxy of its job queue.
+        """
+        self._manager.start(_configure, self._settings)
+        self.queue = self._manager.get_queue()
+
+    def shutdown(self):
+        self.queue = None
+        self._manager.shutdown()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def connect(address, authkey):
+    """
+    Connect to a coordinator.
+
+    :param tuple address: (host, port) of the coordinator.
+    :param bytes authkey: Key of the coordinator.
+    :return: proxy of its JobQueue
+    """
+    manager = _QueueManager(address=address, authkey=authkey)
+    manager.connect()
+    return manager.get_queue()
+
+
+def work(address, authkey, name=None, poll_interval=1.0, retry_interval=5.0, once=False, log=None):
+    """
+    Run the jobs of a coordinator, reconnecting when the connection is lost.
+
+    :param tuple address: (host, port) of the coordinator.
+    :param bytes authkey: Key of the coordinator.
+    :param str name: Optional. Name of the worker. The default is host:pid.
+    :param float poll_interval: Optional. Time (s) between requests while the queue is empty. The default is 1.0.
+    :param float retry_interval: Optional. Time (s) between connection attempts. The default is 5.0.
+    :param bool once: Optional. If True, return when the coordinator goes away instead of waiting for the next one.
+    :param callable log: Optional. Called with the messages of the worker.
+    :return: int, the number of completed jobs.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    log = log or (lambda message: None)
+    num_jobs = 0
+    connected = False
+    while True:
+        try:
+            queue = connect(address, authkey)
+            if not connected:
+                log(f"{name}: connected to {address[0]}:{address[1]}")
+            connected = True
+            while True:
+                job = queue.lease(name)
+                if job is None:
+                    time.sleep(poll_interval)
+                    continue
+                job_id, spec, lease_timeout = job
+
+                # The lease is renewed while the run goes on
+                finished = threading.Event()
+
+                def heartbeat():
+                    try:
+                        while not finished.wait(lease_timeout / 3):
+                            queue.renew(job_id, name)
+                    except (OSError, EOFError):
+                        pass  # The main loop notices the lost connection
+
+                heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+                heartbeat_thread.start()
+                try:
+                    result = engine.run_spec(spec)
+                except Exception as error:
+                    finished.set()
+                    queue.fail(job_id, f"{name}: {type(error).__name__}: {error}")
+                    log(f"{name}: job {job_id} failed ({error})")
+                else:
+                    finished.set()
+                    queue.complete(job_id, result)
+                    num_jobs += 1
+                heartbeat_thread.join()
+        except (OSError, EOFError):
+            # No coordinator (yet), or it went away
+            if connected:
+                log(f"{name}: disconnected after {num_jobs} jobs")
+            if once and connected:
+                return num_jobs
+            connected = False
+            time.sleep(retry_interval)
+
+
+def _print_message(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def _parse_address(text):
+    host, _, port = text.rpartition(':')
+    return host or 'localhost', int(port) if port else DEFAULT_PORT
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m customhys_qt.distributed',
+                                     description='Run the jobs of a CUSTOMHyS-Qt coordinator.')
+    parser.add_argument('address', help='HOST:PORT of the coordinator')
+    parser.add_argument('--authkey', required=True, help='key of the coordinator')
+    parser.add_argument('-p', '--processes', type=int, default=1, help='number of worker processes (default: 1)')
+    parser.add_argument('--once', action='store_true', help='stop when the coordinator goes away')
+    args = parser.parse_args(argv)
+
+    address = _parse_address(args.address)
+    authkey = args.authkey.encode()
+    if args.processes <= 1:
+        try:
+            work(address, authkey, once=args.once, log=_print_message)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=work, args=(address, authkey),
+                                 kwargs=dict(name=f"{socket.gethostname()}:{os.getpid()}.{index}", once=args.once,
+                                             log=_print_message))
+                 for index in range(args.processes)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
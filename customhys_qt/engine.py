@@ -0,0 +1,176 @@
+"""
+Execution engine for running metaheuristics outside the GUI event loop.
+
+A run is described by a ``spec`` dictionary with the same information that the main window reads from its widgets:
+
+    spec = dict(problem='Sphere', dimensions=2, boundaries=(-5.0, 5.0), population=30, iterations=100,
+                operators=[('random_search', {'scale': 0.01, 'distribution': 'uniform'}, 'greedy')], seed=None)
+
+Independent repetitions of a spec can be spread over the CPU cores with ``iter_batch``. Every run counts its fitness
+evaluations (see ``telemetry``), a spec with ``profile=True`` also returns the time breakdown of its steps (see
+``profiling``), and the optional keys of ``stopping.POLICY_KEYS`` end a run before its last iteration. The population is
+evaluated in batches (see ``evaluation``) unless the spec has ``batch_evaluation=False``.
+"""
+
+import concurrent.futures
+import os
+from timeit import default_timer as timer
+
+import numpy as np
+from customhys import benchmark_func as cbf
+from customhys import metaheuristic as cmh
+
+from . import evaluation, profiling, search_operators, stopping, telemetry
+
+__all__ = ['get_problem', 'build_metaheuristic', 'run_spec', 'make_seed', 'iter_batch']
+
+
+def get_problem(problem_name, dimensions, boundaries=None):
+    """
+    Create a benchmark problem from its name in ``customhys.benchmark_func``.
+
+    :param str problem_name: Name of the problem class, e.g., 'Sphere'.
+    :param int dimensions: Number of dimensions of the problem domain.
+    :param tuple boundaries: Optional. Lower and upper boundaries (floats). If None, the default range is kept.
+    :return: BasicProblem
+    """
+    problem = getattr(cbf, problem_name)(dimensions)
+    if boundaries is not None:
+        problem.set_search_range(float(boundaries[0]), float(boundaries[1]))
+    return problem
+
+
+def build_metaheuristic(spec):
+    """
+    Build the problem and the metaheuristic described by ``spec``.
+
+    :param dict spec: Run specification.
+    :returns: Metaheuristic, BasicProblem
+    """
+    problem = get_problem(spec['problem'], spec['dimensions'], spec.get('boundaries'))
+    mh = cmh.Metaheuristic(problem.get_formatted_problem(), list(spec['operators']),
+                           num_agents=spec['population'], num_iterations=spec['iterations'])
+    return mh, problem
+
+
+def run_spec(spec, progress=None, should_stop=None, frames=None):
+    """
+    Run the metaheuristic described by ``spec``.
+
+    :param dict spec: Run specification.
+    :param callable progress: Optional. Called as ``progress(iteration, best_fitness)`` once per iteration.
+    :param callable should_stop: Optional. Polled once per iteration; when it returns True, the run is cancelled.
+    :param FrameBuffer frames: Optional. Buffer where the positions of the population are recorded once per iteration
+        (see ``frames``).
+    :return: dict with the 'fitness' history, the last 'position' and 'centroid', the elapsed 'time', the 'seed', a
+        'cancelled' flag, the number of 'iterations' done, the 'stop_reason' (one of ``stopping.STOP_REASONS``), and the
+        'profile' of the run (None if it is not requested), and the number of fitness 'evaluations' with the
+        'evaluation_time' spent in them (see ``telemetry``).
+    """
+    # The operators in customhys draw from the global numpy generator
+    if spec.get('seed') is not None:
+        np.random.seed(spec['seed'])
+
+    mh, problem = build_metaheuristic(spec)
+    counter = telemetry.EvaluationCounter()
+    counter.attach(mh)
+    if spec.get('batch_evaluation', True):
+        evaluation.BatchedEvaluator(problem, counter).attach(mh)
+
+    profiler = None
+    if spec.get('profile'):
+        profiler = profiling.RunProfiler([
+            f"{index}. {search_operators.SearchOperator.from_tuple(operator).pretty_name}"
+            for index, operator in enumerate(spec['operators'], start=1)])
+        profiler.attach(mh)
+
+    cancelled = [False]
+
+    # The finalisation conditions are checked once per iteration, so they are used as a hook for monitoring the run
+    def monitor():
+        if frames is not None:
+            frames.record(mh.pop.iteration, mh.pop.rescale_back(mh.pop.positions))
+        if progress is not None:
+            progress(mh.pop.iteration, float(mh.historical['fitness'][-1]))
+        if should_stop is not None and should_stop():
+            cancelled[0] = True
+        return cancelled[0]
+
+    policy = stopping.StoppingPolicy.from_spec(spec, problem)
+    mh.set_finalisation_conditions([monitor, policy] if policy.is_active else [monitor])
+
+    # Run simulation
+    start_time = timer()
+    policy.start(mh, len(spec['operators']))
+    mh.run()
+    elapsed_time = timer() - start_time
+
+    if cancelled[0]:
+        stop_reason = 'cancelled'
+    else:
+        stop_reason = policy.reason or 'iterations'
+
+    return dict(fitness=np.array(mh.historical['fitness'], dtype=float),
+                position=np.array(mh.historical['position'][-1]),
+                centroid=np.array(mh.historical['centroid'][-1]),
+                time=elapsed_time,
+                seed=spec.get('seed'),
+                cancelled=cancelled[0],
+                iterations=int(mh.pop.iteration),
+                stop_reason=stop_reason,
+                profile=None if profiler is None else profiler.profile(elapsed_time),
+                evaluations=counter.evaluations,
+                evaluation_time=counter.evaluation_time)
+
+
+def make_seed(base_seed=None, run_index=0):
+    """
+    Return the seed of the ``run_index``-th repetition derived from ``base_seed``. If ``base_seed`` is None, a fresh
+    random seed is returned.
+
+    :param int base_seed: Optional. Seed of the whole batch.
+    :param int run_index: Optional. Index of the repetition within the batch.
+    :return: int
+    """
+    if base_seed is None:
+        return int(np.random.SeedSequence().generate_state(1)[0])
+    return int(np.random.SeedSequence(base_seed, spawn_key=(run_index,)).generate_state(1)[0])
+
+
+def iter_batch(specs, max_workers=None, should_stop=None, mp_context=None, poll_interval=0.2, with_specs=False):
+    """
+    Run independent specs in a process pool and yield their results as soon as each one is completed (not in the
+    submission order).
+
+    :param list specs: Run specifications, usually repetitions of the same spec with different seeds.
+    :param int max_workers: Optional. Number of worker processes. The default is the number of CPU cores.
+    :param callable should_stop: Optional. Polled while waiting; when it returns True, the pending runs are cancelled.
+    :param mp_context: Optional. Multiprocessing context for the pool, e.g., ``multiprocessing.get_context('spawn')``.
+    :param float poll_interval: Optional. Time (s) between checks of ``should_stop``.
+    :param bool with_specs: Optional. If True, (spec, result) pairs are yielded instead of results. The default is
+        False.
+    :return: generator of dict
+    """
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(specs) or 1))
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+    pending = set()
+    try:
+        submitted = {executor.submit(run_spec, spec): spec for spec in specs}
+        pending = set(submitted)
+        while pending:
+            if should_stop is not None and should_stop():
+                break
+            done, pending = concurrent.futures.wait(pending, timeout=poll_interval,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield (submitted[future], future.result()) if with_specs else future.result()
+    except Exception:
+        # A failed run ends the batch: the runs not started are dropped, and the running ones are waited for, so the
+        # pool is down before the caller reports the error (and maybe exits)
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        # Drop the runs that have not started yet, the running ones finish in their processes
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
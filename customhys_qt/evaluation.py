@@ -0,0 +1,97 @@
+"""
+Batched evaluation of the fitness of a population.
+
+``customhys`` evaluates a population agent by agent, with one Python call of the objective function per agent. For
+cheap benchmark functions, these calls take most of the run time. A ``BatchedEvaluator`` replaces the fitness
+evaluation of the population of a metaheuristic with a single call over the whole population matrix (see
+``landscape.evaluate_batch``). Problems whose function cannot be evaluated in batches (or gives different values) fall
+back to the agent-by-agent evaluation.
+
+Each call of ``BasicProblem.get_function_value`` draws a noise value from the global numpy generator (even when the
+noise level is zero), so the batched evaluation draws one value per agent too. This keeps the random stream of the
+search operators, and thus a seeded run gives the same results with either evaluation. Problems with noise are always
+evaluated agent by agent, and so are the problems whose function draws random numbers (e.g., ``Stochastic``), which the
+check of ``evaluate_batch`` finds not vectorisable.
+
+The batched evaluations are added to the ``telemetry.EvaluationCounter`` of the run, if any, as the objective function
+is no longer called per agent.
+"""
+
+from timeit import default_timer as timer
+
+import numpy as np
+
+from . import landscape
+
+__all__ = ['BatchedEvaluator']
+
+
+class BatchedEvaluator:
+    """
+    Fitness evaluation of a whole population in one call of the problem function.
+    """
+
+    def __init__(self, problem, counter=None):
+        """
+        :param BasicProblem problem: Problem from ``customhys.benchmark_func``, the one of the metaheuristic.
+        :param EvaluationCounter counter: Optional. Counter of the evaluations of the run.
+        """
+        self.problem = problem
+        self.counter = counter
+        # Noise settings of the problem (private attributes of ``BasicProblem``)
+        self.noise_level = getattr(problem, '_BasicProblem__noise_level', 0.0)
+        self.noise_type = getattr(problem, '_BasicProblem__noise_type', 'uniform')
+
+    @property
+    def is_applicable(self):
+        return not self.noise_level
+
+    def _draw_noise(self, size):
+        # Same draws as ``size`` calls of ``BasicProblem.get_function_value``
+        if self.noise_type in ['gaussian', 'normal', 'gauss']:
+            np.random.randn(size)
+        else:
+            np.random.rand(size)
+
+    def attach(self, mh):
+        """
+        Replace the fitness evaluation of the population of ``mh`` (unless its problem has noise); it must be called
+        before running it.
+
+        :param Metaheuristic mh: Metaheuristic whose objective function is the one of ``problem``.
+        :return: bool, True if the evaluation is batched.
+        """
+        if not self.is_applicable:
+            return False
+        pop = mh.pop
+
+        # Same steps as ``Population.evaluate_fitness``, with the agents evaluated at once
+        def evaluate_fitness(problem_function):
+            if pop.is_constrained:
+                pop._check_simple_constraints()
+            start_time = timer()
+            points = pop.rescale_back(pop.positions)
+            is_vectorisable = landscape.is_vectorisable(self.problem)
+            if is_vectorisable is None:
+                # The first batch is also checked point by point, so the draws are not known in advance: they are
+                # rewound, and then made as the chosen evaluation makes them
+                random_state = np.random.get_state()
+                values = landscape.evaluate_batch(self.problem, points)
+                np.random.set_state(random_state)
+                if landscape.is_vectorisable(self.problem):
+                    pop.fitness[:] = values
+                    self._draw_noise(pop.num_agents)
+                else:
+                    # Replay the agent-by-agent evaluation, as its function may draw random numbers too
+                    pop.fitness[:] = landscape.evaluate_batch(self.problem, points)
+            else:
+                # One draw in the single call (or one per agent in the fallback)
+                pop.fitness[:] = landscape.evaluate_batch(self.problem, points)
+                if is_vectorisable:
+                    self._draw_noise(pop.num_agents - 1)
+            if self.counter is not None:
+                self.counter.evaluation_time += timer() - start_time
+                self.counter.evaluations += pop.num_agents
+
+        pop.evaluate_fitness = evaluate_fitness
+        return True
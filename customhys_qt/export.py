@@ -0,0 +1,192 @@
+"""
+Streaming export of run results.
+
+A ``RunWriter`` appends one row per finished run to a file, so that long batches and sweeps are saved as they go
+(and an interrupted one keeps its finished runs). Each row holds the configuration of the run and a summary of its
+result:
+
+    problem, dimensions, lower_boundary, upper_boundary, population, iterations, operators, stopping, seed,
+    final_fitness, time, iterations_done, stop_reason, position, centroid
+
+plus, optionally, the convergence curve (the best fitness of each iteration) in a ``fitness_curve`` column. The
+boundaries are empty when the run uses the default range of its problem, and ``stopping`` holds the stopping policies
+of the run (see ``stopping.POLICY_KEYS``) as a JSON object, empty if there is none.
+
+The rows are buffered and written in blocks of ``buffer_size`` rows (or when ``flush_interval`` seconds have passed
+since the last write), so the memory held by the writer stays bounded whatever the number of runs. Two formats are
+supported:
+
+    csv         the vectors (position, centroid, and curve) are written as space-separated values, and the
+                operators as a list of (name, parameters, selector) tuples (readable with ``ast.literal_eval``)
+    parquet     columnar file with list columns for the vectors and the operators (one tuple literal per operator, see
+                ``search_operators.parse_operator``), one row group per block; it needs ``pyarrow``, and the file is
+                readable only once the writer is closed
+
+The format is taken from the extension of the file ('.parquet' or '.pq' for Parquet, CSV otherwise).
+"""
+
+import csv
+import json
+import os
+from timeit import default_timer as timer
+
+import numpy as np
+
+from . import stopping
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+__all__ = ['FIELDS', 'CURVE_FIELD', 'FORMATS', 'available_formats', 'format_of', 'RunWriter']
+
+FIELDS = ['problem', 'dimensions', 'lower_boundary', 'upper_boundary', 'population', 'iterations', 'operators',
+          'stopping', 'seed', 'final_fitness', 'time', 'iterations_done', 'stop_reason', 'position', 'centroid']
+
+CURVE_FIELD = 'fitness_curve'
+
+FORMATS = ['csv', 'parquet']
+
+_parquet_extensions = ('.parquet', '.pq')
+
+
+def available_formats():
+    """
+    Return the formats that can be written with the installed packages.
+
+    :return: list of str
+    """
+    return [file_format for file_format in FORMATS if file_format != 'parquet' or pyarrow is not None]
+
+
+def format_of(file_path):
+    """
+    Return the format of a file from its extension.
+    """
+    return 'parquet' if os.path.splitext(file_path)[1].lower() in _parquet_extensions else 'csv'
+
+
+def _vector_text(values):
+    return " ".join(repr(float(value)) for value in values)
+
+
+def _csv_value(field, value):
+    if value is None:
+        return ''
+    if field in ('final_fitness', 'operators'):
+        return repr(value)
+    if field == 'time':
+        return f"{value:.6f}"
+    if isinstance(value, np.ndarray):
+        return _vector_text(value)
+    return value
+
+
+class RunWriter:
+    """
+    Buffered writer of run results into a CSV or Parquet file, one row per run.
+    """
+
+    def __init__(self, file_path, curves=False, buffer_size=64, flush_interval=5.0):
+        """
+        :param str file_path: Location of the file (it is overwritten). Its extension gives the format.
+        :param bool curves: Optional. If True, the convergence curve of each run is written too. The default is False.
+        :param int buffer_size: Optional. Number of rows written at once. The default is 64.
+        :param float flush_interval: Optional. Maximum time (s) a row waits in the buffer; it is checked on each new
+            row. The default is 5.0.
+        """
+        self.file_path = file_path
+        self.file_format = format_of(file_path)
+        if self.file_format not in available_formats():
+            raise ValueError(f"the {self.file_format} format needs a package that is not installed (pyarrow)")
+        if buffer_size < 1:
+            raise ValueError("the buffer size must be positive")
+        self.curves = curves
+        self.buffer_size = int(buffer_size)
+        self.flush_interval = flush_interval
+        self.fields = FIELDS + ([CURVE_FIELD] if curves else [])
+        self.num_rows = 0
+        self._rows = []
+        self._last_flush = timer()
+        self._file = None
+        self._writer = None
+
+        if self.file_format == 'csv':
+            self._file = open(file_path, 'w', newline='')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.fields)
+        else:
+            float_list = pyarrow.list_(pyarrow.float64())
+            types = dict(problem=pyarrow.string(), dimensions=pyarrow.int64(), lower_boundary=pyarrow.float64(),
+                         upper_boundary=pyarrow.float64(), population=pyarrow.int64(), iterations=pyarrow.int64(),
+                         operators=pyarrow.list_(pyarrow.string()), stopping=pyarrow.string(), seed=pyarrow.int64(),
+                         final_fitness=pyarrow.float64(), time=pyarrow.float64(), iterations_done=pyarrow.int64(),
+                         stop_reason=pyarrow.string(), position=float_list, centroid=float_list,
+                         fitness_curve=float_list)
+            self._schema = pyarrow.schema([(field, types[field]) for field in self.fields])
+            self._writer = pyarrow.parquet.ParquetWriter(file_path, self._schema)
+
+    def write(self, spec, result):
+        """
+        Append the result of a run (it reaches the file when the buffer is flushed).
+
+        :param dict spec: Run specification.
+        :param dict result: Result of the run.
+        :return: None.
+        """
+        boundaries = spec.get('boundaries') or (None, None)
+        policies = {key: spec[key] for key in stopping.POLICY_KEYS if spec.get(key) is not None}
+        row = [spec['problem'], int(spec['dimensions']),
+               None if boundaries[0] is None else float(boundaries[0]),
+               None if boundaries[1] is None else float(boundaries[1]), int(spec['population']),
+               int(spec['iterations']), [tuple(operator) for operator in spec['operators']],
+               json.dumps(policies) if policies else None, None if spec.get('seed') is None else int(spec['seed']),
+               float(result['fitness'][-1]), float(result['time']), result.get('iterations'), result.get('stop_reason'),
+               np.asarray(result['position'], dtype=float).ravel(), np.asarray(result['centroid'], dtype=float).ravel()]
+        if self.curves:
+            row.append(np.asarray(result['fitness'], dtype=float))
+        self._rows.append(row)
+        self.num_rows += 1
+        if len(self._rows) >= self.buffer_size or timer() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows into the file.
+
+        :return: None.
+        """
+        self._last_flush = timer()
+        if not self._rows or self._writer is None:
+            return
+        if self.file_format == 'csv':
+            self._writer.writerows([[_csv_value(field, value) for field, value in zip(self.fields, row)]
+                                    for row in self._rows])
+            self._file.flush()
+        else:
+            columns = [[row[column] for row in self._rows] for column in range(len(self.fields))]
+            operators_column = self.fields.index('operators')
+            columns[operators_column] = [[repr(operator) for operator in operators]
+                                         for operators in columns[operators_column]]
+            self._writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(values, type=self._schema.field(column).type) for column, values in enumerate(columns)],
+                schema=self._schema))
+        self._rows = []
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        if self.file_format == 'csv':
+            self._file.close()
+        else:
+            self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,113 @@
+"""
+Bounded buffer of the positions of a population along a run, for animations.
+
+A ``FrameBuffer`` keeps the positions of (at most ``max_agents``) agents in their first two dimensions, one frame per
+recorded iteration, in a preallocated array of ``capacity`` frames. Frames are recorded every ``stride`` iterations;
+when the array is full, every other frame is dropped and the stride doubles, so the buffer always spans the whole run
+with a bounded memory footprint (``capacity * max_agents * 2`` floats), whatever the number of iterations. The last
+positions are also kept apart, so a live view can show every iteration.
+
+A run records its frames when ``engine.run_spec`` is given a buffer. The buffer can be read from another thread while
+the run goes on.
+"""
+
+import threading
+
+import numpy as np
+
+__all__ = ['FrameBuffer']
+
+
+class FrameBuffer:
+    """
+    Decimated frames of the positions (first two dimensions) and centroid of a population.
+    """
+
+    def __init__(self, capacity=256, max_agents=500):
+        """
+        :param int capacity: Optional. Maximum number of frames. The default is 256.
+        :param int max_agents: Optional. Maximum number of agents per frame; larger populations are subsampled (always
+            the same agents). The default is 500.
+        """
+        if capacity < 2 or max_agents < 1:
+            raise ValueError("the capacity must be at least 2, and max_agents positive")
+        self.capacity = int(capacity)
+        self.max_agents = int(max_agents)
+        self.stride = 1
+        self.num_frames = 0
+        self.iterations = np.zeros(self.capacity, dtype=np.int64)
+        self.positions = None
+        self.centroids = np.zeros((self.capacity, 2))
+        self.last_iteration = -1
+        self.last_positions = None
+        self.last_centroid = None
+        self._agents = None
+        self._lock = threading.Lock()
+
+    def record(self, iteration, positions):
+        """
+        Record the positions of the population at an iteration (only every ``stride`` iterations are kept as frames).
+
+        :param int iteration: Iteration of the run.
+        :param numpy.ndarray positions: N-by-D array with the positions of the agents.
+        :return: None.
+        """
+        positions = np.asarray(positions, dtype=float)
+        if self._agents is None:
+            num_agents = positions.shape[0]
+            self._agents = (np.arange(num_agents) if num_agents <= self.max_agents
+                            else np.linspace(0, num_agents - 1, self.max_agents).astype(int))
+            self.positions = np.zeros((self.capacity, self._agents.size, 2))
+        # The first two dimensions, or the first one against zero for 1D problems
+        plane = np.zeros((positions.shape[0], 2))
+        plane[:, :min(positions.shape[1], 2)] = positions[:, :2]
+        centroid = plane.mean(axis=0)
+        plane = plane[self._agents]
+
+        with self._lock:
+            self.last_iteration = int(iteration)
+            self.last_positions = plane
+            self.last_centroid = centroid
+            if iteration % self.stride != 0:
+                return
+            if self.num_frames == self.capacity:
+                # Keep every other frame, and record half as often from now on
+                kept = self.capacity // 2
+                for array in [self.iterations, self.positions, self.centroids]:
+                    array[:kept] = array[0:self.capacity:2][:kept]
+                self.num_frames = kept
+                self.stride *= 2
+                if iteration % self.stride != 0:
+                    return
+            self.iterations[self.num_frames] = iteration
+            self.positions[self.num_frames] = plane
+            self.centroids[self.num_frames] = centroid
+            self.num_frames += 1
+
+    def __len__(self):
+        return self.num_frames
+
+    def latest(self):
+        """
+        Return the last recorded iteration, positions, and centroid (None if nothing has been recorded yet).
+
+        :returns: int, numpy.ndarray, numpy.ndarray
+        """
+        with self._lock:
+            return self.last_iteration, self.last_positions, self.last_centroid
+
+    def frame(self, index):
+        """
+        Return the iteration, positions, and centroid of a frame.
+
+        :param int index: Index of the frame, from 0 to ``len(self) - 1``.
+        :returns: int, numpy.ndarray, numpy.ndarray
+        """
+        with self._lock:
+            if not 0 <= index < self.num_frames:
+                raise IndexError(f"frame {index} out of range")
+            return int(self.iterations[index]), self.positions[index].copy(), self.centroids[index].copy()
+
+    @property
+    def nbytes(self):
+        return self.iterations.nbytes + self.centroids.nbytes + (0 if self.positions is None else self.positions.nbytes)
@@ -0,0 +1,152 @@
+"""
+Headless (command line) mode of CUSTOMHyS-Qt, for running experiments on machines without a display.
+
+An experiment is described by a JSON file with the same information that the GUI reads from its widgets, e.g.:
+
+    {"problem": "Sphere", "dimensions": 10, "boundaries": [-5.0, 5.0], "population": 30, "iterations": 100,
+     "operators": [["random_search", {"scale": 0.01, "distribution": "uniform"}, "greedy"]],
+     "repetitions": 30, "seed": 42}
+
+``boundaries`` is optional (the default range of the problem is used), and the seeds of the runs are either derived
+from ``seed`` or given explicitly as a ``seeds`` list. The stopping policies of ``stopping`` (e.g.,
+``"stagnation_iterations": 50``) are optional keys as well. The results are saved in the format read by the GUI (see
+``store.RunStore``). An invalid experiment (e.g., an unknown problem or search operator) ends with exit code 2 and a
+failed run with exit code 1, with the error on stderr (the runs exported so far are kept).
+
+Usage:
+    python customhys-qt.py --headless experiment.json -o results.npz [--workers N] [--no-cache]
+        [--export runs.csv [--curves]]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# customhys imports pyplot, so keep matplotlib away from any GUI backend
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from customhys import benchmark_func as cbf  # noqa: E402
+
+from . import cache, engine, export, search_operators, stopping, store, telemetry  # noqa: E402
+
+__all__ = ['load_experiment', 'make_run_specs', 'main']
+
+_required_keys = ['problem', 'dimensions', 'population', 'iterations', 'operators']
+
+
+def load_experiment(file_path):
+    """
+    Read and validate an experiment from a JSON file.
+
+    :param str file_path: Location of the JSON file.
+    :return: dict
+    """
+    with open(file_path, 'r') as experiment_file:
+        experiment = json.load(experiment_file)
+
+    missing_keys = [key for key in _required_keys if key not in experiment]
+    if missing_keys:
+        raise ValueError('missing keys in the experiment: {}'.format(', '.join(missing_keys)))
+    if not isinstance(experiment['problem'], str) or experiment['problem'] not in cbf.__all__:
+        raise ValueError(f"unknown problem: {experiment['problem']!r}")
+    for key in ['dimensions', 'population', 'iterations']:
+        if not isinstance(experiment[key], int) or experiment[key] < 1:
+            raise ValueError(f"'{key}' must be a positive integer")
+    if not experiment['operators']:
+        raise ValueError("'operators' cannot be empty")
+
+    experiment['operators'] = [search_operators.SearchOperator.from_tuple(operator).to_tuple()
+                               for operator in experiment['operators']]
+    if 'boundaries' in experiment:
+        experiment['boundaries'] = tuple(float(value) for value in experiment['boundaries'])
+    stopping.StoppingPolicy.from_spec(experiment)  # Check the stopping policies (if any)
+    return experiment
+
+
+def make_run_specs(experiment):
+    """
+    Expand an experiment into the specs of its repetitions, one seed per run.
+
+    :param dict experiment: Experiment as returned by ``load_experiment``.
+    :return: list of dict
+    """
+    if 'seeds' in experiment:
+        seeds = [int(seed) for seed in experiment['seeds']]
+    else:
+        seeds = [engine.make_seed(experiment.get('seed'), run_index)
+                 for run_index in range(int(experiment.get('repetitions', 1)))]
+
+    optional_keys = ['boundaries'] + stopping.POLICY_KEYS
+    spec = {key: experiment[key] for key in _required_keys + optional_keys if key in experiment}
+    return [dict(spec, seed=seed) for seed in seeds]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='customhys-qt.py --headless', description='Run an experiment without GUI.')
+    parser.add_argument('experiment', help='JSON file with the experiment')
+    parser.add_argument('-o', '--output', required=True, help='.npz file where the results are saved')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of worker processes (default: number of CPU cores)')
+    parser.add_argument('--no-cache', action='store_true', help='run every repetition, even if its result is cached')
+    parser.add_argument('--export', default=None,
+                        help='CSV or Parquet file where every run is appended as it finishes (see customhys_qt.export)')
+    parser.add_argument('--curves', action='store_true', help='export the convergence curves too')
+    args = parser.parse_args(argv)
+
+    try:
+        experiment = load_experiment(args.experiment)
+    except (OSError, ValueError) as error:
+        print(f"Invalid experiment: {error}", file=sys.stderr)
+        return 2
+
+    specs = make_run_specs(experiment)
+    try:
+        writer = export.RunWriter(args.export, curves=args.curves) if args.export else None
+    except (OSError, ValueError) as error:
+        print(f"Export file not opened: {error}", file=sys.stderr)
+        return 2
+    run_store = store.RunStore(capacity=len(specs))
+    totals = telemetry.EvaluationTotals()
+
+    def add_result(spec, result):
+        if writer is not None:
+            writer.write(spec, result)
+        run_store.append(result)
+        totals.update(result)
+        notes = [f"stopped by {result['stop_reason']} at iteration {result['iterations']}"
+                 if result['stop_reason'] != 'iterations' else "", "cached" if result.get('cached') else ""]
+        print("Run {}/{}: fitness = {:.6g}, time = {:.2f} s{}".format(
+            len(run_store), len(specs), result['fitness'][-1], result['time'],
+            "".join(f" ({note})" for note in notes if note)), file=sys.stderr)
+
+    # The repetitions with cached results (same spec and seed) do not run again. Random seeds would never be repeated,
+    # so their results are not cached
+    seeded = 'seed' in experiment or 'seeds' in experiment
+    result_cache = cache.ResultCache() if seeded and not args.no_cache else None
+    cached_runs, missing_specs = result_cache.split(specs) if result_cache is not None else ([], specs)
+    for spec, result in cached_runs:
+        add_result(spec, result)
+    try:
+        for spec, result in engine.iter_batch(missing_specs, args.workers or experiment.get('workers'),
+                                              with_specs=True):
+            if result_cache is not None:
+                result_cache.put(spec, result)
+            add_result(spec, result)
+    except Exception as error:
+        print(f"Run failed after {len(run_store)} runs: {type(error).__name__}: {error}", file=sys.stderr)
+        run_store.close()
+        if writer is not None:
+            writer.close()
+        return 1
+
+    run_store.save(args.output, experiment)
+    run_store.close()
+    if writer is not None:
+        writer.close()
+        print(f"Runs exported to {args.export}", file=sys.stderr)
+    if totals.runs > 0:
+        print("{} evaluations, {:.4g} evaluations/s, {:.1f}% of the time in the objective function".format(
+            totals.evaluations, totals.evals_per_second, 100 * totals.objective_share), file=sys.stderr)
+    print(f"Results saved in {args.output}", file=sys.stderr)
+    return 0
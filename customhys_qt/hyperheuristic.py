@@ -0,0 +1,181 @@
+"""
+Hyper-heuristic search of sequences of search operators.
+
+A ``SequenceAnnealer`` runs a simulated annealing over sequences of operators taken from a heuristic space (e.g., the
+collection of ``data/short_collection.txt``). On each step, it proposes some neighbours of the current sequence with one
+of these moves:
+
+    add       insert an operator of the heuristic space at a random position
+    remove    drop the operator at a random position
+    swap      exchange the operators at two random positions
+    replace   put another operator of the heuristic space at a random position
+
+The neighbours of a step run in parallel (each one with the same seeds), and the best of them is accepted with the
+Metropolis criterion on its relative change of score. The score of a sequence is the median of its final fitness values
+(lower is better). Scores are memoized by sequence, so no sequence is evaluated twice.
+"""
+
+import math
+
+import numpy as np
+
+from . import engine, search_operators
+
+__all__ = ['MOVES', 'SequenceAnnealer']
+
+MOVES = ['add', 'remove', 'swap', 'replace']
+
+
+class SequenceAnnealer:
+    """
+    Simulated annealing over sequences of search operators, with memoized scores.
+    """
+
+    def __init__(self, base_spec, heuristic_space, max_length=5, num_steps=30, num_neighbours=4, repetitions=3,
+                 temperature=1.0, cooling=0.9, seed=None):
+        """
+        :param dict base_spec: Run specification; its operators are the initial sequence (if empty, a random operator
+            is used) and its problem and budget the ones of every evaluation.
+        :param list heuristic_space: Search operators (SearchOperator) to compose the sequences with.
+        :param int max_length: Optional. Maximum number of operators in a sequence. The default is 5.
+        :param int num_steps: Optional. Number of annealing steps. The default is 30.
+        :param int num_neighbours: Optional. Neighbours proposed per step. The default is 4.
+        :param int repetitions: Optional. Runs per sequence. The default is 3.
+        :param float temperature: Optional. Initial temperature (of the relative change of score). The default is 1.0.
+        :param float cooling: Optional. Factor applied to the temperature after each step. The default is 0.9.
+        :param int seed: Optional. Seed of the moves and the runs. If None, they are random.
+        """
+        if not heuristic_space:
+            raise ValueError("the heuristic space is empty")
+        if max_length < 1 or num_steps < 1 or num_neighbours < 1 or repetitions < 1:
+            raise ValueError("max_length, num_steps, num_neighbours, and repetitions must be positive")
+        if not temperature > 0 or not 0 < cooling <= 1:
+            raise ValueError("the temperature must be positive, and the cooling factor in (0, 1]")
+        self.base_spec = {key: value for key, value in base_spec.items() if key != 'seed'}
+        self.heuristic_space = list(heuristic_space)
+        self.max_length = max_length
+        self.num_steps = num_steps
+        self.num_neighbours = num_neighbours
+        self.temperature = temperature
+        self.cooling = cooling
+        self.seeds = [engine.make_seed(seed, run_index) for run_index in range(repetitions)]
+        self._rng = np.random.default_rng(seed)
+
+        initial = tuple(search_operators.SearchOperator.from_tuple(operator)
+                        for operator in base_spec['operators'])[:max_length]
+        if not initial:
+            initial = (self.heuristic_space[self._rng.integers(len(self.heuristic_space))],)
+        if max_length == 1 and set(self.heuristic_space) <= set(initial):
+            raise ValueError("with a maximum length of 1, the heuristic space needs another operator to move to")
+        self.current, self.current_score = initial, np.inf
+        self.best, self.best_score = initial, np.inf
+        self.memo = dict()  # Score of each evaluated sequence
+        self.step = 0
+        self.history = []  # One record per finished step
+        self.neighbours = [initial]  # The first step only evaluates the initial sequence
+        self._moves = dict()  # Move that proposed each neighbour
+        self._pending = dict()
+        self._fitness = dict()
+
+    @property
+    def is_done(self):
+        return self.step > self.num_steps
+
+    def move(self, sequence):
+        """
+        Return a random neighbour of ``sequence`` and the name of its move.
+
+        :param tuple sequence: Sequence of SearchOperator.
+        :returns: tuple, str
+        """
+        others = [operator for operator in self.heuristic_space if operator not in sequence]
+        moves = [name for name, allowed in zip(MOVES, [len(sequence) < self.max_length, len(sequence) > 1,
+                                                       len(sequence) > 1, bool(others)]) if allowed]
+        name = moves[self._rng.integers(len(moves))]
+        sequence = list(sequence)
+        if name == 'add':
+            operator = self.heuristic_space[self._rng.integers(len(self.heuristic_space))]
+            sequence.insert(self._rng.integers(len(sequence) + 1), operator)
+        elif name == 'remove':
+            del sequence[self._rng.integers(len(sequence))]
+        elif name == 'replace':
+            sequence[self._rng.integers(len(sequence))] = others[self._rng.integers(len(others))]
+        else:
+            first, second = self._rng.choice(len(sequence), 2, replace=False)
+            sequence[first], sequence[second] = sequence[second], sequence[first]
+        return tuple(sequence), name
+
+    def specs(self):
+        """
+        Return the run specs of the neighbours of the current step that are not memoized yet (empty if the search is
+        done).
+
+        :return: list of dict
+        """
+        if self.is_done:
+            return []
+        # The specs are kept while pending, so their ids identify them
+        self._pending = dict()
+        self._fitness = dict()
+        for sequence in self.neighbours:
+            if sequence in self.memo or sequence in self._fitness:
+                continue
+            self._fitness[sequence] = []
+            operators = [operator.to_tuple() for operator in sequence]
+            for seed in self.seeds:
+                spec = dict(self.base_spec, operators=operators, seed=seed)
+                self._pending[id(spec)] = (spec, sequence)
+        return [spec for spec, _ in self._pending.values()]
+
+    def add(self, spec, result):
+        """
+        Add the result of a run of the current step.
+
+        :param dict spec: Run specification, as returned by ``specs``.
+        :param dict result: Result of the run.
+        :return: None.
+        """
+        _, sequence = self._pending.pop(id(spec))
+        final_fitness = float(result['fitness'][-1])
+        self._fitness[sequence].append(final_fitness if np.isfinite(final_fitness) else np.inf)
+
+    def accept(self, score):
+        # Metropolis criterion on the relative change of score
+        if score <= self.current_score:
+            return True
+        if not np.isfinite(score):
+            return False
+        change = (score - self.current_score) / max(abs(self.current_score), 1e-12)
+        return bool(self._rng.random() < math.exp(-change / self.temperature))
+
+    def advance(self):
+        """
+        Finish the current step: score its neighbours, accept (or not) the best one, and propose the next neighbours.
+
+        :return: dict, the record of the step (step, temperature, sequence, score, accepted, move, current_score,
+            best_score, and evaluated, the number of sequences scored so far).
+        """
+        for sequence, values in self._fitness.items():
+            self.memo[sequence] = float(np.median(values)) if len(values) == len(self.seeds) else np.inf
+        self._fitness = dict()
+
+        candidate = min(self.neighbours, key=lambda sequence: self.memo[sequence])
+        score = self.memo[candidate]
+        accepted = self.accept(score)
+        if accepted:
+            self.current, self.current_score = candidate, score
+        if score < self.best_score:
+            self.best, self.best_score = candidate, score
+
+        record = dict(step=self.step, temperature=self.temperature, sequence=candidate, score=score,
+                      accepted=accepted, move=self._moves.get(candidate, 'initial'), current_score=self.current_score,
+                      best_score=self.best_score, evaluated=len(self.memo))
+        self.history.append(record)
+        if self.step > 0:
+            self.temperature *= self.cooling
+        self.step += 1
+
+        proposals = [self.move(self.current) for _ in range(self.num_neighbours)]
+        self._moves = {sequence: name for sequence, name in proposals}
+        self.neighbours = list(self._moves)
+        return record
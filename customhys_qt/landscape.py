@@ -0,0 +1,183 @@
+"""
+Evaluation of benchmark problems over many points at once, used to preview their landscapes.
+
+The functions in ``customhys.benchmark_func`` are written for a single position, mostly in terms of numpy reductions
+such as ``np.sum(variables)``. Hence, a batch of N points is given to them as a D-by-N array whose reductions run along
+the first axis, i.e., along the dimensions, so one call evaluates all the points. This is verified against the scalar
+evaluation the first time each problem is used, and the point-by-point evaluation is kept as fallback.
+
+Computed landscapes can be kept in a ``LandscapeCache`` to reuse them when the same preview is requested again.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+__all__ = ['evaluate_batch', 'is_vectorisable', 'evaluate_landscape', 'LandscapeCache']
+
+# Verdict per (problem class, dimensions): True if the batched evaluation matches the scalar one
+_is_vectorisable = dict()
+
+# Number of points compared against the scalar evaluation when a problem is checked
+_num_probes = 5
+
+
+class _ColumnBatch(np.ndarray):
+    """
+    A D-by-N array of N points whose reductions work per point (along the first axis) when no axis is given.
+    """
+
+    def sum(self, axis=None, *args, **kwargs):
+        return super().sum(0 if axis is None else axis, *args, **kwargs)
+
+    def prod(self, axis=None, *args, **kwargs):
+        return super().prod(0 if axis is None else axis, *args, **kwargs)
+
+    def mean(self, axis=None, *args, **kwargs):
+        return super().mean(0 if axis is None else axis, *args, **kwargs)
+
+    def max(self, axis=None, *args, **kwargs):
+        return super().max(0 if axis is None else axis, *args, **kwargs)
+
+    def min(self, axis=None, *args, **kwargs):
+        return super().min(0 if axis is None else axis, *args, **kwargs)
+
+
+def _evaluate_points(problem, points):
+    return np.array([problem.get_function_value(point) for point in points], dtype=float)
+
+
+def _evaluate_vectorised(problem, points):
+    with np.errstate(all='ignore'):
+        values = problem.get_function_value(np.ascontiguousarray(points.T).view(_ColumnBatch))
+    values = np.asarray(values, dtype=float)
+    if values.shape != (points.shape[0],):
+        raise ValueError('the problem function does not return one value per point')
+    return values
+
+
+def evaluate_batch(problem, points):
+    """
+    Evaluate a problem at several points.
+
+    :param BasicProblem problem: Problem from ``customhys.benchmark_func``.
+    :param numpy.ndarray points: N-by-D array of positions.
+    :return: numpy.ndarray with N values.
+    """
+    points = np.asarray(points, dtype=float)
+    key = (type(problem), problem.variable_num)
+    if _is_vectorisable.get(key) is False or points.shape[0] == 0:
+        return _evaluate_points(problem, points)
+
+    try:
+        values = _evaluate_vectorised(problem, points)
+    except Exception:
+        _is_vectorisable[key] = False
+        return _evaluate_points(problem, points)
+
+    if key not in _is_vectorisable:
+        # Check the batched evaluation on a few points before trusting it
+        probes = np.unique(np.linspace(0, points.shape[0] - 1, _num_probes).astype(int))
+        expected = _evaluate_points(problem, points[probes])
+        _is_vectorisable[key] = bool(np.allclose(values[probes], expected, rtol=1e-9, atol=1e-12, equal_nan=True))
+        if not _is_vectorisable[key]:
+            return _evaluate_points(problem, points)
+
+    return values
+
+
+def is_vectorisable(problem):
+    """
+    Tell if ``evaluate_batch`` evaluates a problem in a single call.
+
+    :param BasicProblem problem: Problem from ``customhys.benchmark_func``.
+    :return: bool, or None if the problem has not been checked yet.
+    """
+    return _is_vectorisable.get((type(problem), problem.variable_num))
+
+
+def evaluate_landscape(problem, low_boundary, upp_boundary, samples=50):
+    """
+    Evaluate a problem over a ``samples``-by-``samples`` grid of its first two variables. The remaining variables (if
+    so) are fixed at the optimal solution.
+
+    :param BasicProblem problem: Problem from ``customhys.benchmark_func``.
+    :param float low_boundary: Lower boundary of the grid.
+    :param float upp_boundary: Upper boundary of the grid.
+    :param int samples: Optional. Number of samples per axis. The default is 50.
+    :returns: numpy.ndarray, numpy.ndarray, numpy.ndarray (x, y, and function values of the grid)
+    """
+    x = np.linspace(low_boundary, upp_boundary, samples)
+    y = np.linspace(low_boundary, upp_boundary, samples)
+
+    # Create the grid matrices
+    matrix_x, matrix_y = np.meshgrid(x, y)
+
+    # Stack all the nodes of the grid, padded with the rest of the optimal solution
+    fixed_values = np.asarray(problem.optimal_solution[2:problem.variable_num], dtype=float)
+    points = np.empty((matrix_x.size, 2 + fixed_values.size))
+    points[:, 0] = matrix_x.ravel()
+    points[:, 1] = matrix_y.ravel()
+    points[:, 2:] = fixed_values
+
+    matrix_z = evaluate_batch(problem, points).reshape(matrix_x.shape)
+    return matrix_x, matrix_y, matrix_z
+
+
+class LandscapeCache:
+    """
+    Least-recently-used cache of computed landscapes with a cap on the memory they take.
+
+    Each entry is a dictionary of numpy arrays (e.g., the grid matrices and their shaded colours) stored under a
+    hashable key such as ``(problem_name, low_boundary, upp_boundary, samples)``.
+    """
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        """
+        :param int max_bytes: Optional. Maximum memory (in bytes) taken by the cached arrays. The default is 64 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self._entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _size_of(entry):
+        return sum(value.nbytes for value in entry.values() if isinstance(value, np.ndarray))
+
+    def get(self, key):
+        """
+        Return the entry stored under ``key`` (or None), and mark it as the most recently used.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store ``entry`` under ``key``, evicting the least recently used entries if the memory cap is exceeded. Entries
+        larger than the whole cap are not stored.
+        """
+        if key in self._entries:
+            self.num_bytes -= self._size_of(self._entries.pop(key))
+
+        entry_size = self._size_of(entry)
+        if entry_size > self.max_bytes:
+            return
+
+        while self._entries and self.num_bytes + entry_size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.num_bytes -= self._size_of(evicted)
+
+        self._entries[key] = entry
+        self.num_bytes += entry_size
+
+    def clear(self):
+        self._entries.clear()
+        self.num_bytes = 0
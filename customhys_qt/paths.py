@@ -0,0 +1,27 @@
+"""
+Locations for files written by CUSTOMHyS-Qt outside its installation folder.
+"""
+
+import os
+import sys
+
+__all__ = ['cache_dir']
+
+
+def cache_dir(*parts):
+    """
+    Return (and create, if needed) a folder inside the user cache directory of the application.
+
+    :param str parts: Optional. Subfolders to append.
+    :return: str
+    """
+    if sys.platform == 'win32':
+        root = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    elif sys.platform == 'darwin':
+        root = os.path.expanduser('~/Library/Caches')
+    else:
+        root = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+
+    folder = os.path.join(root, 'customhys-qt', *parts)
+    os.makedirs(folder, exist_ok=True)
+    return folder
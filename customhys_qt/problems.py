@@ -0,0 +1,99 @@
+"""
+Metadata index of the benchmark problems available in ``customhys.benchmark_func``.
+
+The index stores the name, search range and optimum of each problem, so the GUI does not instantiate every problem at
+startup. It is saved as JSON together with the index format and the customhys version used to build it. A prebuilt
+index is shipped in the data folder; when it does not match the installed customhys, the index is rebuilt once and
+kept in the user cache directory.
+"""
+
+import json
+import os
+
+import customhys
+import numpy as np
+from customhys import benchmark_func as cbf
+
+from . import paths
+
+__all__ = ['INDEX_VERSION', 'build_problem_index', 'load_problem_index']
+
+# Increase it when the structure of the index changes
+INDEX_VERSION = 1
+
+# Problems that cannot be built from their dimensionality only
+_excluded_problems = ['CEC2005']
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_problem_index(dimensions=2):
+    """
+    Build the metadata index by instantiating all the problems.
+
+    :param int dimensions: Optional. Dimensions used to instantiate the problems. The default is 2.
+    :return: dict
+    """
+    problems = dict()
+    for problem_name in cbf.__all__:
+        if problem_name in _excluded_problems:
+            continue
+        problem = getattr(cbf, problem_name)(dimensions)
+        problems[problem_name] = dict(
+            min_search_range=_to_float(problem.min_search_range[0]),
+            max_search_range=_to_float(problem.max_search_range[0]),
+            optimal_fitness=_to_float(problem.optimal_fitness),
+            optimal_solution=[_to_float(x) for x in np.ravel(problem.optimal_solution)])
+
+    return dict(version=INDEX_VERSION, customhys_version=getattr(customhys, '__version__', ''),
+                dimensions=dimensions, problems=problems)
+
+
+def _is_current(index):
+    return (isinstance(index, dict) and index.get('version') == INDEX_VERSION and
+            index.get('customhys_version') == getattr(customhys, '__version__', '') and
+            isinstance(index.get('problems'), dict))
+
+
+def _read_index(file_path):
+    try:
+        with open(file_path, 'r') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    return index if _is_current(index) else None
+
+
+def load_problem_index(file_path, cache_path=None):
+    """
+    Load the metadata index from ``file_path`` or, if it is missing or outdated, from ``cache_path``. If neither is
+    current, the index is rebuilt and saved in ``cache_path``.
+
+    :param str file_path: Location of the prebuilt JSON index.
+    :param str cache_path: Optional. Location of the rebuilt index. The default is the user cache directory.
+    :return: dict
+    """
+    index = _read_index(file_path)
+    if index is not None:
+        return index
+
+    if cache_path is None:
+        try:
+            cache_path = os.path.join(paths.cache_dir(), os.path.basename(file_path))
+        except OSError:
+            return build_problem_index()
+
+    index = _read_index(cache_path)
+    if index is None:
+        index = build_problem_index()
+        try:
+            with open(cache_path, 'w') as index_file:
+                json.dump(index, index_file, indent=1)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,129 @@
+"""
+Opt-in time breakdown of a run.
+
+A ``RunProfiler`` is attached to a metaheuristic before running it. It wraps the initialiser, the search-operator steps,
+and (inside them) the population's fitness evaluation and selection, so that each step of the sequence gets its calls,
+evaluations, and time split into perturbation, evaluation, and selection. A profile is a dictionary of columns:
+
+    labels, calls, evaluations, time, perturbation, evaluation, selection
+
+with one row for the initialisation, one per search operator, and a last row ('Other') with the time spent outside
+them (historicals and stopping conditions).
+"""
+
+import csv
+from timeit import default_timer as timer
+
+import numpy as np
+
+__all__ = ['COLUMNS', 'RunProfiler', 'combine_profiles', 'write_profile_csv']
+
+COLUMNS = ['calls', 'evaluations', 'time', 'perturbation', 'evaluation', 'selection']
+
+
+class RunProfiler:
+    """
+    Collects the time breakdown of a run by wrapping the methods of a metaheuristic (and its population).
+    """
+
+    def __init__(self, operator_labels):
+        """
+        :param list operator_labels: Labels of the search operators, in the order of the sequence.
+        """
+        self.labels = ['Initialisation'] + list(operator_labels)
+        self.calls = np.zeros(len(self.labels), dtype=int)
+        self.evaluations = np.zeros(len(self.labels), dtype=int)
+        self.times = np.zeros((len(self.labels), 3))  # step, evaluation, and selection
+        self._row = 0
+        self._step = 0
+
+    def _timed(self, method, column):
+        def wrapper(*args, **kwargs):
+            start_time = timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.times[self._row, column] += timer() - start_time
+        return wrapper
+
+    def attach(self, mh):
+        """
+        Wrap the methods of ``mh``; it must be called before running it.
+
+        :param Metaheuristic mh: Metaheuristic to profile.
+        :return: None.
+        """
+        num_operators = len(self.labels) - 1
+        apply_initialiser = self._timed(mh.apply_initialiser, 0)
+        apply_search_operator = self._timed(mh.apply_search_operator, 0)
+        evaluate_fitness = self._timed(mh.pop.evaluate_fitness, 1)
+
+        def initialiser_step(*args, **kwargs):
+            self._row = 0
+            self.calls[0] += 1
+            return apply_initialiser(*args, **kwargs)
+
+        # The operators are applied in the order of the sequence, once per iteration
+        def operator_step(*args, **kwargs):
+            self._row = 1 + self._step % num_operators
+            self._step += 1
+            self.calls[self._row] += 1
+            return apply_search_operator(*args, **kwargs)
+
+        def evaluation(*args, **kwargs):
+            self.evaluations[self._row] += mh.pop.num_agents
+            return evaluate_fitness(*args, **kwargs)
+
+        mh.apply_initialiser = initialiser_step
+        mh.apply_search_operator = operator_step
+        mh.pop.evaluate_fitness = evaluation
+        mh.pop.update_positions = self._timed(mh.pop.update_positions, 2)
+
+    def profile(self, total_time):
+        """
+        Return the profile of the run.
+
+        :param float total_time: Wall time of the whole run (s).
+        :return: dict
+        """
+        step, evaluation, selection = self.times.T
+        return dict(labels=self.labels + ['Other'],
+                    calls=self.calls.tolist() + [0],
+                    evaluations=self.evaluations.tolist() + [0],
+                    time=step.tolist() + [max(total_time - step.sum(), 0.0)],
+                    perturbation=(step - evaluation - selection).tolist() + [0.0],
+                    evaluation=evaluation.tolist() + [0.0],
+                    selection=selection.tolist() + [0.0])
+
+
+def combine_profiles(profiles):
+    """
+    Add up the profiles of runs with the same sequence of search operators.
+
+    :param list profiles: Profiles as returned by ``RunProfiler.profile`` (None items are skipped).
+    :return: dict, or None if there is no profile.
+    """
+    profiles = [profile for profile in profiles if profile is not None]
+    if not profiles:
+        return None
+    combined = dict(labels=list(profiles[0]['labels']))
+    if any(list(profile['labels']) != combined['labels'] for profile in profiles):
+        raise ValueError("profiles of different sequences of search operators cannot be combined")
+    for column in COLUMNS:
+        combined[column] = np.sum([profile[column] for profile in profiles], axis=0).tolist()
+    return combined
+
+
+def write_profile_csv(file_path, profile):
+    """
+    Write a profile as a CSV file with one row per step.
+
+    :param str file_path: Location of the file.
+    :param dict profile: Profile as returned by ``RunProfiler.profile`` or ``combine_profiles``.
+    :return: None.
+    """
+    with open(file_path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['step'] + COLUMNS)
+        for row, label in enumerate(profile['labels']):
+            writer.writerow([label] + [profile[column][row] for column in COLUMNS])
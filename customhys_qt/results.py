@@ -0,0 +1,33 @@
+"""
+Saving and loading the results of a set of runs, in the ``.npz`` format of ``store.RunStore``.
+"""
+
+from .store import RunStore
+
+__all__ = ['save_results', 'load_results']
+
+
+def save_results(file_path, spec, results):
+    """
+    Save the ``results`` of runs of ``spec`` into ``file_path``.
+
+    :param str file_path: Location of the ``.npz`` file.
+    :param dict spec: Experiment specification (it must be JSON serialisable).
+    :param list results: Result dictionaries as returned by ``engine.run_spec``.
+    :return: None.
+    """
+    store = RunStore(capacity=len(results), spill_bytes=None)
+    for result in results:
+        store.append(result)
+    store.save(file_path, spec)
+
+
+def load_results(file_path):
+    """
+    Load the results saved by ``save_results``.
+
+    :param str file_path: Location of the ``.npz`` file.
+    :returns: dict, list (the spec and the result dictionaries)
+    """
+    spec, store = RunStore.load(file_path, spill_bytes=None)
+    return spec, list(store.results())
@@ -0,0 +1,130 @@
+"""
+In-memory model of the search operators that compose a metaheuristic.
+
+A search operator is given to ``customhys`` as a tuple ``(name, parameters, selector)``, e.g.,
+
+    ('random_search', {'scale': 0.01, 'distribution': 'uniform'}, 'greedy')
+
+``SearchOperator`` keeps these three fields validated, so building the list of operators for a run does not require
+any parsing. The collection file (one tuple per line) is read with ``ast.literal_eval`` instead of ``eval``.
+"""
+
+import ast
+import inspect
+
+from customhys import operators as cso
+
+__all__ = ['OperatorError', 'SearchOperator', 'parse_operator', 'read_collection']
+
+
+class OperatorError(ValueError):
+    """
+    Raised when a search operator is not valid.
+    """
+
+
+def _get_perturbator_arguments(name):
+    # Perturbators are the functions of customhys.operators that act on a population ``pop``
+    function = getattr(cso, name, None) if isinstance(name, str) and not name.startswith('_') else None
+    if not inspect.isfunction(function):
+        return None
+    arguments = list(inspect.signature(function).parameters)
+    return arguments[1:] if arguments[:1] == ['pop'] else None
+
+
+class SearchOperator:
+    """
+    A search operator (perturbator) from ``customhys.operators`` with its tuning parameters and selector.
+    """
+
+    __slots__ = ('name', 'parameters', 'selector')
+
+    def __init__(self, name, parameters=None, selector='greedy'):
+        """
+        :param str name: Name of the perturbator in ``customhys.operators``, e.g., 'random_search'.
+        :param dict parameters: Optional. Tuning parameters of the perturbator. The default is no parameters.
+        :param str selector: Optional. Selector applied after the perturbator. The default is 'greedy'.
+        """
+        arguments = _get_perturbator_arguments(name)
+        if arguments is None:
+            raise OperatorError(f"unknown search operator: {name!r}")
+        if parameters is None:
+            parameters = dict()
+        if not isinstance(parameters, dict):
+            raise OperatorError(f"the parameters of {name} must be a dictionary")
+        unknown_parameters = [key for key in parameters if key not in arguments]
+        if unknown_parameters:
+            raise OperatorError("unknown parameters of {}: {}".format(name, ", ".join(map(repr, unknown_parameters))))
+        if selector not in cso.__selectors__:
+            raise OperatorError(f"unknown selector: {selector!r}")
+
+        self.name = name
+        self.parameters = dict(parameters)
+        self.selector = selector
+
+    @classmethod
+    def from_tuple(cls, operator):
+        """
+        Create a search operator from a ``(name, parameters, selector)`` tuple (or list).
+        """
+        if not isinstance(operator, (tuple, list)) or len(operator) != 3:
+            raise OperatorError(f"a search operator must be a (name, parameters, selector) tuple, not {operator!r}")
+        return cls(*operator)
+
+    def to_tuple(self):
+        """
+        Return the operator in the format used by ``customhys.metaheuristic.Metaheuristic``.
+        """
+        return self.name, dict(self.parameters), self.selector
+
+    def copy(self):
+        return SearchOperator(self.name, self.parameters, self.selector)
+
+    @property
+    def pretty_name(self):
+        return " ".join([x.capitalize() for x in self.name.split("_")])
+
+    def __str__(self):
+        return f"{self.pretty_name}->{self.to_tuple()}"
+
+    def __repr__(self):
+        return f"SearchOperator{self.to_tuple()}"
+
+    def __eq__(self, other):
+        return isinstance(other, SearchOperator) and self.to_tuple() == other.to_tuple()
+
+    def __hash__(self):
+        return hash(repr(self))
+
+
+def parse_operator(text):
+    """
+    Parse a search operator written as a tuple literal, e.g., "('random_search', {'scale': 0.01}, 'greedy')".
+
+    :param str text: Tuple literal.
+    :return: SearchOperator
+    """
+    try:
+        operator = ast.literal_eval(text.strip())
+    except (SyntaxError, ValueError) as error:
+        raise OperatorError(f"invalid search operator {text!r}: {error}") from None
+    return SearchOperator.from_tuple(operator)
+
+
+def read_collection(file_path):
+    """
+    Read a collection of search operators, one tuple literal per line (empty lines are skipped).
+
+    :param str file_path: Location of the collection file.
+    :return: list of SearchOperator
+    """
+    collection = []
+    with open(file_path, 'r') as operators_file:
+        for line_number, line in enumerate(operators_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                collection.append(parse_operator(line))
+            except OperatorError as error:
+                raise OperatorError(f"{file_path}, line {line_number}: {error}") from None
+    return collection
@@ -0,0 +1,137 @@
+"""
+Online statistics of the run history, updated in constant time per run.
+
+``RunningStats`` keeps the count, mean and variance (Welford's algorithm), the extreme values, and an estimate of the
+median with the P-square algorithm (Jain and Chlamtac, 1985), which stores five markers instead of all the values.
+Non-finite values (e.g., the fitness of a diverging run) are left out of the statistics and counted apart.
+"""
+
+import bisect
+import math
+
+__all__ = ['P2Quantile', 'RunningStats']
+
+
+class P2Quantile:
+    """
+    Streaming estimate of a quantile with the P-square algorithm. The first ``exact_limit`` values are also kept
+    sorted, so the quantile is exact until there are more values than that.
+    """
+
+    def __init__(self, quantile=0.5, exact_limit=100):
+        """
+        :param float quantile: Optional. Quantile to estimate, between 0 and 1. The default is 0.5 (median).
+        :param int exact_limit: Optional. Number of values for which the exact quantile is given. The default is 100.
+        """
+        self.quantile = quantile
+        self.count = 0
+        self.exact_limit = max(exact_limit, 5)
+        self._sorted = []
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self._increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def update(self, value):
+        self.count += 1
+        if self.count <= self.exact_limit:
+            bisect.insort(self._sorted, value)
+        else:
+            self._sorted = None
+
+        if self.count <= 5:
+            self._heights.append(value)
+            self._heights.sort()
+            return
+
+        heights, positions = self._heights, self._positions
+
+        # Find the cell of the new value and update the extreme markers
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(k for k in range(4) if heights[k] <= value < heights[k + 1])
+
+        for k in range(cell + 1, 5):
+            positions[k] += 1
+        for k in range(5):
+            self._desired[k] += self._increments[k]
+
+        # Adjust the heights of the middle markers
+        for k in range(1, 4):
+            offset = self._desired[k] - positions[k]
+            if (offset >= 1 and positions[k + 1] - positions[k] > 1) or \
+                    (offset <= -1 and positions[k - 1] - positions[k] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(k, step)
+                if not heights[k - 1] < height < heights[k + 1]:
+                    height = heights[k] + step * (heights[k + step] - heights[k]) / (positions[k + step] - positions[k])
+                heights[k] = height
+                positions[k] += step
+
+    def _parabolic(self, k, step):
+        heights, positions = self._heights, self._positions
+        return heights[k] + step / (positions[k + 1] - positions[k - 1]) * (
+            (positions[k] - positions[k - 1] + step) * (heights[k + 1] - heights[k]) / (positions[k + 1] - positions[k])
+            + (positions[k + 1] - positions[k] - step) * (heights[k] - heights[k - 1]) /
+            (positions[k] - positions[k - 1]))
+
+    @property
+    def value(self):
+        if self.count == 0:
+            return math.nan
+        if self._sorted is not None:
+            # Interpolate between the sorted values, as numpy does
+            index = self.quantile * (self.count - 1)
+            lower = int(math.floor(index))
+            upper = min(lower + 1, self.count - 1)
+            return self._sorted[lower] + (index - lower) * (self._sorted[upper] - self._sorted[lower])
+        return self._heights[2]
+
+
+class RunningStats:
+    """
+    Count, mean, (population) standard deviation, minimum, maximum and median of a stream of values. NaN and infinite
+    values are only counted in ``skipped``.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.skipped = 0
+        self.mean = math.nan
+        self.minimum = math.nan
+        self.maximum = math.nan
+        self._sum_squares = 0.0
+        self._median = P2Quantile(0.5)
+
+    def update(self, value):
+        value = float(value)
+        if not math.isfinite(value):
+            self.skipped += 1
+            return
+        self.count += 1
+        if self.count == 1:
+            self.mean = self.minimum = self.maximum = value
+        else:
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._sum_squares += delta * (value - self.mean)
+            self.minimum = min(self.minimum, value)
+            self.maximum = max(self.maximum, value)
+        self._median.update(value)
+
+    @property
+    def variance(self):
+        return self._sum_squares / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    @property
+    def median(self):
+        return self._median.value
@@ -0,0 +1,115 @@
+"""
+Stopping policies that end a run before its last iteration.
+
+The policies are read from optional keys of a run spec:
+
+    target_fitness          stop when the best fitness reaches this value (plus ``target_tolerance``, 1e-8 by
+                            default). 'optimum' stands for the optimal fitness of the problem.
+    stagnation_iterations   stop when the best fitness has not improved for this number of iterations
+    time_limit              stop when the run has taken this wall time (s)
+    max_evaluations         stop before an iteration that would exceed this number of fitness evaluations
+
+They are checked once per iteration, as a finalisation condition of the metaheuristic. The reason why a run stopped is
+one of ``STOP_REASONS``.
+"""
+
+from timeit import default_timer as timer
+
+import numpy as np
+
+__all__ = ['STOP_REASONS', 'POLICY_KEYS', 'StoppingPolicy']
+
+STOP_REASONS = ['iterations', 'target', 'stagnation', 'time_limit', 'evaluations', 'cancelled']
+
+POLICY_KEYS = ['target_fitness', 'target_tolerance', 'stagnation_iterations', 'time_limit', 'max_evaluations']
+
+
+class StoppingPolicy:
+    """
+    Finalisation condition of a metaheuristic that combines the stopping policies of a run spec.
+    """
+
+    def __init__(self, target_fitness=None, target_tolerance=None, stagnation_iterations=None, time_limit=None,
+                 max_evaluations=None):
+        """
+        :param float target_fitness: Optional. Fitness value to reach. The default is None (no target).
+        :param float target_tolerance: Optional. Tolerance of the target. The default is 1e-8.
+        :param int stagnation_iterations: Optional. Iterations without improvement before stopping. The default is
+            None (no limit).
+        :param float time_limit: Optional. Wall time (s) of the run. The default is None (no limit).
+        :param int max_evaluations: Optional. Budget of fitness evaluations. The default is None (no limit).
+        """
+        self.target_fitness = None if target_fitness is None else float(target_fitness)
+        self.target_tolerance = 1e-8 if target_tolerance is None else float(target_tolerance)
+        self.stagnation_iterations = None if stagnation_iterations is None else int(stagnation_iterations)
+        self.time_limit = None if time_limit is None else float(time_limit)
+        self.max_evaluations = None if max_evaluations is None else int(max_evaluations)
+        for name in ['stagnation_iterations', 'time_limit', 'max_evaluations']:
+            if getattr(self, name) is not None and not getattr(self, name) > 0:
+                raise ValueError(f"{name} must be positive, got {getattr(self, name)}")
+        if self.target_tolerance < 0:
+            raise ValueError(f"target_tolerance must be non-negative, got {self.target_tolerance}")
+
+        self.reason = None
+        self._mh = None
+        self._start_time = None
+        self._evaluations_per_iteration = 0
+        self._best_fitness = np.inf
+        self._best_iteration = 0
+
+    @classmethod
+    def from_spec(cls, spec, problem=None):
+        """
+        Read the policies of a run spec.
+
+        :param dict spec: Run specification.
+        :param BasicProblem problem: Optional. Problem of the run, it gives the value of ``target_fitness='optimum'``.
+        :return: StoppingPolicy
+        """
+        policies = {key: spec.get(key) for key in POLICY_KEYS}
+        if policies['target_fitness'] == 'optimum':
+            policies['target_fitness'] = None if problem is None else problem.optimal_fitness
+        return cls(**policies)
+
+    @property
+    def is_active(self):
+        return any(value is not None for value in [self.target_fitness, self.stagnation_iterations,
+                                                   self.time_limit, self.max_evaluations])
+
+    def start(self, mh, num_operators):
+        """
+        Start watching a run; it must be called right before running ``mh``.
+
+        :param Metaheuristic mh: Metaheuristic of the run.
+        :param int num_operators: Number of search operators in the sequence (each one evaluates the population).
+        :return: None.
+        """
+        self.reason = None
+        self._mh = mh
+        self._start_time = timer()
+        self._evaluations_per_iteration = mh.num_agents * num_operators
+        self._best_fitness = np.inf
+        self._best_iteration = 0
+
+    def evaluations(self, iteration):
+        """
+        Number of fitness evaluations done after ``iteration`` iterations (the initial population included).
+        """
+        return self._mh.num_agents + iteration * self._evaluations_per_iteration
+
+    def __call__(self):
+        iteration = self._mh.pop.iteration
+        best_fitness = float(self._mh.historical['fitness'][-1])
+        if best_fitness < self._best_fitness:
+            self._best_fitness, self._best_iteration = best_fitness, iteration
+
+        if self.target_fitness is not None and best_fitness <= self.target_fitness + self.target_tolerance:
+            self.reason = 'target'
+        elif (self.stagnation_iterations is not None and
+              iteration - self._best_iteration >= self.stagnation_iterations):
+            self.reason = 'stagnation'
+        elif self.time_limit is not None and timer() - self._start_time >= self.time_limit:
+            self.reason = 'time_limit'
+        elif self.max_evaluations is not None and self.evaluations(iteration + 1) > self.max_evaluations:
+            self.reason = 'evaluations'
+        return self.reason is not None
@@ -0,0 +1,244 @@
+"""
+Array-backed store of the results of many runs.
+
+The results are kept in preallocated numpy arrays (one row per run) that grow geometrically. When they would take more
+than ``spill_bytes``, the arrays are moved to memory-mapped ``.npy`` files, so large batches keep a bounded memory
+footprint. A store is saved to (and loaded from) a compressed ``.npz`` file with the arrays:
+
+    spec (JSON), seeds (R,), fitness (R, L) padded with NaN, lengths (R,), positions (R, D), centroids (R, D),
+    times (R,), iterations (R,), stop_reasons (R,), evaluations (R,), evaluation_times (R,)
+
+where R is the number of runs, L the length of the longest fitness history, and D the number of dimensions. The stop
+reasons are indices of ``stopping.STOP_REASONS``. Files written before the stop reasons and the evaluations were
+recorded load them as unknown (-1 or NaN).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from . import paths, stopping
+
+__all__ = ['RunStore']
+
+# Fill value of each array (seeds of unseeded runs, and unknown counts and stop reasons are stored as -1)
+_fill_values = dict(fitness=np.nan, lengths=0, positions=np.nan, centroids=np.nan, times=np.nan, seeds=-1,
+                    iterations=-1, stop_reasons=-1, evaluations=-1, evaluation_times=np.nan)
+
+
+class RunStore:
+    """
+    Fitness histories, final positions and centroids, times, and seeds of a sequence of runs.
+    """
+
+    def __init__(self, capacity=64, spill_bytes=256 * 2 ** 20, directory=None):
+        """
+        :param int capacity: Optional. Number of runs preallocated. The default is 64.
+        :param int spill_bytes: Optional. Size (in bytes) above which the arrays are memory-mapped. The default is 256
+            MiB. Use None to always keep them in memory.
+        :param str directory: Optional. Folder for the memory-mapped files. The default is a temporary folder in the
+            user cache directory, which is deleted by ``close``.
+        """
+        self.capacity = max(int(capacity), 1)
+        self.spill_bytes = spill_bytes
+        self.directory = directory
+        self.is_mapped = False
+        self.num_runs = 0
+        self.arrays = None
+        self._own_directory = False
+        self._generation = 0
+
+    def __len__(self):
+        return self.num_runs
+
+    @property
+    def nbytes(self):
+        return 0 if self.arrays is None else sum(array.nbytes for array in self.arrays.values())
+
+    def _allocate(self, name, shape, dtype):
+        if self.is_mapped:
+            file_path = os.path.join(self.directory, f"{name}-{self._generation}.npy")
+            array = np.lib.format.open_memmap(file_path, mode='w+', dtype=dtype, shape=shape)
+        else:
+            array = np.empty(shape, dtype=dtype)
+        array[...] = _fill_values[name]
+        return array
+
+    def _resize(self, capacity, curve_length, num_dimensions):
+        shapes = dict(fitness=((capacity, curve_length), float), lengths=((capacity,), np.int64),
+                      positions=((capacity, num_dimensions), float), centroids=((capacity, num_dimensions), float),
+                      times=((capacity,), float), seeds=((capacity,), np.int64),
+                      iterations=((capacity,), np.int64), stop_reasons=((capacity,), np.int8),
+                      evaluations=((capacity,), np.int64), evaluation_times=((capacity,), float))
+
+        # Move to memory-mapped files if the new arrays are too large
+        new_bytes = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for shape, dtype in shapes.values())
+        if not self.is_mapped and self.spill_bytes is not None and new_bytes > self.spill_bytes:
+            if self.directory is None:
+                self.directory = tempfile.mkdtemp(prefix='runs-', dir=paths.cache_dir())
+                self._own_directory = True
+            else:
+                os.makedirs(self.directory, exist_ok=True)
+            self.is_mapped = True
+
+        old_arrays = self.arrays or dict()
+        self.capacity = capacity
+        self._generation += 1
+        self.arrays = {name: self._allocate(name, shape, dtype) for name, (shape, dtype) in shapes.items()}
+
+        # Copy the previous runs and delete their files (if any)
+        for name in list(old_arrays):
+            old_array = old_arrays.pop(name)
+            self.arrays[name][tuple(slice(0, size) for size in old_array.shape)] = old_array
+            file_path = old_array.filename if isinstance(old_array, np.memmap) else None
+            del old_array
+            if file_path is not None:
+                os.remove(file_path)
+
+    def append(self, result):
+        """
+        Add the result of a run. The arrays grow if the run does not fit.
+
+        :param dict result: Result of the run (as returned by ``engine.run_spec``).
+        :return: int (index of the run)
+        """
+        fitness = np.ravel(result['fitness']).astype(float)
+        position = np.ravel(result['position'])
+        if self.arrays is None:
+            self._resize(self.capacity, fitness.size, position.size)
+        else:
+            shape = (self.capacity, self.arrays['fitness'].shape[1], self.arrays['positions'].shape[1])
+            new_shape = (self.capacity * 2 if self.num_runs == self.capacity else self.capacity,
+                         max(shape[1], fitness.size), max(shape[2], position.size))
+            if new_shape != shape:
+                self._resize(*new_shape)
+
+        index = self.num_runs
+        self.arrays['fitness'][index, :fitness.size] = fitness
+        self.arrays['lengths'][index] = fitness.size
+        self.arrays['positions'][index, :position.size] = position
+        self.arrays['centroids'][index, :position.size] = np.ravel(result['centroid'])
+        self.arrays['times'][index] = result['time']
+        self.arrays['seeds'][index] = -1 if result.get('seed') is None else result['seed']
+        self.arrays['iterations'][index] = result.get('iterations', -1)
+        stop_reason = result.get('stop_reason')
+        self.arrays['stop_reasons'][index] = -1 if stop_reason is None else stopping.STOP_REASONS.index(stop_reason)
+        self.arrays['evaluations'][index] = result.get('evaluations', -1)
+        self.arrays['evaluation_times'][index] = result.get('evaluation_time', np.nan)
+        self.num_runs += 1
+        return index
+
+    def view(self, name):
+        """
+        Rows of the array ``name`` that hold runs (without copying them).
+        """
+        if self.arrays is None:
+            return np.empty((0,) + ((0,) if name in ('fitness', 'positions', 'centroids') else ()))
+        return self.arrays[name][:self.num_runs]
+
+    @property
+    def final_fitness(self):
+        """
+        Last fitness value of each run.
+        """
+        lengths = self.view('lengths')
+        return self.view('fitness')[np.arange(lengths.size), lengths - 1] if lengths.size else np.empty(0)
+
+    @property
+    def times(self):
+        return self.view('times')
+
+    @property
+    def iterations(self):
+        return self.view('iterations')
+
+    @property
+    def stopped_early(self):
+        """
+        Number of runs stopped by a stopping policy before their last iteration.
+        """
+        return int(np.count_nonzero(self.view('stop_reasons') > 0))
+
+    def curve(self, index):
+        """
+        Fitness history of the ``index``-th run.
+        """
+        return self.arrays['fitness'][index, :self.arrays['lengths'][index]]
+
+    def result(self, index):
+        """
+        Result dictionary of the ``index``-th run, as returned by ``engine.run_spec``.
+        """
+        seed = int(self.arrays['seeds'][index])
+        stop_reason = int(self.arrays['stop_reasons'][index])
+        return dict(fitness=self.curve(index), position=self.arrays['positions'][index],
+                    centroid=self.arrays['centroids'][index], time=float(self.arrays['times'][index]),
+                    seed=None if seed < 0 else seed, cancelled=False,
+                    iterations=int(self.arrays['iterations'][index]),
+                    stop_reason=None if stop_reason < 0 else stopping.STOP_REASONS[stop_reason],
+                    evaluations=int(self.arrays['evaluations'][index]),
+                    evaluation_time=float(self.arrays['evaluation_times'][index]))
+
+    def results(self):
+        """
+        Iterate over the result dictionaries of all the runs.
+        """
+        return (self.result(index) for index in range(self.num_runs))
+
+    def save(self, file_path, spec, **extra_arrays):
+        """
+        Save the runs and the ``spec`` that produced them into a compressed ``.npz`` file.
+
+        :param str file_path: Location of the file (or a file object open for writing in binary mode).
+        :param dict spec: Experiment specification (it must be JSON serialisable).
+        :param extra_arrays: Optional. Other arrays to save along (e.g., the batch of a checkpoint).
+        :return: None.
+        """
+        lengths = self.view('lengths')
+        curve_length = int(lengths.max()) if lengths.size else 0
+        np.savez_compressed(file_path, spec=np.array(json.dumps(spec)), seeds=self.view('seeds'),
+                            fitness=self.view('fitness')[:, :curve_length], lengths=lengths,
+                            positions=self.view('positions'), centroids=self.view('centroids'),
+                            times=self.view('times'), iterations=self.view('iterations'),
+                            stop_reasons=self.view('stop_reasons'), evaluations=self.view('evaluations'),
+                            evaluation_times=self.view('evaluation_times'), **extra_arrays)
+
+    @classmethod
+    def load(cls, file_path, **kwargs):
+        """
+        Load the runs saved with ``save``.
+
+        :param str file_path: Location of the file.
+        :param kwargs: Optional. Arguments of the new store.
+        :returns: dict, RunStore (the spec and the store)
+        """
+        store = cls(**kwargs)
+        with np.load(file_path, allow_pickle=False) as data:
+            spec = json.loads(str(data['spec']))
+            num_runs = data['lengths'].size
+            if num_runs > 0:
+                store._resize(max(num_runs, store.capacity), data['fitness'].shape[1], data['positions'].shape[1])
+                for name in _fill_values:
+                    if name in data:
+                        store.arrays[name][:num_runs] = data[name]
+                store.num_runs = num_runs
+        return spec, store
+
+    def close(self):
+        """
+        Release the arrays and delete the memory-mapped files (if they are in a temporary folder).
+        """
+        arrays, self.arrays = self.arrays or dict(), None
+        for array in arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+        del arrays
+        self.num_runs = 0
+        self.is_mapped = False
+        if self._own_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+            self._own_directory = False
@@ -0,0 +1,99 @@
+"""
+Sweeps of an operator sequence over several problems and dimensionalities.
+
+A sweep expands a base spec into one spec per (problem, dimensions, repetition), using the default search range of
+each problem. The repetition ``k`` of every cell gets the same seed, so the cells are comparable. ``SweepGrid`` collects
+the results as they arrive (in any order) and summarises each cell with the median error of its final fitness values
+with respect to the optimal fitness of the problem.
+"""
+
+import numpy as np
+
+from . import engine, stats
+
+__all__ = ['make_sweep_specs', 'SweepGrid']
+
+
+def make_sweep_specs(base_spec, problem_names, dimensions, repetitions, base_seed=None):
+    """
+    Expand a spec into the runs of a sweep.
+
+    :param dict base_spec: Run specification with the operators, population, iterations, and stopping policies (its
+        problem, dimensions, boundaries, and seed are replaced).
+    :param list problem_names: Names of problems in ``customhys.benchmark_func``.
+    :param list dimensions: Dimensionalities.
+    :param int repetitions: Number of runs per (problem, dimensions) cell.
+    :param int base_seed: Optional. Seed of the sweep; if None, the seeds are random.
+    :return: list of dict
+    """
+    base_spec = {key: value for key, value in base_spec.items() if key not in ('boundaries', 'seed')}
+    seeds = [engine.make_seed(base_seed, run_index) for run_index in range(repetitions)]
+    return [dict(base_spec, problem=problem_name, dimensions=int(num_dimensions), seed=seed)
+            for problem_name in problem_names for num_dimensions in dimensions for seed in seeds]
+
+
+class SweepGrid:
+    """
+    Statistics of the final fitness values of the runs of a sweep, by problem and dimensionality.
+    """
+
+    def __init__(self, problem_names, dimensions, repetitions):
+        """
+        :param list problem_names: Names of the problems (rows).
+        :param list dimensions: Dimensionalities (columns).
+        :param int repetitions: Number of runs per cell.
+        """
+        self.problem_names = list(problem_names)
+        self.dimensions = [int(value) for value in dimensions]
+        self.repetitions = repetitions
+        self.errors = {}
+        self._rows = {name: row for row, name in enumerate(self.problem_names)}
+        self._columns = {value: column for column, value in enumerate(self.dimensions)}
+        self._optima = {}
+        self.num_results = 0
+
+    @property
+    def num_runs(self):
+        return len(self.problem_names) * len(self.dimensions) * self.repetitions
+
+    def optimal_fitness(self, problem_name, num_dimensions):
+        key = (problem_name, num_dimensions)
+        if key not in self._optima:
+            optimum = engine.get_problem(problem_name, num_dimensions).optimal_fitness
+            self._optima[key] = 0.0 if optimum is None else float(optimum)
+        return self._optima[key]
+
+    def add(self, spec, result):
+        """
+        Add the result of a run of the sweep.
+
+        :param dict spec: Run specification.
+        :param dict result: Result of the run.
+        :return: tuple, the (row, column) of the cell.
+        """
+        key = (spec['problem'], int(spec['dimensions']))
+        if key not in self.errors:
+            self.errors[key] = stats.RunningStats()
+        error = float(result['fitness'][-1]) - self.optimal_fitness(*key)
+        self.errors[key].update(max(error, 0.0))
+        self.num_results += 1
+        return self._rows[key[0]], self._columns[key[1]]
+
+    def cell(self, row, column):
+        """
+        Statistics of a cell, or None if none of its runs has finished.
+        """
+        return self.errors.get((self.problem_names[row], self.dimensions[column]))
+
+    def matrix(self, floor=1e-12):
+        """
+        Logarithm (base 10) of the median error of each cell, NaN for the cells without results.
+
+        :param float floor: Optional. Smallest error, so that the optimum reached is finite. The default is 1e-12.
+        :return: numpy.ndarray of shape (problems, dimensions)
+        """
+        values = np.full((len(self.problem_names), len(self.dimensions)), np.nan)
+        for (problem_name, num_dimensions), cell_stats in self.errors.items():
+            values[self._rows[problem_name], self._columns[num_dimensions]] = np.log10(
+                max(cell_stats.median, floor))
+        return values
@@ -0,0 +1,99 @@
+"""
+Counter of the fitness evaluations of a run.
+
+An ``EvaluationCounter`` wraps the objective function of a metaheuristic (the 'function' of
+``problem.get_formatted_problem()``) to count its calls and the time spent in them. Along with the wall time of the
+run, it gives comparable throughput numbers across problems, populations, and dimensionalities:
+
+    evaluations         number of calls of the objective function
+    evaluation_time     time (s) spent in the objective function
+
+``evals_per_second`` and ``objective_share`` derive the rate and the fraction of the run time spent in the objective
+(the rest is spent in the search operators and the bookkeeping of the metaheuristic). ``EvaluationTotals`` adds them
+up over many runs.
+"""
+
+import math
+from timeit import default_timer as timer
+
+__all__ = ['EvaluationCounter', 'EvaluationTotals', 'evals_per_second', 'objective_share']
+
+
+class EvaluationCounter:
+    """
+    Calls and time of the objective function of a run.
+    """
+
+    def __init__(self):
+        self.evaluations = 0
+        self.evaluation_time = 0.0
+
+    def wrap(self, function):
+        """
+        Return ``function`` counting its calls and time.
+        """
+        def counted_function(position):
+            start_time = timer()
+            try:
+                return function(position)
+            finally:
+                self.evaluation_time += timer() - start_time
+                self.evaluations += 1
+        return counted_function
+
+    def attach(self, mh):
+        """
+        Wrap the objective function of ``mh``; it must be called before running it.
+
+        :param Metaheuristic mh: Metaheuristic to watch.
+        :return: None.
+        """
+        mh._problem_function = self.wrap(mh._problem_function)
+
+
+def evals_per_second(evaluations, elapsed_time):
+    """
+    Rate of fitness evaluations, or NaN if it is unknown.
+    """
+    return evaluations / elapsed_time if evaluations >= 0 and elapsed_time > 0 else math.nan
+
+
+def objective_share(evaluation_time, elapsed_time):
+    """
+    Fraction of the run time spent in the objective function, or NaN if it is unknown.
+    """
+    return min(evaluation_time / elapsed_time, 1.0) if evaluation_time >= 0 and elapsed_time > 0 else math.nan
+
+
+class EvaluationTotals:
+    """
+    Evaluations, objective time, and wall time added up over runs (e.g., the runs of a batch).
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.evaluations = 0
+        self.evaluation_time = 0.0
+        self.time = 0.0
+
+    def update(self, result):
+        """
+        Add a run, if its evaluations are known.
+
+        :param dict result: Result of the run.
+        :return: None.
+        """
+        if result.get('evaluations', -1) < 0:
+            return
+        self.runs += 1
+        self.evaluations += int(result['evaluations'])
+        self.evaluation_time += float(result['evaluation_time'])
+        self.time += float(result['time'])
+
+    @property
+    def evals_per_second(self):
+        return evals_per_second(self.evaluations, self.time)
+
+    @property
+    def objective_share(self):
+        return objective_share(self.evaluation_time, self.time)
@@ -0,0 +1,258 @@
+"""
+Tuning of the parameters of the search operators in a sequence.
+
+The search space of each operator is given by the numeric ranges of ``data/tuning_ranges.json``, written as
+
+    {"random_search": {"scale": [0.001, 2.0, "log"]}, ...}
+
+with the scale of each range being 'linear' (the default), 'log', or 'int', and by the categorical choices of
+``data/tuning_parameters.json`` (see ``CATEGORICAL_KEYS``). Parameters without a range nor choices keep their values.
+
+A ``Tuner`` samples candidate tunings of some operators of a sequence (the first candidate is the current tuning) and
+evaluates them with short runs, all candidates with the same seeds. With successive halving, the candidates run in
+rungs of increasing budgets (iterations), and only the best ``1 / eta`` of each rung is promoted to the next one; with
+random search, all of them run once with the full budget. The score of a candidate is the median of its final fitness
+values, so lower is better.
+"""
+
+import json
+import math
+
+import numpy as np
+
+from . import engine, search_operators
+
+__all__ = ['CATEGORICAL_KEYS', 'METHODS', 'categorical_key', 'read_ranges', 'SearchSpace', 'Tuner']
+
+# Keys of ``tuning_parameters.json`` with the choices of the categorical parameters, by (operator, parameter)
+CATEGORICAL_KEYS = {
+    ('firefly_dynamic', 'distribution'): 'distribution',
+    ('genetic_mutation', 'distribution'): 'distribution',
+    ('local_random_walk', 'distribution'): 'distribution',
+    ('random_flight', 'distribution'): 'distribution',
+    ('random_search', 'distribution'): 'distribution',
+    ('swarm_dynamic', 'distribution'): 'distribution',
+    ('differential_mutation', 'expression'): 'expression',
+    ('differential_crossover', 'version'): 'version_dc',
+    ('genetic_crossover', 'pairing'): 'pairing',
+    ('genetic_crossover', 'crossover'): 'crossover',
+    ('swarm_dynamic', 'version'): 'version_ps',
+}
+
+METHODS = ['halving', 'random']
+
+_scales = ('linear', 'log', 'int')
+
+
+def categorical_key(operator_name, parameter):
+    """
+    Return the key of the choices of a categorical parameter in ``tuning_parameters.json``, or None if the parameter
+    is not categorical.
+    """
+    return CATEGORICAL_KEYS.get((operator_name, parameter))
+
+
+def read_ranges(file_path):
+    """
+    Read the numeric ranges of the tuning parameters.
+
+    :param str file_path: Location of the JSON file.
+    :return: dict, {operator: {parameter: (low, high, scale)}}
+    """
+    with open(file_path, 'r') as json_file:
+        content = json.load(json_file)
+    ranges = dict()
+    for operator_name, parameters in content.items():
+        ranges[operator_name] = dict()
+        for parameter, values in parameters.items():
+            low, high, scale = (list(values) + ['linear'])[:3]
+            if scale not in _scales or not low <= high or (scale == 'log' and low <= 0):
+                raise ValueError(f"invalid range of {operator_name}.{parameter}: {values}")
+            ranges[operator_name][parameter] = (low, high, scale)
+    return ranges
+
+
+class SearchSpace:
+    """
+    Values that the tuning parameters of the search operators can take.
+    """
+
+    def __init__(self, ranges, categorical_options):
+        """
+        :param dict ranges: Numeric ranges, as returned by ``read_ranges``.
+        :param dict categorical_options: Choices of the categorical parameters (content of ``tuning_parameters.json``).
+        """
+        self.ranges = ranges
+        self.categorical_options = categorical_options
+
+    def tunable(self, operator):
+        """
+        Return the names of the parameters of ``operator`` that can be tuned.
+
+        :param SearchOperator operator: Search operator.
+        :return: list of str
+        """
+        return [parameter for parameter in operator.parameters
+                if parameter in self.ranges.get(operator.name, {})
+                or categorical_key(operator.name, parameter) in self.categorical_options]
+
+    def sample_value(self, operator_name, parameter, rng):
+        key = categorical_key(operator_name, parameter)
+        if key in self.categorical_options:
+            options = self.categorical_options[key]
+            return options[rng.integers(len(options))]
+        low, high, scale = self.ranges[operator_name][parameter]
+        if scale == 'int':
+            return int(rng.integers(int(low), int(high) + 1))
+        if scale == 'log':
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        return float(f"{value:.4g}")  # Readable values in the list of operators
+
+    def sample(self, operator, rng):
+        """
+        Return a copy of ``operator`` with random values of its tunable parameters.
+
+        :param SearchOperator operator: Search operator.
+        :param numpy.random.Generator rng: Random number generator.
+        :return: SearchOperator
+        """
+        parameters = dict(operator.parameters)
+        for parameter in self.tunable(operator):
+            parameters[parameter] = self.sample_value(operator.name, parameter, rng)
+        return search_operators.SearchOperator(operator.name, parameters, operator.selector)
+
+
+class Tuner:
+    """
+    Random or successive-halving search of the tuning parameters of some operators of a sequence.
+    """
+
+    def __init__(self, base_spec, space, indices=None, num_candidates=16, repetitions=3, method='halving', eta=3,
+                 seed=None):
+        """
+        :param dict base_spec: Run specification; its operators are the sequence to tune and its iterations the
+            largest budget.
+        :param SearchSpace space: Values of the tuning parameters.
+        :param list indices: Optional. Positions of the operators to tune. The default is all of them.
+        :param int num_candidates: Optional. Number of candidate tunings (the current one included). The default is 16.
+        :param int repetitions: Optional. Runs per candidate and rung. The default is 3.
+        :param str method: Optional. 'halving' (successive halving) or 'random'. The default is 'halving'.
+        :param int eta: Optional. Reduction factor of successive halving. The default is 3.
+        :param int seed: Optional. Seed of the candidates and the runs. If None, they are random.
+        """
+        if method not in METHODS:
+            raise ValueError(f"unknown tuning method: {method!r}")
+        if num_candidates < 1 or repetitions < 1 or eta < 2:
+            raise ValueError("num_candidates and repetitions must be positive, and eta at least 2")
+        self.base_spec = {key: value for key, value in base_spec.items() if key != 'seed'}
+        self.operators = [search_operators.SearchOperator.from_tuple(operator) for operator in base_spec['operators']]
+        self.indices = list(range(len(self.operators))) if indices is None else list(indices)
+        if not any(space.tunable(self.operators[index]) for index in self.indices):
+            raise ValueError("the chosen search operators have no tunable parameters")
+
+        rng = np.random.default_rng(seed)
+        self.candidates = [list(self.operators)]
+        for _ in range(num_candidates - 1):
+            candidate = list(self.operators)
+            for index in self.indices:
+                candidate[index] = space.sample(candidate[index], rng)
+            self.candidates.append(candidate)
+
+        # Budgets of the rungs, the last one is the full budget
+        max_iterations = int(base_spec['iterations'])
+        num_rungs = 1 if method == 'random' else int(math.floor(math.log(num_candidates, eta) + 1e-9)) + 1
+        self.budgets = [max(1, int(round(max_iterations / eta ** (num_rungs - 1 - rung)))) for rung in range(num_rungs)]
+        self.eta = eta
+        self.seeds = [engine.make_seed(seed, run_index) for run_index in range(repetitions)]
+
+        self.rung = 0
+        self.alive = list(range(num_candidates))
+        self.history = []  # One record per finished rung
+        self._pending = dict()
+        self._fitness = dict()
+
+    @property
+    def is_done(self):
+        return self.rung >= len(self.budgets)
+
+    @property
+    def num_runs(self):
+        # Total number of runs of the search
+        survivors, total = len(self.candidates), 0
+        for _ in self.budgets:
+            total += survivors * len(self.seeds)
+            survivors = max(1, int(math.ceil(survivors / self.eta)))
+        return total
+
+    def specs(self):
+        """
+        Return the run specs of the current rung (empty if the search is done).
+
+        :return: list of dict
+        """
+        if self.is_done:
+            return []
+        # The specs are kept while pending, so their ids identify them
+        self._pending = dict()
+        for candidate in self.alive:
+            operators = [operator.to_tuple() for operator in self.candidates[candidate]]
+            for seed in self.seeds:
+                spec = dict(self.base_spec, operators=operators, iterations=self.budgets[self.rung], seed=seed)
+                self._pending[id(spec)] = (spec, candidate)
+        self._fitness = {candidate: [] for candidate in self.alive}
+        return [spec for spec, _ in self._pending.values()]
+
+    def add(self, spec, result):
+        """
+        Add the result of a run of the current rung.
+
+        :param dict spec: Run specification, as returned by ``specs``.
+        :param dict result: Result of the run.
+        :return: None.
+        """
+        _, candidate = self._pending.pop(id(spec))
+        final_fitness = float(result['fitness'][-1])
+        self._fitness[candidate].append(final_fitness if np.isfinite(final_fitness) else np.inf)
+
+    def score(self, candidate):
+        values = self._fitness.get(candidate)
+        return float(np.median(values)) if values else np.inf
+
+    def advance(self):
+        """
+        Finish the current rung, promoting its best candidates to the next one.
+
+        :return: dict, the record of the rung (iterations, and the candidates with their scores, best first).
+        """
+        ranking = sorted(self.alive, key=lambda candidate: (self.score(candidate), candidate))
+        record = dict(rung=self.rung, iterations=self.budgets[self.rung],
+                      scores=[(candidate, self.score(candidate)) for candidate in ranking])
+        self.history.append(record)
+        self.rung += 1
+        if not self.is_done:
+            self.alive = ranking[:max(1, int(math.ceil(len(ranking) / self.eta)))]
+        else:
+            self.alive = ranking[:1]
+        return record
+
+    def best(self):
+        """
+        Return the best candidate of the last finished rung and its score (lower is better).
+
+        :returns: list of SearchOperator, float
+        """
+        if not self.history:
+            return list(self.operators), np.inf
+        candidate, score = self.history[-1]['scores'][0]
+        return list(self.candidates[candidate]), score
+
+    def describe(self, candidate):
+        """
+        Return the tuned parameters of a candidate as text.
+        """
+        operators = self.candidates[candidate]
+        return "; ".join(f"{operators[index].pretty_name}: " +
+                         ", ".join(f"{key}={value}" for key, value in operators[index].parameters.items())
+                         for index in self.indices)